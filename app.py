@@ -1,27 +1,81 @@
 # app.py
+import hashlib
+import io
+import json
+import mimetypes
 import os
+import time
 from pathlib import Path
-
-from auth import get_current_user, login_user, logout_user, admin_required
+from urllib.parse import quote
+
+from auth import UserCache, get_current_user, login_user, logout_user, admin_required
+from bulk import (
+    CHARACTER_FIELDS,
+    FORMATS as BULK_FORMATS,
+    TIER_FIELDS,
+    BulkImporter,
+    export_lines,
+    guess_format,
+    read_records,
+)
+from cache import ChangeStamp, Generation, LRUCache
+from compression import (
+    PRECOMPRESSED_SUFFIXES,
+    available_encodings,
+    compress,
+    compress_response,
+    encoded_etag,
+    negotiate_encoding,
+)
 from config import Config
+from facets import FacetService
 from flask import (
     Flask,
+    abort,
     flash,
+    g,
     jsonify,
     redirect,
     render_template,
     request,
     send_from_directory,
+    session,
+    stream_with_context,
     url_for,
 )
-from models import db, User, Character, Skill
+from freeze import StaticExporter
+from jinja2 import FileSystemBytecodeCache
+from instrumentation import SlowRequestProfiler, install_query_counter, install_request_metrics
+from media import FileManifest, ImageManifest
+from migrations import LATEST_VERSION, apply_migrations, current_version, pending_migrations
+from models import (
+    CHARACTER_LIST_COLUMNS,
+    classify_skill_type,
+    compute_overall_tier,
+    db,
+    notify_characters_changed,
+    on_characters_changed,
+    User,
+    Character,
+    Skill,
+)
+from pagination import decode_cursor, keyset_page
+from search import SearchIndex
+from sqlite_profile import configure_sqlite, install_pragmas
+from thumbnails import SIZE_CLASSES, ThumbnailStore, is_flat_name
+from sqlalchemy import delete, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.orm.exc import StaleDataError
+from sqlalchemy.orm import joinedload, undefer_group
 from werkzeug.middleware.proxy_fix import ProxyFix
-from werkzeug.security import check_password_hash
+from werkzeug.security import check_password_hash, safe_join
 
 
-def create_app():
+def create_app(config_overrides: dict | None = None):
     app = Flask(__name__)
     app.config.from_object(Config)
+    # Переопределения нужны скриптам и бенчмаркам, работающим с временной БД
+    app.config.update(config_overrides or {})
 
     # Создаём служебные директории на старте, чтобы пути точно существовали
     Path(app.config["DATA_DIR"]).mkdir(parents=True, exist_ok=True)
@@ -33,9 +87,44 @@ def create_app():
         "rework": "Переработка",
     }
 
+    # Индексы картинок и статики строятся при первом обращении (скриптам из
+    # database/ они обычно не нужны), дальше обновляются по mtime папки и
+    # периодической перепроверке; для сервера их заранее строит warm_up()
+    image_manifest = ImageManifest(
+        app.config["MEDIA_IMAGES_DIR"], app.config["ASSET_RECHECK_SECONDS"]
+    )
+    app.extensions["image_manifest"] = image_manifest
+
+    static_manifest = FileManifest(app.static_folder, app.config["ASSET_RECHECK_SECONDS"])
+    app.extensions["static_manifest"] = static_manifest
+
+    thumbnails = ThumbnailStore(
+        image_manifest,
+        app.config["MEDIA_THUMBS_DIR"],
+        enabled=app.config["THUMBNAILS_ENABLED"],
+    )
+    app.extensions["thumbnails"] = thumbnails
+
     app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1)
+    if app.config["PROFILE_SLOW_REQUEST_MS"] > 0:
+        app.wsgi_app = SlowRequestProfiler(
+            app.wsgi_app,
+            app.config["PROFILE_DIR"],
+            app.config["PROFILE_SLOW_REQUEST_MS"],
+            app.config["PROFILE_SAMPLE_RATE"],
+        )
 
+    configure_sqlite(app)
     db.init_app(app)
+    install_pragmas(app, db)
+    install_query_counter(app, db)
+    app.extensions["user_cache"] = UserCache(
+        app.config["USER_CACHE_TTL"], ChangeStamp(change_stamp_path(app, "users"))
+    )
+    request_metrics = None
+    if app.config["INSTRUMENTATION_ENABLED"]:
+        request_metrics = install_request_metrics(app, db)
+        app.extensions["request_metrics"] = request_metrics
 
     @app.context_processor
     def inject_user():
@@ -58,13 +147,122 @@ def create_app():
             response.headers.setdefault(
                 "Strict-Transport-Security", "max-age=31536000; includeSubDomains"
             )
+        if app.config.get("MEDIA_LOOKUP_STATS"):
+            response.headers["X-Image-FS-Lookups"] = str(g.get("image_fs_lookups", 0))
         return response
 
+    if app.config["COMPRESSION_ENABLED"]:
+        @app.after_request
+        def compress_dynamic(response):
+            # Закэшированные страницы и API сжимаются один раз и приходят
+            # уже с Content-Encoding, статика — готовыми .gz/.br рядом с файлом
+            return compress_response(request, response, app.config["COMPRESSION_MIN_SIZE"])
+
+    def asset_fingerprint(endpoint: str, filename: str):
+        if endpoint == "static":
+            return static_manifest.fingerprint(filename)
+        if endpoint == "media_image":
+            return image_manifest.fingerprint(filename)
+        if endpoint == "media_thumbnail":
+            if not is_flat_name(filename):
+                return None
+            # Миниатюра пересоздаётся вслед за оригиналом — берём его хэш
+            original = thumbnails.original_path(filename.rpartition(".")[0])
+            if original is None:
+                return None
+            return image_manifest.fingerprint(os.path.relpath(original, image_manifest.directory))
+        return None
+
+    @app.url_defaults
+    def add_asset_fingerprint(endpoint, values):
+        """Добавляет к URL картинок и статики ``?v=<хэш содержимого>``."""
+
+        if "filename" not in values or "v" in values:
+            return
+        fingerprint = asset_fingerprint(endpoint, values["filename"])
+        if fingerprint:
+            values["v"] = fingerprint
+
+    def send_asset(kind: str, directory, filename: str, fingerprint: str | None):
+        """Отдаёт файл сам или передаёт его фронтенд-серверу (см. SENDFILE_MODE).
+
+        URL с актуальным хэшем кэшируется браузером навсегда: при изменении
+        файла меняется и адрес.
+        """
+
+        if app.config["SENDFILE_MODE"] == "x-accel":
+            path = safe_join(str(directory), filename)
+            if path is None or not os.path.isfile(path):
+                abort(404)
+            response = app.response_class(
+                mimetype=mimetypes.guess_type(filename)[0] or "application/octet-stream"
+            )
+            response.headers["X-Accel-Redirect"] = (
+                f"{app.config['SENDFILE_ACCEL_PREFIX']}/{kind}/{quote(filename)}"
+            )
+        else:
+            # Готовая сжатая копия рядом с файлом статики (nginx в режиме
+            # x-accel находит такие сам через gzip_static/brotli_static)
+            variants = {}
+            if kind == "static":
+                for candidate, suffix in PRECOMPRESSED_SUFFIXES.items():
+                    variant = static_manifest.fresh_variant(filename, suffix)
+                    if variant is not None:
+                        variants[candidate] = variant
+            encoding = negotiate_encoding(request, tuple(variants))
+            # При USE_X_SENDFILE Flask сам ставит X-Sendfile вместо тела ответа
+            if encoding is None:
+                response = send_from_directory(directory, filename)
+            else:
+                response = send_from_directory(
+                    directory,
+                    variants[encoding],
+                    mimetype=mimetypes.guess_type(filename)[0] or "application/octet-stream",
+                )
+                response.headers["Content-Encoding"] = encoding
+            if variants:
+                response.vary.add("Accept-Encoding")
+
+        if fingerprint is not None and request.args.get("v") == fingerprint:
+            response.cache_control.no_cache = None
+            response.cache_control.public = True
+            response.cache_control.max_age = 31536000
+            response.cache_control.immutable = True
+        return response
+
+    def static_file(filename):
+        return send_asset(
+            "static", app.static_folder, filename, static_manifest.fingerprint(filename)
+        )
+
+    app.view_functions["static"] = static_file
+
     @app.route("/media/images/<path:filename>")
     def media_image(filename):
         """Отдаём пользовательские изображения из отдельной папки."""
 
-        return send_from_directory(app.config["MEDIA_IMAGES_DIR"], filename)
+        if image_manifest.has_file(filename) is False:
+            abort(404)
+        return send_asset(
+            "images",
+            app.config["MEDIA_IMAGES_DIR"],
+            filename,
+            image_manifest.fingerprint(filename),
+        )
+
+    @app.route("/media/thumbs/<size>/<int:width>/<filename>")
+    def media_thumbnail(size, width, filename):
+        """Миниатюра портрета; если её ещё нет, создаётся при первом обращении."""
+
+        path = thumbnails.ensure(size, width, filename)
+        if path is None:
+            abort(404)
+        return send_asset(
+            "thumbs",
+            thumbnails.cache_dir,
+            f"{size}/{width}/{filename}",
+            asset_fingerprint("media_thumbnail", filename),
+        )
 
     def normalize_image_name(name: str | None):
         """Оставляем только базовое имя файла, чтобы можно было менять расширение."""
@@ -98,35 +296,263 @@ def create_app():
             })
         return skills
 
-    def image_sources(image_name: str | None):
-        """Возвращает доступные версии изображения из папки media/images."""
+    def image_sources(image_name: str | None, size: str | None = None):
+        """Возвращает доступные версии изображения из папки media/images.
+
+        Если указан класс размера и включены миниатюры, вместо оригиналов
+        отдаются уменьшенные версии с ``srcset``/``sizes`` под этот размер.
+        """
 
         base = normalize_image_name(image_name)
         if not base:
             return []
 
-        images_dir = Path(app.config["MEDIA_IMAGES_DIR"])
+        originals = image_manifest.sources(base)
+        if not originals:
+            return []
+
+        variants = thumbnails.variants(base, size) if size else []
+        if not variants:
+            return [
+                {
+                    "path": source["path"],
+                    "mime": source["mime"],
+                    "url": url_for("media_image", filename=source["path"]),
+                }
+                for source in originals
+            ]
+
+        css_width, _widths = SIZE_CLASSES[size]
         sources = []
-        for ext, mime in (
-            (".webp", "image/webp"),
-            (".png", "image/png"),
-            (".jpg", "image/jpeg"),
-            (".jpeg", "image/jpeg"),
-        ):
-            candidate = images_dir / f"{base}{ext}"
-            if candidate.exists():
-                sources.append({"path": candidate.name, "mime": mime})
+        for _ext, mime, files in variants:
+            urls = [
+                (width, url_for("media_thumbnail", size=size, width=width, filename=filename))
+                for width, filename in files
+            ]
+            sources.append({
+                "mime": mime,
+                "url": urls[0][1],
+                "srcset": ", ".join(f"{url} {width}w" for width, url in urls),
+                "sizes": f"{css_width}px",
+            })
         return sources
 
     app.jinja_env.globals["image_sources"] = image_sources
+    if app.config["TEMPLATE_CACHE_DIR"]:
+        Path(app.config["TEMPLATE_CACHE_DIR"]).mkdir(parents=True, exist_ok=True)
+        app.jinja_env.bytecode_cache = FileSystemBytecodeCache(app.config["TEMPLATE_CACHE_DIR"])
     app.jinja_env.globals["BALANCE_STATUSES"] = BALANCE_STATUSES
 
+    difficulty_aliases = {"Для новичков": "Лёгкий"}
+
+    def canonical_difficulty(value: str | None):
+        value = (value or "").strip()
+        if not value or value == "*":
+            return None
+        return difficulty_aliases.get(value, value)
+
+    difficulty_labels = {"Для новичков": "Лёгкий", "Лёгкий": "Лёгкий"}
+
+    # Кэш отрендеренного тир-листа для анонимных посетителей. Любой коммит,
+    # затрагивающий персонажей, увеличивает поколение и сбрасывает кэш.
+    page_cache = LRUCache(app.config["TIER_LIST_CACHE_SIZE"])
+    data_generation = Generation()
+
+    # Готовые плитки персонажей: одна и та же плитка входит во все варианты
+    # фильтров, поэтому при промахе кэша страницы перерисовываются только
+    # изменившиеся персонажи. Ключ — (id, версия персонажа, версия индекса
+    # картинок): правка персонажа меняет ключ, поэтому плитки не сбрасываются.
+    tile_cache = LRUCache(app.config["TIER_TILE_CACHE_SIZE"])
+
+    search_index = SearchIndex()
+    app.extensions["search_index"] = search_index
+
+    facet_service = FacetService(canonical_difficulty)
+    on_characters_changed(app, facet_service.invalidate)
+    app.extensions["facet_service"] = facet_service
+
+    # Данные для /api/tier-list: одно представление на поколение данных,
+    # сжатые версии считаются при первом запросе с нужным Accept-Encoding
+    api_cache = LRUCache(1)
+
+    # Метка изменений для остальных процессов (воркеры gunicorn, скрипты)
+    data_stamp = ChangeStamp(change_stamp_path(app, "changed"))
+
+    @on_characters_changed(app)
+    def invalidate_public_pages(character_ids):
+        data_generation.bump()
+        page_cache.clear()
+        api_cache.clear()
+        data_stamp.touch()
+
+    @app.before_request
+    def sync_public_caches():
+        # Какие персонажи изменились в другом процессе, неизвестно — сбрасываем всё
+        if data_stamp.changed():
+            data_generation.bump()
+            page_cache.clear()
+            api_cache.clear()
+            facet_service.invalidate()
+
+    # Статическая копия обновляется после кэшей, чтобы рендерить свежие данные
+    if app.config["FREEZE_DIR"]:
+        static_exporter = StaticExporter(app, app.config["FREEZE_DIR"])
+        app.extensions["static_exporter"] = static_exporter
+        if app.config["FREEZE_ON_COMMIT"]:
+            static_exporter.enable_on_commit()
+
     def normalize_balance_status(value: str | None):
         value = (value or "").strip().lower()
         if not value:
             return None
         return value if value in BALANCE_STATUSES else None
 
+    bulk_importer = BulkImporter(BALANCE_STATUSES, normalize_image_name, app.config["BULK_BATCH_SIZE"])
+    app.extensions["bulk_importer"] = bulk_importer
+
+    # ------- Частичное сохранение персонажа --------
+
+    EDIT_CONFLICT_MESSAGE = "Персонажа уже изменили в другой вкладке: проверьте данные и сохраните снова."
+
+    class EditConflict(Exception):
+        """Персонажа успели изменить: версия клиента устарела."""
+
+    def character_state(char_id: int):
+        """Текущие поля, навыки и версия персонажа для ответа 409."""
+        row = db.session.execute(
+            select(Character.version, *(getattr(Character, name) for name in CHARACTER_FIELDS))
+            .where(Character.id == char_id)
+        ).one()
+        skills = db.session.execute(
+            select(Skill.id, Skill.name, Skill.type, Skill.description, Skill.cooldown)
+            .where(Skill.character_id == char_id)
+            .order_by(Skill.id)
+        ).all()
+        return {
+            "version": row.version,
+            "character": {name: getattr(row, name) for name in CHARACTER_FIELDS},
+            "skills": [dict(skill._mapping) for skill in skills],
+        }
+
+    def parse_character_diff(data):
+        """Проверяет JSON автосохранения: {"version", "fields", "skills": {"upsert", "delete"}}.
+
+        Значения полей и навыков — строки или null; пустое имя навыка в upsert
+        означает удаление, как пропуск пустой строки в обычной форме.
+        """
+        def text(value):
+            if value is not None and not isinstance(value, str):
+                raise ValueError("значения полей должны быть строками")
+            return value
+
+        version = data.get("version") if isinstance(data, dict) else None
+        if not isinstance(version, int) or isinstance(version, bool):
+            raise ValueError("нужна версия персонажа")
+        fields = data.get("fields") or {}
+        skills = data.get("skills") or {}
+        if not isinstance(fields, dict) or not isinstance(skills, dict):
+            raise ValueError("неверный формат изменений")
+
+        changes = {name: text(value) for name, value in fields.items() if name in CHARACTER_FIELDS}
+        if "balance_status" in changes:
+            changes["balance_status"] = normalize_balance_status(changes["balance_status"])
+        if "image_name" in changes:
+            changes["image_name"] = normalize_image_name(changes["image_name"])
+        for name in ("name", "slug"):
+            if name in changes and not (changes[name] or "").strip():
+                raise ValueError("имя и slug не могут быть пустыми")
+
+        deleted = skills.get("delete") or []
+        if not all(isinstance(skill_id, int) for skill_id in deleted):
+            raise ValueError("неверные id навыков")
+        deleted = set(deleted)
+        upserts = []
+        for item in skills.get("upsert") or []:
+            if not isinstance(item, dict):
+                raise ValueError("неверный формат навыка")
+            skill_id, key = item.get("id"), item.get("key")
+            if skill_id is not None and not isinstance(skill_id, int):
+                raise ValueError("неверные id навыков")
+            if key is not None and not isinstance(key, str):
+                raise ValueError("неверный ключ нового навыка")
+            name = (text(item.get("name")) or "").strip()
+            if not name:
+                if skill_id is not None:
+                    deleted.add(skill_id)
+                continue
+            upserts.append({
+                "id": skill_id,
+                "key": key,
+                "name": name,
+                "type": (text(item.get("type")) or "").strip(),
+                "description": (text(item.get("description")) or "").strip(),
+                "cooldown": (text(item.get("cooldown")) or "").strip(),
+            })
+        if deleted & {skill["id"] for skill in upserts}:
+            raise ValueError("навык нельзя одновременно изменить и удалить")
+        return version, changes, upserts, deleted
+
+    def save_character_diff(char_id: int, version: int, changes, upserts, deleted):
+        """Пишет только изменения: один UPDATE персонажа и пакетные правки навыков.
+
+        UPDATE проверяет версию в WHERE и увеличивает её, так что параллельная
+        правка другого редактора даёт EditConflict, а не тихую перезапись.
+        Возвращает (новая версия, id навыков из upsert в порядке запроса).
+        """
+        current = db.session.execute(
+            select(Character.version, *(getattr(Character, name) for name in TIER_FIELDS))
+            .where(Character.id == char_id)
+        ).one_or_none()
+        if current is None:
+            abort(404)
+        if current.version != version:
+            raise EditConflict()
+
+        owned = set(db.session.scalars(select(Skill.id).where(Skill.character_id == char_id)))
+        touched = deleted | {skill["id"] for skill in upserts if skill["id"] is not None}
+        if not touched <= owned:
+            raise ValueError("навык принадлежит другому персонажу или уже удалён")
+        if not changes and not upserts and not deleted:
+            return version, []
+
+        values = dict(changes)
+        if values.keys() & set(TIER_FIELDS):
+            values["overall_tier"], values["tier_weight"] = compute_overall_tier(
+                *(values.get(name, getattr(current, name)) for name in TIER_FIELDS)
+            )
+        result = db.session.execute(
+            update(Character)
+            .where(Character.id == char_id, Character.version == version)
+            .values(**values, version=Character.version + 1),
+            execution_options={"synchronize_session": False},
+        )
+        if result.rowcount != 1:
+            raise EditConflict()
+
+        if deleted:
+            db.session.execute(
+                delete(Skill).where(Skill.character_id == char_id, Skill.id.in_(deleted)),
+                execution_options={"synchronize_session": False},
+            )
+
+        def skill_row(skill):
+            category, sort_rank = classify_skill_type(skill["type"])
+            row = {name: skill[name] for name in ("name", "type", "description", "cooldown")}
+            return row | {"category": category, "sort_rank": sort_rank}
+
+        existing = [skill for skill in upserts if skill["id"] is not None]
+        if existing:
+            db.session.execute(update(Skill), [skill_row(skill) | {"id": skill["id"]} for skill in existing])
+        created = [skill for skill in upserts if skill["id"] is None]
+        if created:
+            new_ids = db.session.scalars(
+                insert(Skill).returning(Skill.id, sort_by_parameter_order=True),
+                [skill_row(skill) | {"character_id": char_id} for skill in created],
+            ).all()
+            for skill, skill_id in zip(created, new_ids):
+                skill["id"] = skill_id
+        return version + 1, [skill["id"] for skill in upserts]
+
     # ------- Маршруты --------
 
     @app.route("/")
@@ -155,6 +581,38 @@ def create_app():
         flash("Вы вышли.", "success")
         return redirect(url_for("login"))
 
+    def build_cached_entry(body: bytes, stamp, last_modified):
+        """Запись кэша ответа: несжатое тело, ETag по содержимому и валидаторы."""
+
+        return {
+            "stamp": stamp,
+            "bodies": {None: body},
+            "etag": hashlib.sha1(body).hexdigest(),
+            "last_modified": last_modified,
+        }
+
+    def cached_response(entry, mimetype: str, vary_cookie: bool = False):
+        """Отдаёт ответ из кэша в кодировке клиента (сжатое тело тоже кэшируется)
+        с валидаторами для условных запросов."""
+
+        encoding = negotiate_encoding(request) if app.config["COMPRESSION_ENABLED"] else None
+        body = entry["bodies"].get(encoding)
+        if body is None:
+            body = entry["bodies"][encoding] = compress(entry["bodies"][None], encoding)
+
+        response = app.response_class(body, mimetype=mimetype)
+        response.set_etag(encoded_etag(entry["etag"], encoding))
+        response.last_modified = entry["last_modified"]
+        # Прокси может хранить копию, но обязан перепроверять её по ETag
+        response.cache_control.public = True
+        response.cache_control.no_cache = True
+        if vary_cookie:
+            response.vary.add("Cookie")
+        response.vary.add("Accept-Encoding")
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+        return response.make_conditional(request)
+
     @app.route("/tier-list")
     def tier_list():
         def requested_filter(name: str):
@@ -165,38 +623,72 @@ def create_app():
         faction_value = requested_filter("faction")
         search = (request.args.get("search") or "").strip()
 
-        difficulty_aliases = {"Для новичков": "Лёгкий"}
-
-        def canonical_difficulty(value: str | None):
-            value = (value or "").strip()
-            if not value or value == "*":
-                return None
-            return difficulty_aliases.get(value, value)
-
         difficulty_value = (request.args.get("difficulty") or "*").strip() or "*"
         difficulty = canonical_difficulty(difficulty_value)
         active_difficulty_value = difficulty or "*"
 
-        query = Character.query
+        # Анонимная страница без flash-сообщений одинакова для всех посетителей
+        cacheable = "user_id" not in session and "_flashes" not in session
+        if not cacheable:
+            return render_tier_list(class_value, faction_value, difficulty, search)
+
+        image_manifest.ensure_fresh()
+        static_manifest.ensure_fresh()
+        stamp = (data_generation.value, image_manifest.version, static_manifest.version)
+        cache_key = (class_value, faction_value, active_difficulty_value, search)
+        entry = page_cache.get(cache_key)
+        if entry is None or entry["stamp"] != stamp:
+            last_modified = data_generation.changed_at
+            body = render_tier_list(
+                class_value, faction_value, difficulty, search
+            ).encode("utf-8")
+            entry = build_cached_entry(body, stamp, last_modified)
+            page_cache.set(cache_key, entry)
+        return cached_response(entry, "text/html", vary_cookie=True)
+
+    def tier_tile_html(ch):
+        """HTML плитки персонажа из кэша или свежеотрендеренный."""
+
+        key = (ch.id, ch.version, image_manifest.version)
+        html = tile_cache.get(key)
+        if html is None:
+            tier_tile = app.jinja_env.get_template("_tier_tile.html").module.tier_tile
+            html = tier_tile(ch, difficulty_labels)
+            tile_cache.set(key, html)
+        return html
+
+    def render_tier_list(class_value, faction_value, difficulty, search):
+        """Собирает HTML тир-листа для уже нормализованных фильтров."""
+
+        image_manifest.ensure_fresh()
+        query = select(*CHARACTER_LIST_COLUMNS)
 
         if class_value != "*":
-            query = query.filter(Character.class_name == class_value)
+            query = query.where(Character.class_name == class_value)
         if faction_value != "*":
-            query = query.filter(Character.faction == faction_value)
+            query = query.where(Character.faction == faction_value)
         if difficulty:
             difficulty_values = {difficulty}
             difficulty_values.update(
                 alias for alias, canonical in difficulty_aliases.items() if canonical == difficulty
             )
             if len(difficulty_values) == 1:
-                query = query.filter(Character.difficulty == difficulty)
+                query = query.where(Character.difficulty == difficulty)
             else:
-                query = query.filter(Character.difficulty.in_(difficulty_values))
+                query = query.where(Character.difficulty.in_(difficulty_values))
         if search:
-            search_like = f"%{search}%"
-            query = query.filter(Character.name.ilike(search_like))
+            # FTS ищет слова по префиксу, а часть имени («ан» в «Фрагранс»)
+            # находит только LIKE — берём оба условия
+            name_matches = Character.name.ilike(f"%{search}%")
+            matching_ids = search_index.matching_ids(db.session, search)
+            if matching_ids is not None:
+                query = query.where(or_(Character.id.in_(matching_ids), name_matches))
+            else:
+                query = query.where(name_matches)
 
-        characters = query.all()
+        characters = db.session.execute(
+            query.order_by(Character.tier_weight.desc(), Character.name.asc())
+        ).all()
 
         tiers = {
             "SSS": [],
@@ -208,109 +700,135 @@ def create_app():
             "D": [],
             "Unranked": [],
         }
+        # Порядок уже задан в SQL, остаётся только разложить по рядам
         for ch in characters:
-            t = ch.overall_tier
-            if t in tiers:
-                tiers[t].append(ch)
-            else:
-                tiers["Unranked"].append(ch)
-
-        for key in tiers:
-            tiers[key] = sorted(tiers[key], key=lambda c: c.name)
-
-        available_classes = [
-            row[0]
-            for row in db.session
-            .query(Character.class_name)
-            .filter(Character.class_name.isnot(None))
-            .distinct()
-            .order_by(Character.class_name)
-            .all()
-        ]
-        available_factions = [
-            row[0]
-            for row in db.session
-            .query(Character.faction)
-            .filter(Character.faction.isnot(None))
-            .distinct()
-            .order_by(Character.faction)
-            .all()
-        ]
-
-        raw_difficulty_values = {
-            (row[0] or "").strip()
-            for row in db.session
-            .query(Character.difficulty)
-            .filter(Character.difficulty.isnot(None))
-            .distinct()
-            .all()
-            if (row[0] or "").strip() and (row[0] or "").strip() != "*"
-        }
-
-        normalized_difficulties = {canonical_difficulty(value) for value in raw_difficulty_values}
-        normalized_difficulties.discard(None)
+            tiers.get(ch.overall_tier, tiers["Unranked"]).append(tier_tile_html(ch))
 
-        preferred_order = ["Лёгкий", "Средний", "Сложный"]
-        ordered_known = [name for name in preferred_order if name in normalized_difficulties]
-        remaining = sorted(normalized_difficulties - set(preferred_order))
-        available_difficulties = ordered_known + remaining
-
-        difficulty_labels = {"Для новичков": "Лёгкий", "Лёгкий": "Лёгкий"}
+        facets = facet_service.get()
 
         return render_template(
             "tier_list.html",
             tiers=tiers,
-            available_classes=available_classes,
-            available_factions=available_factions,
-            available_difficulties=available_difficulties,
+            available_classes=facets["classes"],
+            available_factions=facets["factions"],
+            available_difficulties=facets["difficulties"],
+            facet_counts=facets["counts"],
             active_class=class_value,
             active_faction=faction_value,
-            active_difficulty=active_difficulty_value,
+            active_difficulty=difficulty or "*",
+            search=search,
             difficulty_labels=difficulty_labels,
         )
 
+    def tier_list_payload():
+        """Компактное описание всех персонажей для фильтрации в браузере."""
+
+        characters = db.session.execute(
+            select(*CHARACTER_LIST_COLUMNS).order_by(Character.tier_weight.desc(), Character.name.asc())
+        ).all()
+        return {
+            "difficulty_labels": difficulty_labels,
+            "characters": [
+                {
+                    "slug": ch.slug,
+                    "name": ch.name,
+                    "url": url_for("character_detail", slug=ch.slug),
+                    "faction": ch.faction,
+                    "class_name": ch.class_name,
+                    "difficulty": ch.difficulty,
+                    "difficulty_key": canonical_difficulty(ch.difficulty),
+                    "tier": ch.overall_tier,
+                    "tiers": [ch.tier_weapon, ch.tier_skill, ch.tier_passive, ch.tier_ultimate],
+                    "balance_status": ch.balance_status,
+                    "images": {
+                        size: [
+                            {key: value for key, value in source.items() if key != "path"}
+                            for source in image_sources(ch.image_name, size)
+                        ]
+                        for size in ("icon", "small")
+                    },
+                }
+                for ch in characters
+            ],
+        }
+
+    @app.route("/api/tier-list")
+    def api_tier_list():
+        image_manifest.ensure_fresh()
+        stamp = (data_generation.value, image_manifest.version)
+        entry = api_cache.get("payload")
+        if entry is None or entry["stamp"] != stamp:
+            last_modified = data_generation.changed_at
+            body = json.dumps(
+                tier_list_payload(), ensure_ascii=False, separators=(",", ":")
+            ).encode("utf-8")
+            entry = build_cached_entry(body, stamp, last_modified)
+            api_cache.set("payload", entry)
+        return cached_response(entry, "application/json")
+
+    @app.route("/api/search")
+    def api_search():
+        """Slug-и подходящих персонажей по релевантности для поиска в браузере."""
+
+        search = (request.args.get("q") or "").strip()
+        if not search:
+            return jsonify({"slugs": []})
+
+        # Совпадения по части имени, которых нет в FTS, идут после ранжированных
+        name_rows = (
+            db.session.query(Character.id, Character.slug)
+            .filter(Character.name.ilike(f"%{search}%"))
+            .order_by(Character.name)
+            .all()
+        )
+        ranked_ids = search_index.matching_ids(db.session, search, ranked=True)
+        if ranked_ids is None:
+            return jsonify({"slugs": [row.slug for row in name_rows]})
+
+        slugs_by_id = dict(
+            db.session.query(Character.id, Character.slug)
+            .filter(Character.id.in_(ranked_ids))
+            .all()
+        )
+        ranked = set(ranked_ids)
+        return jsonify(
+            {
+                "slugs": [slugs_by_id[i] for i in ranked_ids if i in slugs_by_id]
+                + [row.slug for row in name_rows if row.id not in ranked]
+            }
+        )
+
     @app.route("/character/<slug>")
     def character_detail(slug):
-        ch = Character.query.filter_by(slug=slug).first_or_404()
-
-        # Группируем навыки по типу
-        skills_by_type = {}
-        for s in ch.skills:
-            skills_by_type.setdefault(s.type or "Other", []).append(s)
-
-        skill_preferences = [
-            (["Пассивка", "Пассивный", "Passive", "Пассивная способность"], "Пассивный навык"),
-            (["Навык", "Skill", "Обычный", "Базовый", "Активный"], "Обычный навык"),
-            (["Ультимейт", "Ульта", "Ultimate", "Сигнатурный"], "Ультимативный навык"),
-        ]
-
-        used_skill_types = set()
-        ordered_skill_groups = []
-
-        for keys, label in skill_preferences:
-            group_skills = []
-            for key in keys:
-                if key in skills_by_type and key not in used_skill_types:
-                    group_skills.extend(skills_by_type[key])
-                    used_skill_types.add(key)
-            ordered_skill_groups.append({"label": label, "skills": group_skills})
-
-        additional_skill_groups = [
-            {"label": skill_type, "skills": skills}
-            for skill_type, skills in skills_by_type.items()
-            if skill_type not in used_skill_types
-        ]
-
-        return render_template(
-            "character.html",
-            character=ch,
-            skills_by_type=skills_by_type,
-            skill_groups=ordered_skill_groups,
-            additional_skill_groups=additional_skill_groups,
+        ch = Character.query.options(undefer_group("texts")).filter_by(slug=slug).first_or_404()
+
+        # Категория и порядок навыков посчитаны при сохранении; на странице
+        # показываются первые три
+        skills = (
+            Skill.query
+            .filter_by(character_id=ch.id)
+            .order_by(Skill.sort_rank, Skill.category, Skill.id)
+            .limit(3)
+            .all()
         )
 
+        return render_template("character.html", character=ch, skills=skills)
+
     # ------- Админка --------
 
+    @app.route("/admin/metrics")
+    @admin_required
+    def admin_metrics():
+        """Метрики запросов этого процесса в формате Prometheus."""
+
+        if request_metrics is None:
+            abort(404)
+        return app.response_class(
+            request_metrics.render_prometheus(),
+            content_type="text/plain; version=0.0.4; charset=utf-8",
+            headers={"Cache-Control": "no-store"},
+        )
+
     @app.route("/admin")
     @admin_required
     def admin_dashboard():
@@ -322,7 +840,7 @@ def create_app():
             "name": Character.name,
             "class_name": Character.class_name,
             "faction": Character.faction,
-            "overall_tier": None,
+            "overall_tier": Character.tier_weight,
         }
 
         if sort not in allowed_sorts:
@@ -330,26 +848,44 @@ def create_app():
         if direction not in ("asc", "desc"):
             direction = "asc"
 
-        if sort == "overall_tier":
-            characters = Character.query.all()
-            tier_weights = {"D": 1, "C": 2, "B": 3, "A": 4, "S": 5, "SS": 6, "SSS": 7}
-            none_sentinel = float("-inf") if direction == "desc" else float("inf")
-
-            def tier_key(ch):
-                value = tier_weights.get(ch.overall_tier, none_sentinel)
-                return (value, ch.id)
-
-            characters.sort(key=tier_key, reverse=direction == "desc")
+        column = allowed_sorts[sort]
+        descending = direction == "desc"
+        # Ключи страницы — сами колонки с id в конце, чтобы курсор был однозначным
+        # и порядок брался из индекса. Пустые значения, как их сортирует SQLite,
+        # первыми по возрастанию и последними по убыванию.
+        if sort == "id":
+            keys = [(column, descending)]
+        elif sort == "name":
+            keys = [(column, descending), (Character.id, False)]
         else:
-            column = allowed_sorts[sort]
-            order_clause = column.desc() if direction == "desc" else column.asc()
-            characters = Character.query.order_by(order_clause, Character.id.asc()).all()
+            # id в том же направлении, что и колонка: так индекс по колонке
+            # (в котором строки одного значения лежат по rowid) отдаёт готовый порядок
+            keys = [(column, descending), (Character.id, descending)]
+
+        characters, prev_cursor, next_cursor = keyset_page(
+            db.session,
+            select(
+                Character.id,
+                Character.name,
+                Character.class_name,
+                Character.faction,
+                Character.overall_tier,
+                Character.balance_status,
+            ),
+            keys,
+            app.config["ADMIN_PAGE_SIZE"],
+            after=decode_cursor(request.args.get("after"), len(keys)),
+            before=decode_cursor(request.args.get("before"), len(keys)),
+        )
 
         return render_template(
             "admin_dashboard.html",
             characters=characters,
             sort=sort,
             direction=direction,
+            prev_cursor=prev_cursor,
+            next_cursor=next_cursor,
+            paged="after" in request.args or "before" in request.args,
         )
 
     @app.route("/admin/character/new", methods=["GET", "POST"])
@@ -414,11 +950,46 @@ def create_app():
     @app.route("/admin/character/<int:char_id>/edit", methods=["GET", "POST"])
     @admin_required
     def admin_edit_character(char_id):
-        ch = Character.query.get_or_404(char_id)
+        if request.method == "POST" and request.is_json:
+            # Автосохранение присылает только изменённые поля и навыки
+            data = request.get_json(silent=True)
+            try:
+                version, changes, upserts, deleted = parse_character_diff(data)
+                new_version, skill_ids = save_character_diff(char_id, version, changes, upserts, deleted)
+                db.session.commit()
+            except EditConflict:
+                db.session.rollback()
+                return jsonify({"status": "conflict", **character_state(char_id)}), 409
+            except (ValueError, IntegrityError) as exc:
+                db.session.rollback()
+                message = "Такой slug уже занят." if isinstance(exc, IntegrityError) else str(exc)
+                return jsonify({"status": "error", "error": message}), 400
+            if new_version != version:
+                notify_characters_changed({char_id})
+            return jsonify(
+                {
+                    "status": "ok",
+                    "version": new_version,
+                    "skill_ids": skill_ids,
+                    "skill_keys": {
+                        skill["key"]: skill["id"] for skill in upserts if skill["key"] is not None
+                    },
+                }
+            )
+
+        ch = db.get_or_404(
+            Character, char_id, options=[joinedload(Character.skills), undefer_group("texts")]
+        )
 
         wants_json = request.headers.get("X-Requested-With") == "XMLHttpRequest"
 
         if request.method == "POST":
+            if request.form.get("version", type=int) not in (None, ch.version):
+                if wants_json:
+                    return jsonify({"status": "conflict", **character_state(char_id)}), 409
+                flash(EDIT_CONFLICT_MESSAGE, "error")
+                return redirect(url_for("admin_edit_character", char_id=char_id))
+
             ch.name = request.form.get("name")
             ch.slug = request.form.get("slug")
             ch.class_name = request.form.get("class_name")
@@ -466,11 +1037,19 @@ def create_app():
                 if skill.id and str(skill.id) not in kept_ids and str(skill.id) in existing_by_id:
                     db.session.delete(skill)
 
-            db.session.commit()
+            try:
+                db.session.commit()
+            except StaleDataError:
+                db.session.rollback()
+                if wants_json:
+                    return jsonify({"status": "conflict", **character_state(char_id)}), 409
+                flash(EDIT_CONFLICT_MESSAGE, "error")
+                return redirect(url_for("admin_edit_character", char_id=char_id))
             if wants_json:
                 return jsonify(
                     {
                         "status": "ok",
+                        "version": ch.version,
                         "skill_ids": [s.id for s in payload_skills],
                     }
                 )
@@ -480,6 +1059,57 @@ def create_app():
 
         return render_template("admin_edit_character.html", character=ch)
 
+    @app.route("/admin/export.<fmt>")
+    @admin_required
+    def admin_export(fmt):
+        if fmt not in BULK_FORMATS:
+            abort(404)
+        mimetype = "application/x-ndjson" if fmt == "jsonl" else "text/csv"
+        return app.response_class(
+            stream_with_context(export_lines(fmt)),
+            mimetype=mimetype,
+            headers={
+                "Content-Disposition": f"attachment; filename=characters.{fmt}",
+                "Cache-Control": "no-store",
+            },
+        )
+
+    @app.route("/admin/import", methods=["POST"])
+    @admin_required
+    def admin_import():
+        wants_json = request.headers.get("X-Requested-With") == "XMLHttpRequest"
+        upload = request.files.get("file")
+        fmt = guess_format(upload.filename if upload else None)
+
+        if upload is None or fmt is None:
+            message = "Загрузите файл .jsonl или .csv."
+            if wants_json:
+                return jsonify({"status": "error", "error": message}), 400
+            flash(message, "error")
+            return redirect(url_for("admin_dashboard"))
+
+        lines = io.TextIOWrapper(upload.stream, encoding="utf-8-sig", newline="")
+        try:
+            report = bulk_importer.run(read_records(lines, fmt))
+        except UnicodeDecodeError:
+            message = "Файл должен быть в кодировке UTF-8."
+            if wants_json:
+                return jsonify({"status": "error", "error": message}), 400
+            flash(message, "error")
+            return redirect(url_for("admin_dashboard"))
+
+        if wants_json:
+            return jsonify({"status": "ok", **report.as_dict()})
+
+        flash(
+            f"Импорт: создано {report.created}, обновлено {report.updated}, "
+            f"без изменений {report.unchanged}, навыков {report.skills}, ошибок {len(report.errors)}.",
+            "success" if not report.errors else "error",
+        )
+        for error in report.errors[:10]:
+            flash(f"Строка {error['line']} ({error['slug'] or 'без slug'}): {error['error']}", "error")
+        return redirect(url_for("admin_dashboard"))
+
     @app.route("/admin/character/<int:char_id>/delete", methods=["POST"])
     @admin_required
     def admin_delete_character(char_id):
@@ -492,10 +1122,81 @@ def create_app():
     return app
 
 
+def change_stamp_path(app, name: str) -> Path | None:
+    """Файл-метка рядом с файлом SQLite (``tierlist.db-changed``): процессы с
+    одной базой делят метку, а бенчмарки с временной БД не трогают рабочую."""
+
+    with app.app_context():
+        url = db.engine.url
+    if url.get_backend_name() != "sqlite" or not url.database or url.database == ":memory:":
+        return None
+    path = Path(url.database).resolve()
+    return path.with_name(f"{path.name}-{name}")
+
+
+def prepare_database(app):
+    """Проверки перед запуском сервера: версия схемы и полнотекстовый индекс."""
+
+    with app.app_context():
+        pending = pending_migrations(db.engine)
+        if pending and app.config["MIGRATE_ON_START"]:
+            apply_migrations(db.engine)
+        elif pending:
+            raise SystemExit(
+                f"Схема базы на версии {current_version(db.engine)}, нужна {LATEST_VERSION}: "
+                "выполните python database/migrate.py"
+            )
+        try:
+            app.extensions["search_index"].install(db.session)
+            db.session.commit()
+        except OperationalError as exc:
+            db.session.rollback()
+            print("Полнотекстовый поиск недоступен, используется LIKE:", exc)
+
+
+def warm_up(app):
+    """Готовит процесс к первому запросу: индексы файлов, шаблоны, кэши страниц.
+
+    Шаблоны компилируются все (или читаются из TEMPLATE_CACHE_DIR), тир-лист
+    и /api/tier-list рендерятся тестовым клиентом — вместе с плитками и
+    фасетами они попадают в кэши. При предзагрузке в serve.py это делается
+    один раз до fork, и воркеры получают готовое. Возвращает длительности этапов.
+    """
+
+    started = time.perf_counter()
+    with app.app_context():
+        app.extensions["image_manifest"].ensure_fresh()
+        app.extensions["static_manifest"].ensure_fresh()
+    templates_started = time.perf_counter()
+    templates = app.jinja_env.list_templates()
+    for name in templates:
+        app.jinja_env.get_template(name)
+    templates_ms = (time.perf_counter() - templates_started) * 1000
+
+    client = app.test_client()
+    environ = {"wsgi.url_scheme": "https"}  # без редиректа при FORCE_HTTPS
+    for path in ("/tier-list", "/api/tier-list"):
+        client.get(path, environ_overrides=environ)
+        for encoding in available_encodings():
+            client.get(path, headers={"Accept-Encoding": encoding}, environ_overrides=environ)
+    stats = {
+        "templates": len(templates),
+        "templates_ms": templates_ms,
+        "total_ms": (time.perf_counter() - started) * 1000,
+    }
+    app.logger.info(
+        "Прогрев: шаблонов %d за %.0f мс, всего %.0f мс",
+        stats["templates"], stats["templates_ms"], stats["total_ms"],
+    )
+    return stats
+
+
 if __name__ == "__main__":
+    # Сервер разработки; в продакшене — python serve.py (см. wsgi.py)
     app = create_app()
-    with app.app_context():
-        db.create_all()
+    prepare_database(app)
+    if app.config["TEMPLATE_WARMUP"]:
+        warm_up(app)
     ssl_cert = os.getenv("SSL_CERT_FILE")
     ssl_key = os.getenv("SSL_KEY_FILE")
     ssl_context = (ssl_cert, ssl_key) if ssl_cert and ssl_key else None
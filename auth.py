@@ -1,22 +1,124 @@
 # auth.py
+import threading
+import time
+from dataclasses import dataclass
 from functools import wraps
-from flask import session, redirect, url_for, flash
-from models import User
+from itertools import chain
+
+from flask import current_app, flash, g, has_app_context, redirect, session, url_for
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from models import User, db
+
+
+@dataclass(frozen=True)
+class SessionUser:
+    """Неизменяемый снимок пользователя для шаблонов и проверки прав."""
+
+    id: int
+    username: str
+    is_admin: bool
+
+
+class UserCache:
+    """Снимки пользователей с коротким TTL, свой у каждого приложения.
+
+    Запись в таблицу пользователей увеличивает версию и обесценивает кэш:
+    в этом процессе — после коммита, в остальных (воркеры gunicorn,
+    database/create_admin.py) — по метке ``stamp`` рядом с базой.
+    """
+
+    def __init__(self, ttl: float, stamp):
+        self.ttl = ttl
+        self.stamp = stamp
+        self._lock = threading.Lock()
+        # user_id -> (момент устаревания, версия, снимок или None)
+        self._entries: dict[int, tuple[float, int, SessionUser | None]] = {}
+        self.version = 0
+
+    def invalidate(self, notify_others: bool = True):
+        with self._lock:
+            self.version += 1
+            self._entries.clear()
+        if notify_others:
+            self.stamp.touch()
+
+    def forget(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def get(self, user_id):
+        if self.stamp.changed():
+            self.invalidate(notify_others=False)
+
+        now = time.monotonic()
+        cached = self._entries.get(user_id)
+        if cached is not None:
+            expires_at, version, snapshot = cached
+            if expires_at > now and version == self.version:
+                return snapshot
+
+        version = self.version
+        user = db.session.get(User, user_id)
+        snapshot = (
+            SessionUser(id=user.id, username=user.username, is_admin=bool(user.is_admin))
+            if user is not None
+            else None
+        )
+        if self.ttl > 0:
+            with self._lock:
+                # Пока читали из БД, пользователя могли изменить — такой снимок не храним
+                if version == self.version:
+                    self._entries[user_id] = (now + self.ttl, version, snapshot)
+        return snapshot
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_user_changes(session, _flush_context):
+    if any(isinstance(obj, User) for obj in chain(session.new, session.dirty, session.deleted)):
+        session.info["users_changed"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_user_cache(session):
+    if session.info.pop("users_changed", False) and has_app_context():
+        user_cache = current_app.extensions.get("user_cache")
+        if user_cache is not None:
+            user_cache.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_user_changes(session):
+    session.info.pop("users_changed", None)
 
 
 def get_current_user():
+    """Текущий пользователь: не больше одного обращения к БД за запрос,
+    а чаще всего ни одного благодаря кэшу с коротким TTL."""
+
     user_id = session.get("user_id")
-    if user_id is None:
-        return None
-    return User.query.get(user_id)
+    # g живёт столько же, сколько контекст приложения: в скриптах и тестах
+    # внутри одного app_context() идут разные запросы, поэтому сверяем id
+    memo = g.get("current_user")
+    if memo is not None and memo[0] == user_id:
+        return memo[1]
+
+    user = None if user_id is None else current_app.extensions["user_cache"].get(user_id)
+    g.current_user = (user_id, user)
+    return user
 
 
 def login_user(user):
     session["user_id"] = user.id
+    g.pop("current_user", None)
 
 
 def logout_user():
-    session.pop("user_id", None)
+    user_id = session.pop("user_id", None)
+    if user_id is not None:
+        current_app.extensions["user_cache"].forget(user_id)
+    g.pop("current_user", None)
 
 
 def admin_required(view_func):
@@ -0,0 +1,100 @@
+"""Вес картинок на странице тир-листа до и после миниатюр.
+
+Рендерит /tier-list с выключенными и включёнными миниатюрами, для каждого
+<picture> выбирает файл так же, как браузер (первый поддерживаемый <source>,
+кандидат из srcset под заданный DPR), и суммирует размеры уникальных файлов.
+Запуск: ``python benchmarks/bench_page_weight.py [--dpr 2] [--formats avif,webp]``.
+"""
+
+import argparse
+import re
+import sys
+from pathlib import Path
+
+def _ensure_project_root():
+    """Make sure the repository root is importable when run as a script."""
+
+    project_root = Path(__file__).resolve().parents[1]
+    project_root_str = str(project_root)
+    if project_root_str not in sys.path:
+        sys.path.insert(0, project_root_str)
+
+
+if __package__ is None or __package__ == "":
+    _ensure_project_root()
+
+from app import create_app
+
+_PICTURE = re.compile(r"<picture\b.*?</picture>", re.S)
+_SOURCE = re.compile(r'<source srcset="([^"]+)" type="([^"]+)"(?: sizes="(\d+)px")?>')
+_IMG = re.compile(r'<img src="([^"]+)"(?: srcset="([^"]+)" sizes="(\d+)px")?')
+
+
+def pick_candidate(srcset: str, css_width: int | None, dpr: float) -> str:
+    candidates = []
+    for part in srcset.split(","):
+        url, _, descriptor = part.strip().partition(" ")
+        width = int(descriptor[:-1]) if descriptor.endswith("w") else 0
+        candidates.append((width, url))
+    if not css_width or not any(width for width, _url in candidates):
+        return candidates[0][1]
+    needed = css_width * dpr
+    fitting = sorted(c for c in candidates if c[0] >= needed)
+    return (fitting[0] if fitting else max(candidates))[1]
+
+
+def chosen_urls(html: str, formats: set[str], dpr: float) -> list[str]:
+    urls = []
+    for picture in _PICTURE.findall(html):
+        chosen = None
+        for srcset, mime, sizes in _SOURCE.findall(picture):
+            if mime.split("/")[-1] in formats:
+                chosen = pick_candidate(srcset, int(sizes) if sizes else None, dpr)
+                break
+        if chosen is None:
+            img = _IMG.search(picture)
+            src, srcset, sizes = img.groups()
+            chosen = pick_candidate(srcset, int(sizes), dpr) if srcset else src
+        urls.append(chosen)
+    return urls
+
+
+def page_weight(overrides: dict, formats: set[str], dpr: float) -> tuple[int, int, int]:
+    app = create_app(overrides)
+    client = app.test_client()
+    html = client.get("/tier-list").get_data(as_text=True)
+    urls = set(chosen_urls(html, formats, dpr))
+    total = sum(len(client.get(url).data) for url in urls)
+    return len(html.encode("utf-8")), len(urls), total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--dpr", type=float, default=1.0)
+    parser.add_argument("--formats", default="avif,webp,jpeg",
+                        help="какие типы поддерживает браузер (jpeg/png есть всегда)")
+    parser.add_argument("--database", help="путь к другой SQLite базе")
+    parser.add_argument("--media-dir", help="другая папка с оригиналами")
+    args = parser.parse_args()
+
+    base = {}
+    if args.database:
+        base["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{Path(args.database).resolve()}"
+    if args.media_dir:
+        base["MEDIA_IMAGES_DIR"] = str(Path(args.media_dir).resolve())
+    formats = set(args.formats.split(",")) | {"jpeg", "png"}
+
+    rows = [
+        ("оригиналы", page_weight({**base, "THUMBNAILS_ENABLED": False}, formats, args.dpr)),
+        ("миниатюры", page_weight({**base, "THUMBNAILS_ENABLED": True}, formats, args.dpr)),
+    ]
+    print(f"{'вариант':<12}{'HTML, КиБ':>12}{'файлов':>8}{'картинки, КиБ':>16}")
+    for label, (html_bytes, files, image_bytes) in rows:
+        print(f"{label:<12}{html_bytes / 1024:>12.1f}{files:>8}{image_bytes / 1024:>16.1f}")
+    before, after = rows[0][1][2], rows[1][1][2]
+    if before:
+        print(f"Экономия на картинках: {100 * (before - after) / before:.1f}%")
+
+
+if __name__ == "__main__":
+    main()
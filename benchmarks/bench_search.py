@@ -0,0 +1,123 @@
+"""Сравнение поиска через FTS5 и через LIKE на синтетических данных.
+
+Запуск: ``python benchmarks/bench_search.py [--characters 10000]``.
+База создаётся во временной папке, рабочая tierlist.db не трогается.
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+def _ensure_project_root():
+    """Make sure the repository root is importable when run as a script."""
+
+    project_root = Path(__file__).resolve().parents[1]
+    project_root_str = str(project_root)
+    if project_root_str not in sys.path:
+        sys.path.insert(0, project_root_str)
+
+
+if __package__ is None or __package__ == "":
+    _ensure_project_root()
+
+from sqlalchemy import insert
+
+from app import create_app
+from models import Character, Skill, db
+
+SYLLABLES = ["ан", "бе", "ви", "го", "да", "ле", "ми", "но", "ра", "се", "та", "фу", "ша", "ю", "я"]
+COMMON_WORDS = ["удар", "щит", "пламя", "лёд", "рывок", "урон", "враг", "союзник"]
+RARE_WORDS = ["ловушка", "исцеление", "клинок", "буря", "метка", "телепорт", "яд", "барьер"]
+QUERIES = ["ле", "Мира", "щит", "пламя удар", "ловушка", "исцел", "ра", "несуществующее"]
+
+
+def _word(rng):
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+
+
+def _text(rng, vocabulary, words):
+    # Частые слова встречаются почти у всех, редкие — у немногих персонажей
+    return " ".join(
+        rng.choice(COMMON_WORDS) if rng.random() < 0.1 else rng.choice(vocabulary)
+        for _ in range(words)
+    )
+
+
+def seed(count: int, rng: random.Random):
+    vocabulary = [_word(rng) for _ in range(5000)] + RARE_WORDS
+    characters = [
+        {
+            "id": idx,
+            "name": _word(rng).capitalize(),
+            "slug": f"char-{idx}",
+            "short_summary": _text(rng, vocabulary, 12),
+            "cons": _text(rng, vocabulary, 8),
+            "review": _text(rng, vocabulary, 60),
+        }
+        for idx in range(1, count + 1)
+    ]
+    skills = [
+        {
+            "character_id": idx,
+            "name": _text(rng, vocabulary, 2).capitalize(),
+            "type": kind,
+            "description": _text(rng, vocabulary, 15),
+        }
+        for idx in range(1, count + 1)
+        for kind in ("Пассивка", "Навык", "Ультимейт")
+    ]
+    db.session.execute(insert(Character), characters)
+    db.session.execute(insert(Skill), skills)
+    db.session.commit()
+
+
+def timed(func, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--characters", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp}/bench.db"})
+        with app.app_context():
+            db.create_all()
+            seed(args.characters, random.Random(args.seed))
+            search_index = app.extensions["search_index"]
+
+            started = time.perf_counter()
+            search_index.install(db.session, rebuild=True)
+            db.session.commit()
+            print(f"Индекс построен за {(time.perf_counter() - started) * 1000:.0f} мс "
+                  f"({args.characters} персонажей)")
+
+            print(f"{'запрос':<16}{'LIKE, мс':>10}{'найдено':>9}{'FTS5, мс':>10}{'найдено':>9}")
+            for query in QUERIES:
+                like_ms, like_ids = timed(
+                    lambda: db.session.query(Character.id)
+                    .filter(Character.name.ilike(f"%{query}%"))
+                    .all(),
+                    args.repeat,
+                )
+                fts_ms, fts_ids = timed(
+                    lambda: search_index.matching_ids(db.session, query, ranked=True),
+                    args.repeat,
+                )
+                print(f"{query:<16}{like_ms:>10.2f}{len(like_ids):>9}{fts_ms:>10.2f}{len(fts_ids):>9}")
+
+
+if __name__ == "__main__":
+    main()
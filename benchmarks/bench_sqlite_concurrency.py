@@ -0,0 +1,152 @@
+"""Конкурентный доступ к SQLite: N читателей и один писатель.
+
+Сравнивает профили SQLITE_PROFILE=default и production (WAL + прагмы):
+задержки читателей, пропускную способность и ошибки "database is locked".
+Запуск: ``python benchmarks/bench_sqlite_concurrency.py --readers 8 --seconds 5``.
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+def _ensure_project_root():
+    """Make sure the repository root is importable when run as a script."""
+
+    project_root = Path(__file__).resolve().parents[1]
+    project_root_str = str(project_root)
+    if project_root_str not in sys.path:
+        sys.path.insert(0, project_root_str)
+
+
+if __package__ is None or __package__ == "":
+    _ensure_project_root()
+
+from sqlalchemy import insert
+from sqlalchemy.exc import OperationalError
+
+from app import create_app
+from models import Character, TIER_WEIGHTS, db
+
+CLASSES = ["Дуэлянт", "Страж", "Поддержка", "Штурмовик", "Манипулятор"]
+TIERS = list(TIER_WEIGHTS)
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def run_profile(profile: str, args) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app({
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp}/bench.db",
+            "SQLITE_PROFILE": profile,
+            "SQLITE_POOL_SIZE": args.readers + 2,
+        })
+        rng = random.Random(args.seed)
+        with app.app_context():
+            db.create_all()
+            db.session.execute(insert(Character), [
+                {
+                    "name": f"Персонаж {idx}",
+                    "slug": f"char-{idx}",
+                    "class_name": rng.choice(CLASSES),
+                    "tier_weight": rng.randint(1, 7),
+                    "review": "текст " * 200,
+                }
+                for idx in range(1, args.characters + 1)
+            ])
+            db.session.commit()
+
+        stop = threading.Event()
+        lock = threading.Lock()
+        read_ms, write_ms = [], []
+        errors = {"read": 0, "write": 0}
+
+        def reader(seed):
+            local = random.Random(seed)
+            while not stop.is_set():
+                started = time.perf_counter()
+                try:
+                    with app.app_context():
+                        Character.query.filter(
+                            Character.class_name == local.choice(CLASSES)
+                        ).order_by(Character.tier_weight.desc(), Character.name).all()
+                except OperationalError:
+                    with lock:
+                        errors["read"] += 1
+                    continue
+                with lock:
+                    read_ms.append((time.perf_counter() - started) * 1000)
+
+        def writer():
+            local = random.Random(args.seed + 1)
+            while not stop.is_set():
+                started = time.perf_counter()
+                try:
+                    with app.app_context():
+                        ch = db.session.get(Character, local.randint(1, args.characters))
+                        ch.tier_weapon = local.choice(TIERS)
+                        ch.review = "обновлено " * local.randint(100, 400)
+                        db.session.commit()
+                except OperationalError:
+                    with lock:
+                        errors["write"] += 1
+                    continue
+                with lock:
+                    write_ms.append((time.perf_counter() - started) * 1000)
+                time.sleep(args.write_pause / 1000)
+
+        threads = [threading.Thread(target=reader, args=(i,)) for i in range(args.readers)]
+        threads.append(threading.Thread(target=writer))
+        for thread in threads:
+            thread.start()
+        time.sleep(args.seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+        with app.app_context():
+            db.engine.dispose()
+
+        return {
+            "profile": profile,
+            "reads_per_s": len(read_ms) / args.seconds,
+            "read_p50": statistics.median(read_ms) if read_ms else 0.0,
+            "read_p99": percentile(read_ms, 99),
+            "read_max": max(read_ms, default=0.0),
+            "writes_per_s": len(write_ms) / args.seconds,
+            "write_p99": percentile(write_ms, 99),
+            "read_errors": errors["read"],
+            "write_errors": errors["write"],
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--characters", type=int, default=2000)
+    parser.add_argument("--write-pause", type=float, default=5.0, help="пауза писателя, мс")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    results = [run_profile(profile, args) for profile in ("default", "production")]
+    columns = list(results[0])
+    print("".join(f"{name:>14}" for name in columns))
+    for row in results:
+        print("".join(
+            f"{value:>14.2f}" if isinstance(value, float) else f"{value:>14}"
+            for value in row.values()
+        ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""Время запуска: импорт приложения, create_app(), первый и установившийся запрос.
+
+Каждый замер идёт в новом процессе Python, как после деплоя или перезапуска
+воркера. Варианты: без кэша байткода шаблонов и с заполненным кэшем, оба без
+прогрева и с прогревом (TEMPLATE_WARMUP); при прогреве отдельно видно, сколько
+заняла загрузка шаблонов. Для каждого печатаются медианы по ``--repeat``
+запускам. Запуск::
+
+    python benchmarks/bench_startup.py --characters 2000 --repeat 5
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+def _ensure_project_root():
+    """Make sure the repository root is importable when run as a script."""
+
+    project_root = Path(__file__).resolve().parents[1]
+    project_root_str = str(project_root)
+    if project_root_str not in sys.path:
+        sys.path.insert(0, project_root_str)
+
+
+if __package__ is None or __package__ == "":
+    _ensure_project_root()
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+STEADY_REQUESTS = 20
+
+
+def measure(config: dict, paths, warmup: bool) -> dict:
+    """Один запуск в текущем (свежем) процессе, времена в миллисекундах."""
+
+    started = time.perf_counter()
+    from app import create_app, warm_up
+
+    imported = time.perf_counter()
+    app = create_app(config)
+    created = time.perf_counter()
+    result = {
+        "import_ms": (imported - started) * 1000,
+        "create_app_ms": (created - imported) * 1000,
+        "templates_ms": 0.0,
+        "warm_up_ms": 0.0,
+    }
+    if warmup:
+        stats = warm_up(app)
+        result["templates_ms"] = stats["templates_ms"]
+        result["warm_up_ms"] = stats["total_ms"]
+
+    client = app.test_client()
+    first, steady = {}, {}
+    for path in paths:
+        request_started = time.perf_counter()
+        response = client.get(path)
+        first[path] = (time.perf_counter() - request_started) * 1000
+        if response.status_code != 200:
+            raise RuntimeError(f"{path}: HTTP {response.status_code}")
+    for path in paths:
+        samples = []
+        for _ in range(STEADY_REQUESTS):
+            request_started = time.perf_counter()
+            client.get(path)
+            samples.append((time.perf_counter() - request_started) * 1000)
+        steady[path] = statistics.median(samples)
+    result["first_ms"] = first
+    result["steady_ms"] = steady
+    return result
+
+
+def run_child(config: dict, paths, warmup: bool) -> dict:
+    payload = json.dumps({"config": config, "paths": paths, "warmup": warmup})
+    output = subprocess.run(
+        [sys.executable, str(Path(__file__).resolve()), "--child", payload],
+        cwd=PROJECT_ROOT, check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def summarize(runs) -> dict:
+    paths = list(runs[0]["first_ms"])
+    return {
+        "import_ms": statistics.median(run["import_ms"] for run in runs),
+        "create_app_ms": statistics.median(run["create_app_ms"] for run in runs),
+        "templates_ms": statistics.median(run["templates_ms"] for run in runs),
+        "warm_up_ms": statistics.median(run["warm_up_ms"] for run in runs),
+        "first_ms": {path: statistics.median(run["first_ms"][path] for run in runs) for path in paths},
+        "steady_ms": {path: statistics.median(run["steady_ms"][path] for run in runs) for path in paths},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--characters", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5, help="запусков на вариант")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        task = json.loads(args.child)
+        print(json.dumps(measure(task["config"], task["paths"], task["warmup"])))
+        return
+
+    from app import create_app
+    from benchmarks.datagen import populate
+    from migrations import apply_migrations
+    from models import db
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config = {
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp}/bench.db",
+            "MEDIA_IMAGES_DIR": f"{tmp}/images",
+            "MEDIA_THUMBS_DIR": f"{tmp}/thumbs",
+            "TEMPLATE_CACHE_DIR": "",
+        }
+        app = create_app(config)
+        characters = populate(app, args.characters, args.seed, f"{tmp}/images")
+        with app.app_context():
+            apply_migrations(db.engine, log=lambda _message: None)
+            db.engine.dispose()
+        paths = ["/tier-list", f"/character/{characters[0]['slug']}", "/api/tier-list"]
+
+        cache_dir = f"{tmp}/templates"
+        # Первый запуск с кэшем заполняет его, в замеры он не входит
+        run_child(config | {"TEMPLATE_CACHE_DIR": cache_dir}, paths, warmup=True)
+        variants = (
+            ("без кэша шаблонов", "", False),
+            ("готовый кэш", cache_dir, False),
+            ("без кэша + прогрев", "", True),
+            ("готовый кэш + прогрев", cache_dir, True),
+        )
+        results = {}
+        for label, template_cache, warmup in variants:
+            runs = [
+                run_child(config | {"TEMPLATE_CACHE_DIR": template_cache}, paths, warmup)
+                for _ in range(args.repeat)
+            ]
+            results[label] = summarize(runs)
+
+    print(f"Персонажей: {args.characters}, запусков на вариант: {args.repeat}; времена в мс (медиана)")
+    header = f"{'вариант':<24} {'import':>7} {'create':>7} {'шаблоны':>8} {'прогрев':>8}"
+    for path in paths:
+        name = path.split("/")[1] or path
+        header += f" {'1-й ' + name:>16} {'далее':>7}"
+    print(header)
+    for label, row in results.items():
+        line = (
+            f"{label:<24} {row['import_ms']:>7.0f} {row['create_app_ms']:>7.1f} "
+            f"{row['templates_ms']:>8.1f} {row['warm_up_ms']:>8.1f}"
+        )
+        for path in paths:
+            line += f" {row['first_ms'][path]:>16.1f} {row['steady_ms'][path]:>7.2f}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
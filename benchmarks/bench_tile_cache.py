@@ -0,0 +1,108 @@
+"""Время рендера тир-листа с кэшем плиток персонажей и без него.
+
+Запуск: ``python benchmarks/bench_tile_cache.py [--characters 500]``.
+База создаётся во временной папке, кэш целых страниц отключён, чтобы
+каждый запрос действительно рендерил шаблон.
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+def _ensure_project_root():
+    """Make sure the repository root is importable when run as a script."""
+
+    project_root = Path(__file__).resolve().parents[1]
+    project_root_str = str(project_root)
+    if project_root_str not in sys.path:
+        sys.path.insert(0, project_root_str)
+
+
+if __package__ is None or __package__ == "":
+    _ensure_project_root()
+
+from sqlalchemy import insert
+
+from app import create_app
+from models import Character, compute_overall_tier, db
+
+TIERS = ["SSS", "SS", "S", "A", "B", "C", "D", None]
+CLASSES = ["Страж", "Дуэлянт", "Манипулятор", "Поддержка", "Штурмовик"]
+FACTIONS = ["СТУ", "Урбино", "Ножницы"]
+DIFFICULTIES = ["Лёгкий", "Средний", "Сложный", "Для новичков"]
+FILTERS = ["", "?class_name=Страж", "?faction=СТУ", "?difficulty=Сложный"]
+
+
+def seed(count: int, rng: random.Random):
+    characters = []
+    for idx in range(1, count + 1):
+        tiers = [rng.choice(TIERS) for _ in range(4)]
+        overall_tier, tier_weight = compute_overall_tier(*tiers)
+        characters.append({
+            "id": idx,
+            "name": f"Персонаж {idx}",
+            "slug": f"char-{idx}",
+            "class_name": rng.choice(CLASSES),
+            "faction": rng.choice(FACTIONS),
+            "difficulty": rng.choice(DIFFICULTIES),
+            "balance_status": rng.choice([None, None, "nerf", "buff", "rework"]),
+            "tier_weapon": tiers[0],
+            "tier_skill": tiers[1],
+            "tier_passive": tiers[2],
+            "tier_ultimate": tiers[3],
+            "image_name": f"char-{idx}",
+            "overall_tier": overall_tier,
+            "tier_weight": tier_weight,
+        })
+    db.session.execute(insert(Character), characters)
+    db.session.commit()
+
+
+def measure(database_uri: str, tile_cache_size: int, repeat: int):
+    app = create_app({
+        "SQLALCHEMY_DATABASE_URI": database_uri,
+        "TIER_LIST_CACHE_SIZE": 0,
+        "TIER_TILE_CACHE_SIZE": tile_cache_size,
+    })
+    client = app.test_client()
+    for url in FILTERS:  # прогрев: шаблоны скомпилированы, кэш плиток заполнен
+        client.get(f"/tier-list{url}")
+
+    samples = {url: [] for url in FILTERS}
+    for _ in range(repeat):
+        for url in FILTERS:
+            started = time.perf_counter()
+            client.get(f"/tier-list{url}")
+            samples[url].append((time.perf_counter() - started) * 1000)
+    return {url: statistics.median(values) for url, values in samples.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--characters", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_uri = f"sqlite:///{tmp}/bench.db"
+        app = create_app({"SQLALCHEMY_DATABASE_URI": database_uri})
+        with app.app_context():
+            db.create_all()
+            seed(args.characters, random.Random(args.seed))
+
+        without_cache = measure(database_uri, 0, args.repeat)
+        with_cache = measure(database_uri, args.characters * 2, args.repeat)
+
+    print(f"{args.characters} персонажей, медиана GET /tier-list без кэша страниц")
+    print(f"{'фильтр':<24}{'без плиток, мс':>16}{'с плитками, мс':>16}")
+    for url in FILTERS:
+        print(f"{url or '(все)':<24}{without_cache[url]:>16.1f}{with_cache[url]:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""Пропускная способность: сервер разработки Flask против serve.py (gunicorn).
+
+Оба сервера запускаются отдельными процессами на одной синтетической базе,
+нагрузку дают ``--clients`` процессов-клиентов, каждый со своим
+keep-alive подключением: тир-лист со случайными фильтрами, страницы
+персонажей и /api/tier-list. Для каждого сервера печатаются запросы в
+секунду, p50/p95/p99 и число ошибок. Запуск::
+
+    python benchmarks/bench_wsgi_servers.py --clients 16 --seconds 10 --workers 4 --threads 4
+
+Клиенты работают на той же машине и делят с сервером процессор, поэтому
+сравнивать стоит прогоны с одинаковыми ``--clients``.
+"""
+
+import argparse
+import http.client
+import multiprocessing
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from urllib.parse import quote
+
+def _ensure_project_root():
+    """Make sure the repository root is importable when run as a script."""
+
+    project_root = Path(__file__).resolve().parents[1]
+    project_root_str = str(project_root)
+    if project_root_str not in sys.path:
+        sys.path.insert(0, project_root_str)
+
+
+if __package__ is None or __package__ == "":
+    _ensure_project_root()
+
+from app import create_app
+from benchmarks.datagen import populate
+from benchmarks.harness import percentile, tier_list_url
+from migrations import apply_migrations
+from models import db
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+HOST = "127.0.0.1"
+
+# Сервер разработки запускается так же, как в app.py, но на своём порту
+DEV_SERVER = (
+    "import sys; from wsgi import app; "
+    "app.run(host=sys.argv[1], port=int(sys.argv[2]), debug=False)"
+)
+
+
+def request_paths(characters, count: int, seed: int):
+    rng = random.Random(seed)
+    paths = []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < 0.5:
+            paths.append(quote(tier_list_url(rng), safe="/?&="))
+        elif roll < 0.85:
+            paths.append(f"/character/{rng.choice(characters)['slug']}")
+        else:
+            paths.append("/api/tier-list")
+    return paths
+
+
+def start_server(kind: str, port: int, env: dict, args) -> subprocess.Popen:
+    if kind == "dev":
+        command = [sys.executable, "-c", DEV_SERVER, HOST, str(port)]
+    else:
+        command = [sys.executable, "serve.py"]
+        env = env | {
+            "WEB_BIND": f"{HOST}:{port}",
+            "WEB_WORKERS": str(args.workers),
+            "WEB_THREADS": str(args.threads),
+        }
+    return subprocess.Popen(
+        command, cwd=PROJECT_ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+
+
+def wait_ready(port: int, process: subprocess.Popen, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"сервер завершился с кодом {process.returncode}")
+        try:
+            connection = http.client.HTTPConnection(HOST, port, timeout=2)
+            connection.request("GET", "/tier-list")
+            if connection.getresponse().status == 200:
+                connection.close()
+                return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("сервер не ответил вовремя")
+
+
+def client_loop(task):
+    """Один клиент: запросы по кругу до истечения времени."""
+
+    port, paths, seconds = task
+    connection = http.client.HTTPConnection(HOST, port, timeout=30)
+    latencies, errors = [], 0
+    deadline = time.perf_counter() + seconds
+    idx = 0
+    while time.perf_counter() < deadline:
+        path = paths[idx % len(paths)]
+        idx += 1
+        started = time.perf_counter()
+        try:
+            connection.request("GET", path)
+            response = connection.getresponse()
+            response.read()
+            if response.status != 200:
+                errors += 1
+            # Сервер разработки закрывает соединение после ответа
+            if response.will_close:
+                connection.close()
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            connection.close()
+            continue
+        latencies.append(time.perf_counter() - started)
+    connection.close()
+    return latencies, errors
+
+
+def run_load(port: int, paths, clients: int, seconds: float) -> dict:
+    chunk = len(paths) // clients
+    tasks = [(port, paths[idx * chunk:(idx + 1) * chunk], seconds) for idx in range(clients)]
+    started = time.perf_counter()
+    with multiprocessing.Pool(clients) as pool:
+        results = pool.map(client_loop, tasks)
+    elapsed = time.perf_counter() - started
+    latencies = [value for samples, _errors in results for value in samples]
+    return {
+        "requests": len(latencies),
+        "rps": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "errors": sum(errors for _samples, errors in results),
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind((HOST, 0))
+        return sock.getsockname()[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--characters", type=int, default=2000)
+    parser.add_argument("--clients", type=int, default=16, help="параллельных клиентов")
+    parser.add_argument("--seconds", type=float, default=10.0, help="длительность прогона")
+    parser.add_argument("--workers", type=int, default=max(2, os.cpu_count() or 1), help="процессов gunicorn")
+    parser.add_argument("--threads", type=int, default=4, help="потоков в процессе gunicorn")
+    parser.add_argument("--server", action="append", choices=("dev", "gunicorn"),
+                        help="запустить только указанные серверы")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database = f"sqlite:///{tmp}/bench.db"
+        app = create_app({"SQLALCHEMY_DATABASE_URI": database})
+        characters = populate(app, args.characters, args.seed)
+        with app.app_context():
+            apply_migrations(db.engine, log=lambda _message: None)
+            db.engine.dispose()
+
+        paths = request_paths(characters, args.clients * 500, args.seed)
+        env = os.environ | {
+            "DATABASE_URL": database,
+            "SQLITE_PROFILE": "production",
+        }
+        results = {}
+        for kind in args.server or ("dev", "gunicorn"):
+            port = free_port()
+            process = start_server(kind, port, env, args)
+            try:
+                wait_ready(port, process)
+                # Прогрев: шаблоны, кэши и подключения во всех воркерах
+                run_load(port, paths, args.clients, seconds=1.0)
+                results[kind] = run_load(port, paths, args.clients, args.seconds)
+            finally:
+                process.terminate()
+                process.wait(timeout=30)
+
+    label = {"dev": "app.run (dev)", "gunicorn": f"gunicorn {args.workers}×{args.threads}"}
+    print(f"{'сервер':<20} {'запросов':>9} {'req/s':>9} {'p50 мс':>8} {'p95 мс':>8} {'p99 мс':>8} {'ошибок':>7}")
+    for kind, row in results.items():
+        print(
+            f"{label[kind]:<20} {row['requests']:>9} {row['rps']:>9.1f} {row['p50_ms']:>8.1f} "
+            f"{row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f} {row['errors']:>7}"
+        )
+    if len(results) == 2:
+        print(f"gunicorn / dev: ×{results['gunicorn']['rps'] / results['dev']['rps']:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""Генератор синтетических данных для бенчмарков.
+
+Создаёт тысячи персонажей с навыками, распределёнными по фракциям, классам
+и сложности примерно как в настоящей игре, администратора ``bench`` и
+портреты-заглушки. Одинаковый ``seed`` даёт одинаковые данные, поэтому
+результаты разных коммитов можно сравнивать.
+
+Запуск: ``python benchmarks/datagen.py --characters 5000 --database /tmp/bench.db
+--images /tmp/bench-images``.
+"""
+
+import argparse
+import io
+import random
+import struct
+import sys
+import zlib
+from pathlib import Path
+
+def _ensure_project_root():
+    """Make sure the repository root is importable when run as a script."""
+
+    project_root = Path(__file__).resolve().parents[1]
+    project_root_str = str(project_root)
+    if project_root_str not in sys.path:
+        sys.path.insert(0, project_root_str)
+
+
+if __package__ is None or __package__ == "":
+    _ensure_project_root()
+
+from sqlalchemy import insert
+from sqlalchemy.exc import OperationalError
+from werkzeug.security import generate_password_hash
+
+from models import Character, Skill, User, classify_skill_type, compute_overall_tier, db
+
+try:  # Pillow необязателен: без него заглушки пишутся как простые PNG
+    from PIL import Image
+except ImportError:  # pragma: no cover - зависит от окружения
+    Image = None
+
+# Значение -> относительная частота
+FACTIONS = {"СТУ": 40, "Урбино": 30, "Ножницы": 30}
+CLASSES = {"Дуэлянт": 30, "Страж": 20, "Манипулятор": 20, "Поддержка": 15, "Штурмовик": 15}
+DIFFICULTIES = {"Средний": 40, "Сложный": 30, "Лёгкий": 20, "Для новичков": 10}
+TIERS = {"SSS": 3, "SS": 7, "S": 15, "A": 25, "B": 25, "C": 15, "D": 7, None: 3}
+BALANCE = {None: 85, "nerf": 5, "buff": 7, "rework": 3}
+EXTRA_SKILL_TYPES = ["Пассивный", "Активный", "Сигнатурный", "Особый", "Форма"]
+
+SYLLABLES = ["ан", "бе", "ви", "го", "да", "ле", "ми", "но", "ра", "се", "та", "фу", "ша", "ю", "ки"]
+WORDS = [
+    "урон", "щит", "рывок", "союзник", "враг", "пламя", "лёд", "ловушка", "метка",
+    "исцеление", "клинок", "буря", "барьер", "оглушение", "замедление", "выстрел",
+]
+
+ADMIN_USERNAME = "bench"
+ADMIN_PASSWORD = "bench"
+
+
+def _pick(rng, weights: dict):
+    return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+
+def _word(rng):
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+
+
+def _text(rng, words: int):
+    return " ".join(rng.choice(WORDS) if rng.random() < 0.6 else _word(rng) for _ in range(words))
+
+
+def generate(count: int, seed: int = 42):
+    """Списки словарей для вставки: (персонажи, навыки)."""
+
+    rng = random.Random(seed)
+    characters, skills = [], []
+    for idx in range(1, count + 1):
+        tiers = [_pick(rng, TIERS) for _ in range(4)]
+        overall_tier, tier_weight = compute_overall_tier(*tiers)
+        name = f"{_word(rng).capitalize()} {idx}"
+        characters.append({
+            "id": idx,
+            "name": name,
+            "slug": f"char-{idx}",
+            "class_name": _pick(rng, CLASSES),
+            "faction": _pick(rng, FACTIONS),
+            "difficulty": _pick(rng, DIFFICULTIES),
+            "balance_status": _pick(rng, BALANCE),
+            "tier_weapon": tiers[0],
+            "tier_skill": tiers[1],
+            "tier_passive": tiers[2],
+            "tier_ultimate": tiers[3],
+            "short_summary": _text(rng, rng.randint(10, 30)),
+            "cons": _text(rng, rng.randint(5, 20)),
+            "review": _text(rng, rng.randint(80, 300)),
+            # Примерно у каждого десятого портрета нет — показывается заглушка
+            "image_name": f"char-{idx}" if rng.random() < 0.9 else None,
+            # Вставка идёт в обход ORM-событий, поэтому производные поля считаем сами
+            "overall_tier": overall_tier,
+            "tier_weight": tier_weight,
+        })
+
+        skill_types = ["Пассивка", "Навык", "Ультимейт"]
+        skill_types += rng.sample(EXTRA_SKILL_TYPES, rng.randint(0, 2))
+        for skill_type in skill_types:
+            category, sort_rank = classify_skill_type(skill_type)
+            skills.append({
+                "character_id": idx,
+                "name": _text(rng, 2).capitalize(),
+                "type": skill_type,
+                "description": _text(rng, rng.randint(15, 40)),
+                "cooldown": f"{rng.randint(3, 60)} с",
+                "category": category,
+                "sort_rank": sort_rank,
+            })
+    return characters, skills
+
+
+def _solid_png(color) -> bytes:
+    """Однотонный PNG 32x32 без сторонних библиотек."""
+
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    size = 32
+    raw = b"".join(b"\x00" + bytes(color) * size for _ in range(size))
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", size, size, 8, 2, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(raw))
+        + chunk(b"IEND", b"")
+    )
+
+
+def write_placeholder_images(directory, characters, seed: int = 42, palette: int = 24):
+    """Портреты-заглушки: WebP и PNG 440x550 с Pillow, иначе маленький PNG.
+
+    Кодируется только ``palette`` вариантов цвета, остальные файлы — копии.
+    """
+
+    rng = random.Random(seed)
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    samples = {}
+    for idx in range(palette):
+        color = tuple(rng.randint(40, 220) for _ in range(3))
+        if Image is not None:
+            image = Image.new("RGB", (440, 550), color)
+            for ext, pil_format in (("webp", "WEBP"), ("png", "PNG")):
+                buffer = io.BytesIO()
+                image.save(buffer, pil_format)
+                samples.setdefault(idx, {})[ext] = buffer.getvalue()
+        else:
+            samples[idx] = {"png": _solid_png(color)}
+
+    written = 0
+    for ch in characters:
+        if not ch["image_name"]:
+            continue
+        for ext, body in samples[ch["id"] % palette].items():
+            (directory / f"{ch['image_name']}.{ext}").write_bytes(body)
+            written += 1
+    return written
+
+
+def populate(app, count: int, seed: int = 42, images_dir=None):
+    """Создаёт таблицы и заполняет пустую базу приложения синтетикой."""
+
+    characters, skills = generate(count, seed)
+    with app.app_context():
+        db.create_all()
+        db.session.execute(insert(Character), characters)
+        db.session.execute(insert(Skill), skills)
+        db.session.add(User(
+            username=ADMIN_USERNAME,
+            password_hash=generate_password_hash(ADMIN_PASSWORD),
+            is_admin=True,
+        ))
+        db.session.commit()
+        try:
+            app.extensions["search_index"].install(db.session, rebuild=True)
+            db.session.commit()
+        except OperationalError:
+            db.session.rollback()  # SQLite без FTS5: поиск пойдёт через LIKE
+    if images_dir is not None:
+        write_placeholder_images(images_dir, characters, seed)
+    return characters
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--characters", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database", required=True, help="путь к новой SQLite базе")
+    parser.add_argument("--images", help="папка для портретов-заглушек")
+    args = parser.parse_args()
+
+    from app import create_app
+
+    database = Path(args.database).resolve()
+    if database.exists():
+        parser.error(f"{database} уже существует")
+    overrides = {"SQLALCHEMY_DATABASE_URI": f"sqlite:///{database}"}
+    if args.images:
+        overrides["MEDIA_IMAGES_DIR"] = str(Path(args.images).resolve())
+    app = create_app(overrides)
+    populate(app, args.characters, args.seed, args.images)
+    print(f"OK: {args.characters} персонажей -> {database}")
+
+
+if __name__ == "__main__":
+    main()
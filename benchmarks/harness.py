@@ -0,0 +1,227 @@
+"""Нагрузочный прогон приложения на синтетических данных.
+
+Через тестовый клиент Flask гоняет сценарии: тир-лист с фильтрами, поиск,
+страницы персонажей и сохранения в админке. Для каждого сценария считает
+p50/p95/p99, запросы в секунду и число SQL-выражений и пишет JSON, который
+удобно сравнивать между коммитами::
+
+    python benchmarks/harness.py --output before.json
+    git checkout feature && python benchmarks/harness.py --output after.json --compare before.json
+"""
+
+import argparse
+import json
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+def _ensure_project_root():
+    """Make sure the repository root is importable when run as a script."""
+
+    project_root = Path(__file__).resolve().parents[1]
+    project_root_str = str(project_root)
+    if project_root_str not in sys.path:
+        sys.path.insert(0, project_root_str)
+
+
+if __package__ is None or __package__ == "":
+    _ensure_project_root()
+
+from app import create_app
+from benchmarks.datagen import ADMIN_USERNAME, CLASSES, DIFFICULTIES, FACTIONS, WORDS, populate
+from instrumentation import count_queries
+from models import Character, User, db
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def tier_list_url(rng):
+    """Случайная комбинация фильтров, как их выбирают посетители."""
+
+    params = []
+    if rng.random() < 0.4:
+        params.append(("class_name", rng.choice(list(CLASSES))))
+    if rng.random() < 0.4:
+        params.append(("faction", rng.choice(list(FACTIONS))))
+    if rng.random() < 0.2:
+        params.append(("difficulty", rng.choice(list(DIFFICULTIES))))
+    query = "&".join(f"{key}={value}" for key, value in params)
+    return f"/tier-list?{query}" if query else "/tier-list"
+
+
+def edit_form(ch):
+    """Форма админки с текущими данными персонажа и изменённым тиром оружия."""
+
+    return {
+        "name": ch.name,
+        "slug": ch.slug,
+        "class_name": ch.class_name or "",
+        "faction": ch.faction or "",
+        "balance_status": ch.balance_status or "",
+        "tier_weapon": "S" if ch.tier_weapon != "S" else "A",
+        "tier_skill": ch.tier_skill or "",
+        "tier_passive": ch.tier_passive or "",
+        "tier_ultimate": ch.tier_ultimate or "",
+        "difficulty": ch.difficulty or "",
+        "short_summary": ch.short_summary or "",
+        "cons": ch.cons or "",
+        "review": ch.review or "",
+        "image_name": ch.image_name or "",
+        "skill_id": [str(s.id) for s in ch.skills],
+        "skill_name": [s.name for s in ch.skills],
+        "skill_type": [s.type or "" for s in ch.skills],
+        "skill_description": [s.description or "" for s in ch.skills],
+        "skill_cooldown": [s.cooldown or "" for s in ch.skills],
+    }
+
+
+def build_scenarios(app, characters, rng):
+    """Сценарий -> (нужен ли вход администратора, функция запроса)."""
+
+    slugs = [ch["slug"] for ch in characters]
+    names = [ch["name"].split()[0] for ch in characters]
+
+    def search_url():
+        term = rng.choice(WORDS) if rng.random() < 0.5 else rng.choice(names)[:3]
+        return f"/tier-list?search={term}"
+
+    def save(client):
+        character_id = rng.randint(1, len(characters))
+        with app.app_context():
+            form = edit_form(db.session.get(Character, character_id))
+        return client.post(
+            f"/admin/character/{character_id}/edit",
+            data=form,
+            headers={"X-Requested-With": "XMLHttpRequest"},
+        )
+
+    return {
+        "tier_list": (False, lambda client: client.get(tier_list_url(rng))),
+        "tier_list_search": (False, lambda client: client.get(search_url())),
+        "tier_list_admin": (True, lambda client: client.get(tier_list_url(rng))),
+        "character_detail": (False, lambda client: client.get(f"/character/{rng.choice(slugs)}")),
+        "admin_edit_save": (True, save),
+    }
+
+
+def run_scenario(client, request, count):
+    latencies, sql_counts, errors = [], [], 0
+    started = time.perf_counter()
+    for _ in range(count):
+        request_started = time.perf_counter()
+        with count_queries() as log:
+            response = request(client)
+        latencies.append((time.perf_counter() - request_started) * 1000)
+        sql_counts.append(log.count)
+        if response.status_code >= 400:
+            errors += 1
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": count,
+        "errors": errors,
+        "rps": round(count / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "mean_ms": round(statistics.fmean(latencies), 2),
+        "sql_mean": round(statistics.fmean(sql_counts), 2),
+        "sql_max": max(sql_counts),
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=PROJECT_ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(results, baseline=None):
+    header = f"{'сценарий':<20}{'p50':>9}{'p95':>9}{'p99':>9}{'RPS':>9}{'SQL':>7}{'ошибки':>8}"
+    print(header)
+    for name, stats in results["scenarios"].items():
+        line = (f"{name:<20}{stats['p50_ms']:>9.2f}{stats['p95_ms']:>9.2f}{stats['p99_ms']:>9.2f}"
+                f"{stats['rps']:>9.1f}{stats['sql_mean']:>7.1f}{stats['errors']:>8}")
+        old = (baseline or {}).get("scenarios", {}).get(name)
+        if old and old["p50_ms"]:
+            change = (stats["p50_ms"] - old["p50_ms"]) / old["p50_ms"] * 100
+            line += f"   p50 {change:+.0f}%, SQL {stats['sql_mean'] - old['sql_mean']:+.1f}"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--characters", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=200, help="запросов на сценарий")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--scenario", action="append", help="запустить только указанные сценарии")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--compare", help="JSON прошлого прогона для сравнения")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app({
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp}/bench.db",
+            "MEDIA_IMAGES_DIR": f"{tmp}/images",
+            "MEDIA_THUMBS_DIR": f"{tmp}/thumbs",
+            "TESTING": True,
+        })
+        started = time.perf_counter()
+        characters = populate(app, args.characters, args.seed, f"{tmp}/images")
+        print(f"Данные: {args.characters} персонажей за {time.perf_counter() - started:.1f} с")
+
+        with app.app_context():
+            admin_id = User.query.filter_by(username=ADMIN_USERNAME).one().id
+
+        rng = random.Random(args.seed)
+        scenarios = build_scenarios(app, characters, rng)
+        selected = args.scenario or list(scenarios)
+
+        results = {
+            "meta": {
+                "revision": git_revision(),
+                "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "sqlite": sqlite3.sqlite_version,
+                "characters": args.characters,
+                "requests": args.requests,
+                "seed": args.seed,
+            },
+            "scenarios": {},
+        }
+        for name in selected:
+            needs_admin, request = scenarios[name]
+            client = app.test_client()
+            if needs_admin:
+                with client.session_transaction() as session:
+                    session["user_id"] = admin_id
+            request(client)  # прогрев: компиляция шаблонов, первые подключения
+            results["scenarios"][name] = run_scenario(client, request, args.requests)
+
+    Path(args.output).write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding="utf-8")
+    baseline = None
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+    print_report(results, baseline)
+    print(f"Результаты: {Path(args.output).resolve()}")
+
+
+if __name__ == "__main__":
+    main()
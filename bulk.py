@@ -0,0 +1,407 @@
+"""Массовый импорт и экспорт персонажей с навыками в JSONL и CSV.
+
+JSONL — один персонаж на строку, навыки вложенным списком ``skills``.
+CSV — одна строка на навык: поля персонажа повторяются, навыки одного
+персонажа идут подряд (персонаж без навыков — одна строка с пустыми
+``skill_*``). Персонажи сопоставляются по ``slug``: существующие обновляются
+полями, которые есть в записи, новые создаются. Если в записи есть навыки
+(ключ ``skills`` в JSONL или колонка ``skill_name`` в CSV), они заменяют
+навыки персонажа целиком. В CSV пустая ячейка и NULL неразличимы, поэтому
+пустые ячейки читаются как NULL — так выгружает их экспорт.
+
+Запись идёт пачками: на пачку SELECT по slug, executemany для вставки
+и обновления и один коммит. Ошибочные записи попадают в отчёт с номером
+строки, остальные записи пачки сохраняются.
+"""
+
+import csv
+import io
+import itertools
+import json
+from dataclasses import dataclass, field
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import SQLAlchemyError
+
+from models import (
+    TIER_WEIGHTS,
+    Character,
+    Skill,
+    classify_skill_type,
+    compute_overall_tier,
+    db,
+    notify_characters_changed,
+)
+
+CHARACTER_FIELDS = (
+    "slug", "name", "class_name", "faction", "difficulty", "balance_status",
+    "tier_weapon", "tier_skill", "tier_passive", "tier_ultimate",
+    "short_summary", "cons", "review", "image_name",
+)
+SKILL_FIELDS = ("name", "type", "description", "cooldown", "valid_hits", "level_info")
+TIER_FIELDS = ("tier_weapon", "tier_skill", "tier_passive", "tier_ultimate")
+CSV_FIELDS = CHARACTER_FIELDS + tuple(f"skill_{name}" for name in SKILL_FIELDS)
+
+FORMATS = ("jsonl", "csv")
+EXPORT_CHUNK_SIZE = 500
+
+
+class RecordError(ValueError):
+    """Запись не прошла проверку; текст попадает в отчёт импорта."""
+
+
+def guess_format(filename: str | None) -> str | None:
+    suffix = (filename or "").rsplit(".", 1)[-1].lower()
+    return suffix if suffix in FORMATS else None
+
+
+# ------- Экспорт --------
+
+def _iter_characters(chunk_size: int = EXPORT_CHUNK_SIZE):
+    """Персонажи порциями по id с навыками в порядке показа; память не растёт."""
+
+    columns = [getattr(Character, name) for name in CHARACTER_FIELDS]
+    skill_columns = [getattr(Skill, name) for name in SKILL_FIELDS]
+    after_id = 0
+    while True:
+        rows = db.session.execute(
+            select(Character.id, *columns)
+            .where(Character.id > after_id)
+            .order_by(Character.id)
+            .limit(chunk_size)
+        ).all()
+        if not rows:
+            return
+        ids = [row.id for row in rows]
+        skills = {character_id: [] for character_id in ids}
+        for skill in db.session.execute(
+            select(Skill.character_id, *skill_columns)
+            .where(Skill.character_id.in_(ids))
+            .order_by(Skill.character_id, Skill.sort_rank, Skill.id)
+        ):
+            skills[skill.character_id].append({name: getattr(skill, name) for name in SKILL_FIELDS})
+        for row in rows:
+            record = {name: getattr(row, name) for name in CHARACTER_FIELDS}
+            record["skills"] = skills[row.id]
+            yield record
+        after_id = ids[-1]
+
+
+def export_jsonl():
+    for record in _iter_characters():
+        yield json.dumps(record, ensure_ascii=False) + "\n"
+
+
+def export_csv():
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush():
+        value = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return value
+
+    writer.writerow(CSV_FIELDS)
+    yield flush()
+    for record in _iter_characters():
+        base = [record[name] for name in CHARACTER_FIELDS]
+        for skill in record["skills"] or [{}]:
+            writer.writerow(base + [skill.get(name) for name in SKILL_FIELDS])
+        yield flush()
+
+
+def export_lines(fmt: str):
+    return export_jsonl() if fmt == "jsonl" else export_csv()
+
+
+# ------- Чтение файлов импорта --------
+
+def read_jsonl(lines):
+    """(номер строки, запись) для каждой непустой строки JSONL."""
+
+    for line_no, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            yield line_no, RecordError(f"некорректный JSON: {exc}")
+            continue
+        if not isinstance(record, dict):
+            yield line_no, RecordError("ожидался объект")
+            continue
+        yield line_no, record
+
+
+def read_csv(lines):
+    """Группирует идущие подряд строки с одним slug в одну запись."""
+
+    reader = csv.DictReader(lines)
+    fieldnames = reader.fieldnames or []
+    character_fields = [name for name in CHARACTER_FIELDS if name in fieldnames]
+    has_skills = "skill_name" in fieldnames
+
+    numbered = ((reader.line_num, row) for row in reader)
+    for _slug, group in itertools.groupby(numbered, key=lambda item: (item[1].get("slug") or "").strip()):
+        group = list(group)
+        line_no, first = group[0]
+        record = {name: first[name] or None for name in character_fields}
+        if has_skills:
+            record["skills"] = [
+                {name: row.get(f"skill_{name}") or None for name in SKILL_FIELDS}
+                for _line_no, row in group
+                if (row.get("skill_name") or "").strip()
+            ]
+        yield line_no, record
+
+
+def read_records(lines, fmt: str):
+    return read_jsonl(lines) if fmt == "jsonl" else read_csv(lines)
+
+
+# ------- Импорт --------
+
+# Поля-ключи и перечисления приводятся к виду без пробелов (пустое — NULL),
+# остальные сохраняются как есть, чтобы экспорт и повторный импорт совпадали
+_NORMALIZED_FIELDS = {"slug", "name", "balance_status", "image_name", *TIER_FIELDS}
+
+
+def _clean(value):
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+def _text(value):
+    return None if value is None else str(value)
+
+
+@dataclass
+class ImportReport:
+    created: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    skills: int = 0
+    errors: list = field(default_factory=list)
+
+    def add_error(self, line_no, slug, message):
+        self.errors.append({"line": line_no, "slug": slug, "error": message})
+
+    def as_dict(self):
+        return {
+            "created": self.created,
+            "updated": self.updated,
+            "unchanged": self.unchanged,
+            "skills": self.skills,
+            "errors": self.errors,
+        }
+
+
+class BulkImporter:
+    """Проверяет записи и сохраняет их пачками в обход ORM-событий.
+
+    Производные поля (``overall_tier``, категория навыка) считаются здесь же,
+    а подписчики ``on_characters_changed`` уведомляются после каждой пачки.
+    """
+
+    def __init__(self, balance_statuses, normalize_image_name, batch_size: int = 200):
+        self.balance_statuses = balance_statuses
+        self.normalize_image_name = normalize_image_name
+        self.batch_size = max(1, batch_size)
+
+    def validate(self, record):
+        """Нормализованная копия записи или RecordError."""
+
+        unknown = set(record) - set(CHARACTER_FIELDS) - {"skills"}
+        if unknown:
+            raise RecordError(f"неизвестные поля: {', '.join(sorted(unknown))}")
+
+        values = {
+            name: (_clean if name in _NORMALIZED_FIELDS else _text)(record[name])
+            for name in CHARACTER_FIELDS
+            if name in record
+        }
+        if not values.get("slug"):
+            raise RecordError("не указан slug")
+        if "name" in values and not values["name"]:
+            raise RecordError("пустое имя")
+
+        for name in TIER_FIELDS:
+            if values.get(name) is not None:
+                values[name] = values[name].upper()
+                if values[name] not in TIER_WEIGHTS:
+                    raise RecordError(f"{name}: неизвестный тир {values[name]!r}")
+        if values.get("balance_status") is not None:
+            values["balance_status"] = values["balance_status"].lower()
+            if values["balance_status"] not in self.balance_statuses:
+                raise RecordError(f"balance_status: неизвестное значение {values['balance_status']!r}")
+        if "image_name" in values:
+            values["image_name"] = self.normalize_image_name(values["image_name"])
+
+        skills = None
+        if record.get("skills") is not None:
+            if not isinstance(record["skills"], list):
+                raise RecordError("skills: ожидался список")
+            skills = []
+            for idx, skill in enumerate(record["skills"], start=1):
+                if not isinstance(skill, dict):
+                    raise RecordError(f"навык {idx}: ожидался объект")
+                skill_values = {name: _text(skill.get(name)) for name in SKILL_FIELDS}
+                skill_values["name"] = _clean(skill_values["name"])
+                if not skill_values["name"]:
+                    raise RecordError(f"навык {idx}: не указано имя")
+                skills.append(skill_values)
+        return values, skills
+
+    def run(self, records) -> ImportReport:
+        """Импортирует (номер строки, запись) из ``read_records``."""
+
+        report = ImportReport()
+        batch, batch_slugs = [], set()
+        for line_no, record in records:
+            if isinstance(record, RecordError):
+                report.add_error(line_no, None, str(record))
+                continue
+            try:
+                values, skills = self.validate(record)
+            except RecordError as exc:
+                report.add_error(line_no, _clean(record.get("slug")), str(exc))
+                continue
+            # Повтор slug внутри пачки применяется после предыдущих записей
+            if len(batch) >= self.batch_size or values["slug"] in batch_slugs:
+                self._write_batch(batch, report)
+                batch, batch_slugs = [], set()
+            batch.append((line_no, values, skills))
+            batch_slugs.add(values["slug"])
+        if batch:
+            self._write_batch(batch, report)
+        return report
+
+    def _write_batch(self, batch, report):
+        try:
+            result = self._apply(batch)
+            db.session.commit()
+        except SQLAlchemyError:
+            db.session.rollback()
+            if len(batch) == 1:
+                line_no, values, _skills = batch[0]
+                report.add_error(line_no, values["slug"], "ошибка записи в базу")
+                return
+            # Ищем виноватую запись, сохраняя остальные по одной
+            for item in batch:
+                self._write_batch([item], report)
+            return
+        report.created += result["created"]
+        report.updated += result["updated"]
+        report.unchanged += result["unchanged"]
+        report.skills += result["skills"]
+        for line_no, slug, message in result["rejected"]:
+            report.add_error(line_no, slug, message)
+        notify_characters_changed(result["changed_ids"])
+
+    def _apply(self, batch):
+        """Пишет пачку и возвращает её итоги; неизменившиеся записи пропускает.
+
+        Повторный импорт того же файла не трогает базу: после патча меняются
+        обычно только тиры, а перезапись навыков и текстов дёргает триггеры
+        полнотекстового индекса на каждую строку.
+        """
+
+        slugs = [values["slug"] for _line_no, values, _skills in batch]
+        columns = [getattr(Character, name) for name in CHARACTER_FIELDS]
+        existing = {
+            row.slug: row
+            for row in db.session.execute(select(Character.id, Character.version, *columns).where(Character.slug.in_(slugs)))
+        }
+        current_skills = self._current_skills(
+            [existing[values["slug"]].id for _line_no, values, skills in batch
+             if skills is not None and values["slug"] in existing]
+        )
+
+        result = {"created": 0, "updated": 0, "unchanged": 0, "skills": 0, "rejected": []}
+        inserts, updates, skill_owners, changed_ids = [], [], [], set()
+        for line_no, values, skills in batch:
+            row = existing.get(values["slug"])
+            if row is None:
+                if not values.get("name"):
+                    result["rejected"].append((line_no, values["slug"], "для нового персонажа нужно имя"))
+                    continue
+                params = {name: values.get(name) for name in CHARACTER_FIELDS}
+                params["overall_tier"], params["tier_weight"] = compute_overall_tier(
+                    *(params[name] for name in TIER_FIELDS)
+                )
+                inserts.append(params)
+                if skills:
+                    skill_owners.append((values["slug"], skills))
+                continue
+
+            params = {name: value for name, value in values.items() if getattr(row, name) != value}
+            skills_changed = skills is not None and current_skills.get(row.id, []) != skills
+            if not params and not skills_changed:
+                result["unchanged"] += 1
+                continue
+            if params.keys() & set(TIER_FIELDS):
+                params["overall_tier"], params["tier_weight"] = compute_overall_tier(
+                    *(values.get(name, getattr(row, name)) for name in TIER_FIELDS)
+                )
+            # ORM проверяет version в WHERE и увеличивает её, как при сохранении
+            # из админки; правка одних навыков тоже меняет версию
+            params["id"], params["version"] = row.id, row.version
+            updates.append(params)
+            if skills_changed:
+                skill_owners.append((values["slug"], skills))
+            changed_ids.add(row.id)
+            result["updated"] += 1
+
+        if inserts:
+            db.session.execute(insert(Character), inserts)
+            result["created"] = len(inserts)
+        # executemany требует одинаковый набор ключей, поэтому группируем
+        updates.sort(key=sorted)
+        for _keys, group in itertools.groupby(updates, key=sorted):
+            db.session.execute(update(Character), list(group))
+
+        if skill_owners or inserts:
+            new_slugs = [params["slug"] for params in inserts]
+            ids = dict(db.session.execute(
+                select(Character.slug, Character.id).where(
+                    Character.slug.in_(new_slugs + [slug for slug, _skills in skill_owners])
+                )
+            ).all())
+            changed_ids.update(ids[slug] for slug in new_slugs)
+            owner_ids = [ids[slug] for slug, _skills in skill_owners]
+            skill_rows = []
+            for character_id, (_slug, skills) in zip(owner_ids, skill_owners):
+                for skill in skills:
+                    category, sort_rank = classify_skill_type(skill["type"])
+                    skill_rows.append(skill | {
+                        "character_id": character_id,
+                        "category": category,
+                        "sort_rank": sort_rank,
+                    })
+            if owner_ids:
+                db.session.execute(delete(Skill).where(Skill.character_id.in_(owner_ids)))
+            if skill_rows:
+                db.session.execute(insert(Skill), skill_rows)
+            result["skills"] = len(skill_rows)
+
+        result["changed_ids"] = changed_ids
+        return result
+
+    @staticmethod
+    def _current_skills(character_ids):
+        """Навыки персонажей в порядке показа, как их выгружает экспорт."""
+
+        skills = {}
+        if not character_ids:
+            return skills
+        skill_columns = [getattr(Skill, name) for name in SKILL_FIELDS]
+        for row in db.session.execute(
+            select(Skill.character_id, *skill_columns)
+            .where(Skill.character_id.in_(character_ids))
+            .order_by(Skill.character_id, Skill.sort_rank, Skill.id)
+        ):
+            skills.setdefault(row.character_id, []).append({name: getattr(row, name) for name in SKILL_FIELDS})
+        return skills
@@ -0,0 +1,113 @@
+"""Простые in-process кэши для публичных страниц."""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+
+class LRUCache:
+    """Потокобезопасный словарь ограниченного размера с вытеснением по LRU."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = max(int(maxsize), 0)
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                return default
+            return self._data[key]
+
+    def set(self, key, value):
+        if not self.maxsize:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            return self._data.pop(key, default)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class Generation:
+    """Счётчик версий данных: растёт при каждой записи и помнит её время."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0
+        self.changed_at = datetime.now(timezone.utc).replace(microsecond=0)
+
+    def bump(self):
+        with self._lock:
+            self.value += 1
+            self.changed_at = datetime.now(timezone.utc).replace(microsecond=0)
+            return self.value
+
+
+class ChangeStamp:
+    """Метка изменений, общая для процессов: время изменения файла.
+
+    Кэши выше живут в памяти одного процесса; когда воркеров несколько (или
+    данные меняет скрипт из database/), остальные процессы узнают о записи
+    по метке и сбрасывают свои кэши. Проверка — один stat на запрос.
+    Без пути (база в памяти, её видит только этот процесс) метка ничего не делает.
+    """
+
+    def __init__(self, path):
+        self.path = None if path is None else str(path)
+        self._lock = threading.Lock()
+        self._seen = self._read()
+
+    def _read(self):
+        if self.path is None:
+            return None
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def touch(self):
+        """Отмечает изменение данных этим процессом."""
+
+        if self.path is None:
+            return
+        with self._lock:
+            before = self._read()
+            # Время ставим явно и строго больше прежнего: mtime, выставленный
+            # системой, может совпасть у двух записей подряд
+            stamp = max(time.time_ns(), (before or 0) + 1)
+            try:
+                with open(self.path, "a"):
+                    pass
+                os.utime(self.path, ns=(stamp, stamp))
+            except OSError:
+                return
+            # Запоминаем метку до записи, а не свою: если с прошлой проверки
+            # данные менял другой процесс, changed() это заметит. Цена — один
+            # лишний сброс кэшей в этом процессе после его же записи.
+            self._seen = before
+
+    def changed(self) -> bool:
+        """Менял ли данные другой процесс с прошлой проверки."""
+
+        current = self._read()
+        with self._lock:
+            if current == self._seen:
+                return False
+            self._seen = current
+            return True
@@ -0,0 +1,102 @@
+"""Сжатие ответов: выбор кодировки по Accept-Encoding и сами кодеки."""
+
+import gzip
+
+try:  # brotli — необязательная зависимость
+    import brotli
+except ImportError:  # pragma: no cover - зависит от окружения
+    brotli = None
+
+# Типы, которые имеет смысл сжимать; картинки и архивы уже сжаты
+COMPRESSIBLE_MIMETYPES = frozenset({
+    "text/html",
+    "text/css",
+    "text/plain",
+    "text/csv",
+    "text/javascript",
+    "application/javascript",
+    "application/json",
+    "application/x-ndjson",
+    "application/xml",
+    "image/svg+xml",
+})
+
+# Расширения готовых сжатых копий статики (см. database/precompress_static.py)
+PRECOMPRESSED_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+# Уровни для сжатия на лету: brotli на максимальном качестве в десятки раз
+# медленнее, его оставляем для кэшируемых и заранее сжатых ответов
+DYNAMIC_LEVELS = {"br": 5, "gzip": 6}
+
+
+def available_encodings():
+    """Кодировки, которые сервер умеет отдавать, в порядке предпочтения."""
+
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate_encoding(request, encodings=None):
+    """Лучшая кодировка из Accept-Encoding клиента или None.
+
+    ``encodings`` — свои варианты в порядке предпочтения, например кодировки
+    готовых файлов; по умолчанию те, что сервер умеет сжимать сам.
+    """
+
+    accepted = request.accept_encodings
+    for encoding in encodings if encodings is not None else available_encodings():
+        if accepted[encoding] > 0:
+            return encoding
+    return None
+
+
+def compress(body: bytes, encoding: str, level: int | None = None) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=11 if level is None else level)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=6 if level is None else level, mtime=0)
+    raise ValueError(f"Неизвестная кодировка: {encoding}")
+
+
+def encoded_etag(etag: str, encoding: str | None) -> str:
+    """ETag сжатого представления: у каждой кодировки свой, иначе прокси
+    перепутает представления."""
+
+    return f"{etag}-{encoding}" if encoding else etag
+
+
+def compress_response(request, response, min_size: int):
+    """Сжимает готовый ответ, если клиент это принимает и это имеет смысл.
+
+    Не трогает потоковые ответы и файлы (``direct_passthrough``), ответы
+    с уже заданным Content-Encoding, ``Cache-Control: no-transform`` и тела
+    меньше ``min_size`` байт — на них заголовки съедят выигрыш.
+    """
+
+    if (
+        response.mimetype not in COMPRESSIBLE_MIMETYPES
+        or response.status_code < 200
+        or response.status_code in (204, 206, 304)
+        or response.direct_passthrough
+        or response.is_streamed
+        or "Content-Encoding" in response.headers
+        or response.cache_control.no_transform
+    ):
+        return response
+
+    # Ответ зависит от Accept-Encoding, даже если этот клиент получит его без сжатия
+    response.vary.add("Accept-Encoding")
+    if response.content_length is not None and response.content_length < min_size:
+        return response
+    encoding = negotiate_encoding(request)
+    if encoding is None:
+        return response
+
+    body = response.get_data()
+    if len(body) < min_size:
+        return response
+    response.set_data(compress(body, encoding, DYNAMIC_LEVELS[encoding]))
+    response.headers["Content-Encoding"] = encoding
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(encoded_etag(etag, encoding), weak=weak)
+    return response
@@ -8,6 +8,7 @@ from pathlib import Path
 BASE_DIR = Path(__file__).resolve().parent
 DATA_DIR = BASE_DIR / "database"
 MEDIA_IMAGES_DIR = BASE_DIR / "media" / "images"
+MEDIA_THUMBS_DIR = BASE_DIR / "media" / "thumbs"
 
 
 class Config:
@@ -17,9 +18,40 @@ class Config:
 
     # Путь до SQLite базы в отдельной директории, чтобы данные не лежали в корне
     # репозитория и их было проще игнорировать в git.
-    SQLALCHEMY_DATABASE_URI = f"sqlite:///{DATA_DIR / 'tierlist.db'}"
+    # DATABASE_URL переопределяет путь (другая копия базы, бенчмарки).
+    SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL", f"sqlite:///{DATA_DIR / 'tierlist.db'}")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # Профиль SQLite: "default" — настройки драйвера по умолчанию,
+    # "production" — WAL, прагмы на каждое подключение и пул (см. sqlite_profile.py)
+    SQLITE_PROFILE = os.getenv("SQLITE_PROFILE", "default")
+    SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+    SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+    # Отрицательное значение — размер в КиБ, положительное — в страницах
+    SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE", "-65536"))
+    SQLITE_BUSY_TIMEOUT = int(os.getenv("SQLITE_BUSY_TIMEOUT", "5000"))  # мс
+    SQLITE_POOL_SIZE = int(os.getenv("SQLITE_POOL_SIZE", "8"))
+    SQLITE_POOL_OVERFLOW = int(os.getenv("SQLITE_POOL_OVERFLOW", "8"))
+    SQLITE_POOL_TIMEOUT = int(os.getenv("SQLITE_POOL_TIMEOUT", "10"))
+    # При запуске через app.py применять недостающие миграции схемы
+    # (иначе сервер не стартует, пока не выполнен database/migrate.py)
+    MIGRATE_ON_START = os.getenv("MIGRATE_ON_START", "false").lower() == "true"
+
+    # Боевой сервер serve.py (gunicorn): адрес, число процессов и потоков в
+    # каждом; WEB_WORKERS=0 — по числу ядер (2 × CPU + 1)
+    WEB_BIND = os.getenv("WEB_BIND", "0.0.0.0:8000")
+    WEB_WORKERS = int(os.getenv("WEB_WORKERS", "0"))
+    WEB_THREADS = int(os.getenv("WEB_THREADS", "4"))
+    # Воркер перезапускается после стольких запросов (плюс случайные 0..JITTER,
+    # чтобы не все разом), так утечки памяти не копятся; 0 — не перезапускать
+    WEB_MAX_REQUESTS = int(os.getenv("WEB_MAX_REQUESTS", "2000"))
+    WEB_MAX_REQUESTS_JITTER = int(os.getenv("WEB_MAX_REQUESTS_JITTER", "200"))
+    # Сколько секунд ждать зависший запрос и завершения запросов при перезапуске
+    WEB_TIMEOUT = int(os.getenv("WEB_TIMEOUT", "30"))
+    WEB_GRACEFUL_TIMEOUT = int(os.getenv("WEB_GRACEFUL_TIMEOUT", "30"))
+    # Журнал запросов: путь к файлу или "-" для stdout; пусто — не писать
+    WEB_ACCESS_LOG = os.getenv("WEB_ACCESS_LOG", "")
+
     # Принудительное использование HTTPS при необходимости
     FORCE_HTTPS = os.getenv("FORCE_HTTPS", "false").lower() == "true"
     PREFERRED_URL_SCHEME = "https" if FORCE_HTTPS else "http"
@@ -29,4 +61,72 @@ class Config:
 
     # Дополнительные пути для сервисов
     DATA_DIR = str(DATA_DIR)
-    MEDIA_IMAGES_DIR = str(MEDIA_IMAGES_DIR)
\ No newline at end of file
+    MEDIA_IMAGES_DIR = str(MEDIA_IMAGES_DIR)
+    # Резервные копии базы (database/backup.py) и сколько последних хранить
+    BACKUP_DIR = os.getenv("BACKUP_DIR", str(BASE_DIR / "database" / "backups"))
+    BACKUP_KEEP = int(os.getenv("BACKUP_KEEP", "14"))
+    # Кэш уменьшенных копий портретов (создаётся автоматически)
+    MEDIA_THUMBS_DIR = str(MEDIA_THUMBS_DIR)
+    # Миниатюры работают только при установленном Pillow
+    THUMBNAILS_ENABLED = os.getenv("THUMBNAILS_ENABLED", "true").lower() == "true"
+
+    # Как часто перепроверять файлы картинок и статики, даже если mtime папки
+    # не менялся (файл перезаписали на месте); 0 — только по mtime папки
+    ASSET_RECHECK_SECONDS = float(os.getenv("ASSET_RECHECK_SECONDS", "30"))
+
+    # Передача файлов фронтенд-серверу вместо чтения воркером Python:
+    # "" — отдаёт Flask, "x-sendfile" — заголовок X-Sendfile (Apache, lighttpd),
+    # "x-accel" — X-Accel-Redirect для nginx. Для nginx нужны internal-локации
+    # вида {SENDFILE_ACCEL_PREFIX}/images/, /thumbs/ и /static/ с alias на
+    # MEDIA_IMAGES_DIR, MEDIA_THUMBS_DIR и папку static.
+    SENDFILE_MODE = os.getenv("SENDFILE_MODE", "").lower()
+    SENDFILE_ACCEL_PREFIX = os.getenv("SENDFILE_ACCEL_PREFIX", "/_protected").rstrip("/")
+    USE_X_SENDFILE = SENDFILE_MODE == "x-sendfile"
+
+    # Папка статической копии публичных страниц (см. freeze.py и
+    # database/freeze_site.py); с FREEZE_ON_COMMIT=true копия обновляется
+    # после каждого сохранения персонажа в админке
+    FREEZE_DIR = os.getenv("FREEZE_DIR", "")
+    FREEZE_ON_COMMIT = os.getenv("FREEZE_ON_COMMIT", "false").lower() == "true"
+
+    # Отдавать в заголовке X-Image-FS-Lookups число обращений к диску за запрос
+    MEDIA_LOOKUP_STATS = os.getenv("MEDIA_LOOKUP_STATS", "false").lower() == "true"
+
+    # Сжатие ответов gzip/brotli по Accept-Encoding; меньшие тела отдаются как есть.
+    # Статику сжимает заранее database/precompress_static.py
+    COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+    COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+
+    # Скомпилированные шаблоны Jinja на диске: новый процесс не компилирует их
+    # заново, пока не изменится исходник; пусто — без кэша
+    TEMPLATE_CACHE_DIR = os.getenv("TEMPLATE_CACHE_DIR", str(BASE_DIR / ".template_cache"))
+    # Перед приёмом запросов (serve.py, wsgi.py, app.py) загрузить все шаблоны,
+    # индексы файлов и закэшированные страницы, чтобы первый запрос не ждал
+    TEMPLATE_WARMUP = os.getenv("TEMPLATE_WARMUP", "false").lower() == "true"
+
+    # Сколько вариантов фильтров тир-листа держать в кэше (0 — отключить)
+    TIER_LIST_CACHE_SIZE = int(os.getenv("TIER_LIST_CACHE_SIZE", "256"))
+    # Сколько отрендеренных плиток персонажей держать в памяти (0 — отключить)
+    TIER_TILE_CACHE_SIZE = int(os.getenv("TIER_TILE_CACHE_SIZE", "2048"))
+
+    # Персонажей на странице админки
+    ADMIN_PAGE_SIZE = int(os.getenv("ADMIN_PAGE_SIZE", "50"))
+
+    # Массовый импорт персонажей: записей в одной транзакции
+    BULK_BATCH_SIZE = int(os.getenv("BULK_BATCH_SIZE", "200"))
+
+    # Метрики запросов: заголовок Server-Timing и /admin/metrics для Prometheus
+    INSTRUMENTATION_ENABLED = os.getenv("INSTRUMENTATION_ENABLED", "false").lower() == "true"
+    # Сохранять профиль cProfile для запросов дольше порога, мс (0 — не профилировать);
+    # PROFILE_SAMPLE_RATE — доля запросов, которые вообще профилируются
+    PROFILE_SLOW_REQUEST_MS = float(os.getenv("PROFILE_SLOW_REQUEST_MS", "0"))
+    PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0.1"))
+    PROFILE_DIR = os.getenv("PROFILE_DIR", str(BASE_DIR / "profiles"))
+
+    # Предупреждать, если один запрос выполняет больше SQL-выражений (0 — не проверять);
+    # в строгом режиме превышение лимита приводит к ошибке
+    SQL_QUERY_LIMIT = int(os.getenv("SQL_QUERY_LIMIT", "0"))
+    SQL_QUERY_LIMIT_STRICT = os.getenv("SQL_QUERY_LIMIT_STRICT", "false").lower() == "true"
+
+    # Сколько секунд держать снимок пользователя в памяти (0 — читать из БД в каждом запросе)
+    USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", "30"))
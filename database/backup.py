@@ -0,0 +1,217 @@
+"""Резервные копии SQLite без остановки сайта и восстановление из них.
+
+Копия снимается через online backup API SQLite порциями по ``--pages``
+страниц: между порциями база свободна, поэтому читатели и админка почти не
+ждут, а если во время копирования была запись, SQLite сам начнёт заново и
+копия останется согласованной. Готовая копия проверяется
+``PRAGMA integrity_check``, потоково сжимается в gzip и попадает в
+BACKUP_DIR под именем ``tierlist-ГГГГММДД-ЧЧММСС.db.gz``; старые копии
+сверх BACKUP_KEEP удаляются (файлы со старыми именами не трогаются).
+
+Запуск::
+
+    python database/backup.py create [--keep 14] [--pages 256]
+    python database/backup.py list
+    python database/backup.py verify tierlist-20250101-120000.db.gz
+    python database/backup.py restore tierlist-20250101-120000.db.gz
+
+После восстановления перезапустите приложение, чтобы сбросить его кэши.
+"""
+
+import argparse
+import gzip
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+def _ensure_project_root():
+    """Make sure the repository root is importable when run as a script."""
+
+    project_root = Path(__file__).resolve().parents[1]
+    project_root_str = str(project_root)
+    if project_root_str not in sys.path:
+        sys.path.insert(0, project_root_str)
+
+
+if __package__ is None or __package__ == "":
+    _ensure_project_root()
+
+from database.utils import app_context
+from models import db
+
+BACKUP_PREFIX = "tierlist-"
+BACKUP_SUFFIX = ".db.gz"
+_CHUNK_SIZE = 1024 * 1024
+
+
+class BackupError(RuntimeError):
+    """Копия не прошла проверку или не может быть восстановлена."""
+
+
+def database_path() -> Path:
+    """Путь к файлу SQLite текущего приложения (нужен контекст приложения)."""
+
+    path = db.engine.url.database
+    if db.engine.url.get_backend_name() != "sqlite" or not path or path == ":memory:":
+        raise BackupError("Резервные копии поддерживаются только для файловой SQLite")
+    return Path(path).resolve()
+
+
+def integrity_check(path: Path):
+    connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        result = [row[0] for row in connection.execute("PRAGMA integrity_check")]
+    finally:
+        connection.close()
+    if result != ["ok"]:
+        raise BackupError(f"{path.name}: integrity_check вернул {'; '.join(result[:5])}")
+
+
+def _copy_online(source: Path, target: Path, pages: int, pause: float):
+    """Согласованная копия работающей базы порциями по ``pages`` страниц."""
+
+    source_conn = sqlite3.connect(source, timeout=30)
+    target_conn = sqlite3.connect(target)
+    try:
+        source_conn.backup(target_conn, pages=pages, sleep=pause)
+    finally:
+        target_conn.close()
+        source_conn.close()
+
+
+def _gzip_file(source: Path, target: Path):
+    tmp_target = target.with_name(f".{target.name}.tmp")
+    with open(source, "rb") as src, gzip.open(tmp_target, "wb", compresslevel=6) as dst:
+        shutil.copyfileobj(src, dst, _CHUNK_SIZE)
+    tmp_target.replace(target)
+
+
+def _gunzip_file(source: Path, target: Path):
+    with gzip.open(source, "rb") as src, open(target, "wb") as dst:
+        shutil.copyfileobj(src, dst, _CHUNK_SIZE)
+
+
+def list_backups(directory: Path):
+    """Копии в порядке от старых к новым (имя содержит время создания)."""
+
+    return sorted(directory.glob(f"{BACKUP_PREFIX}*{BACKUP_SUFFIX}"))
+
+
+def rotate(directory: Path, keep: int):
+    """Удаляет самые старые копии, оставляя ``keep`` последних (0 — не удалять)."""
+
+    backups = list_backups(directory)
+    removed = backups[:-keep] if keep > 0 else []
+    for path in removed:
+        path.unlink()
+    return removed
+
+
+def create_backup(directory: Path, keep: int, pages: int = 256, pause: float = 0.005) -> Path:
+    source = database_path()
+    directory.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S")
+    target = directory / f"{BACKUP_PREFIX}{stamp}{BACKUP_SUFFIX}"
+
+    with tempfile.TemporaryDirectory(dir=directory) as tmp:
+        snapshot = Path(tmp) / "snapshot.db"
+        _copy_online(source, snapshot, pages, pause)
+        integrity_check(snapshot)
+        _gzip_file(snapshot, target)
+
+    rotate(directory, keep)
+    return target
+
+
+def verify_backup(path: Path):
+    with tempfile.TemporaryDirectory(dir=path.parent) as tmp:
+        snapshot = Path(tmp) / "snapshot.db"
+        _gunzip_file(path, snapshot)
+        integrity_check(snapshot)
+
+
+def restore_backup(path: Path, directory: Path, safety_copy: bool = True):
+    """Восстанавливает базу из копии поверх работающей.
+
+    Копия распаковывается и проверяется заранее, а в рабочую базу переносится
+    одним шагом backup API: открытые подключения видят либо старые данные,
+    либо новые целиком. Перед этим снимается страховочная копия текущей базы.
+    """
+
+    target = database_path()
+    # Без ротации: восстанавливаемая копия может оказаться самой старой
+    safety = create_backup(directory, keep=0) if safety_copy else None
+
+    with tempfile.TemporaryDirectory(dir=target.parent) as tmp:
+        snapshot = Path(tmp) / "restore.db"
+        _gunzip_file(path, snapshot)
+        integrity_check(snapshot)
+        _copy_online(snapshot, target, pages=-1, pause=0)
+    integrity_check(target)
+    return safety
+
+
+def _resolve(path_arg: str, directory: Path) -> Path:
+    path = Path(path_arg)
+    if not path.exists() and (directory / path_arg).exists():
+        path = directory / path_arg
+    if not path.exists():
+        raise BackupError(f"Файл {path_arg} не найден")
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Резервные копии базы SQLite")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    create = subparsers.add_parser("create", help="снять копию работающей базы")
+    create.add_argument("--keep", type=int, help="сколько копий хранить (по умолчанию BACKUP_KEEP)")
+    create.add_argument("--pages", type=int, default=256, help="страниц за один шаг копирования")
+
+    subparsers.add_parser("list", help="показать копии")
+
+    verify = subparsers.add_parser("verify", help="проверить копию")
+    verify.add_argument("backup")
+
+    restore = subparsers.add_parser("restore", help="восстановить базу из копии")
+    restore.add_argument("backup")
+    restore.add_argument("--no-safety-copy", action="store_true",
+                         help="не снимать копию текущей базы перед восстановлением")
+
+    args = parser.parse_args()
+
+    with app_context() as app:
+        directory = Path(app.config["BACKUP_DIR"])
+        keep = args.keep if getattr(args, "keep", None) is not None else app.config["BACKUP_KEEP"]
+        started = time.perf_counter()
+        try:
+            if args.command == "create":
+                path = create_backup(directory, keep, pages=args.pages)
+                print(f"OK: {path.name}, {path.stat().st_size / 1024:.0f} КиБ, "
+                      f"{time.perf_counter() - started:.2f} с")
+            elif args.command == "list":
+                for path in list_backups(directory):
+                    print(f"{path.name}\t{path.stat().st_size / 1024:.0f} КиБ")
+            elif args.command == "verify":
+                path = _resolve(args.backup, directory)
+                verify_backup(path)
+                print(f"OK: {path.name} прошёл integrity_check")
+            elif args.command == "restore":
+                path = _resolve(args.backup, directory)
+                safety = restore_backup(path, directory, safety_copy=not args.no_safety_copy)
+                rotate(directory, keep)
+                if safety is not None:
+                    print(f"Текущая база сохранена в {safety.name}")
+                print(f"OK: база восстановлена из {path.name} за {time.perf_counter() - started:.2f} с; "
+                      "перезапустите приложение")
+        except BackupError as exc:
+            print("ERROR:", exc)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
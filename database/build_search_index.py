@@ -0,0 +1,30 @@
+"""Создаёт полнотекстовый индекс персонажей (FTS5) и заполняет его заново."""
+
+import sys
+from pathlib import Path
+
+def _ensure_project_root():
+    """Make sure the repository root is importable when run as a script."""
+
+    project_root = Path(__file__).resolve().parents[1]
+    project_root_str = str(project_root)
+    if project_root_str not in sys.path:
+        sys.path.insert(0, project_root_str)
+
+
+if __package__ is None or __package__ == "":
+    _ensure_project_root()
+
+from database.utils import app_context
+from models import Character, db
+
+
+def main():
+    with app_context() as app:
+        app.extensions["search_index"].install(db.session, rebuild=True)
+        db.session.commit()
+        print("OK: проиндексировано персонажей:", Character.query.count())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""Пакетно создаёт миниатюры всех портретов из MEDIA_IMAGES_DIR."""
+
+import sys
+import time
+from pathlib import Path
+
+def _ensure_project_root():
+    """Make sure the repository root is importable when run as a script."""
+
+    project_root = Path(__file__).resolve().parents[1]
+    project_root_str = str(project_root)
+    if project_root_str not in sys.path:
+        sys.path.insert(0, project_root_str)
+
+
+if __package__ is None or __package__ == "":
+    _ensure_project_root()
+
+from database.utils import app_context
+
+
+def main():
+    with app_context() as app:
+        thumbnails = app.extensions["thumbnails"]
+        if not thumbnails.enabled:
+            print("SKIP: Pillow не установлен или THUMBNAILS_ENABLED=false")
+            return
+
+        bases = app.extensions["image_manifest"].bases()
+        started = time.perf_counter()
+        created = thumbnails.build_all(bases)
+        elapsed = time.perf_counter() - started
+        print(f"OK: изображений {len(bases)}, файлов миниатюр {created}, {elapsed:.1f} с")
+
+
+if __name__ == "__main__":
+    main()
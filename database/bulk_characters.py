@@ -0,0 +1,84 @@
+"""Массовый экспорт и импорт персонажей с навыками (формат см. ``bulk.py``).
+
+Запуск::
+
+    python database/bulk_characters.py export characters.jsonl
+    python database/bulk_characters.py export - --format csv > characters.csv
+    python database/bulk_characters.py import patch.csv [--batch-size 500]
+
+Формат определяется по расширению файла или задаётся ``--format``.
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+def _ensure_project_root():
+    """Make sure the repository root is importable when run as a script."""
+
+    project_root = Path(__file__).resolve().parents[1]
+    project_root_str = str(project_root)
+    if project_root_str not in sys.path:
+        sys.path.insert(0, project_root_str)
+
+
+if __package__ is None or __package__ == "":
+    _ensure_project_root()
+
+from bulk import FORMATS, export_lines, guess_format, read_records
+from database.utils import app_context
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Массовый импорт и экспорт персонажей")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export = subparsers.add_parser("export", help="выгрузить всех персонажей")
+    export.add_argument("path", help="файл или - для stdout")
+    export.add_argument("--format", choices=FORMATS)
+
+    load = subparsers.add_parser("import", help="создать или обновить персонажей по slug")
+    load.add_argument("path", help="файл или - для stdin")
+    load.add_argument("--format", choices=FORMATS)
+    load.add_argument("--batch-size", type=int, help="записей в транзакции (по умолчанию BULK_BATCH_SIZE)")
+
+    args = parser.parse_args()
+    fmt = args.format or guess_format(args.path)
+    if fmt is None:
+        parser.error("не удалось определить формат, укажите --format")
+
+    with app_context() as app:
+        started = time.perf_counter()
+        if args.command == "export":
+            output = sys.stdout if args.path == "-" else open(args.path, "w", encoding="utf-8", newline="")
+            try:
+                output.writelines(export_lines(fmt))
+            finally:
+                if output is not sys.stdout:
+                    output.close()
+            print(f"OK: экспорт за {time.perf_counter() - started:.2f} с", file=sys.stderr)
+            return
+
+        importer = app.extensions["bulk_importer"]
+        if args.batch_size:
+            importer.batch_size = max(1, args.batch_size)
+        source = sys.stdin if args.path == "-" else open(args.path, encoding="utf-8-sig", newline="")
+        try:
+            report = importer.run(read_records(source, fmt))
+        finally:
+            if source is not sys.stdin:
+                source.close()
+
+    for error in report.errors:
+        print(f"ERROR: строка {error['line']} ({error['slug'] or 'без slug'}): {error['error']}")
+    summary = report.as_dict()
+    summary["errors"] = len(report.errors)
+    print("OK:", json.dumps(summary, ensure_ascii=False), f"за {time.perf_counter() - started:.2f} с")
+    if report.errors:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
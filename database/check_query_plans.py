@@ -0,0 +1,144 @@
+"""Проверяет через EXPLAIN QUERY PLAN, что запросы маршрутов используют индексы.
+
+Скрипт прогоняет публичные и админские страницы через тестовый клиент Flask,
+запоминает каждый выполненный SELECT и разбирает его план. Полный проход по
+таблице без индекса считается ошибкой (код выхода 1), кроме явно
+перечисленных в ``ALLOWED_FULL_SCANS`` маршрутов. Ошибкой считается и любой ответ, отличный от 200 (например,
+редирект на страницу входа): планы такого ответа ничего не доказывают.
+"""
+
+import sys
+from pathlib import Path
+
+def _ensure_project_root():
+    """Make sure the repository root is importable when run as a script."""
+
+    project_root = Path(__file__).resolve().parents[1]
+    project_root_str = str(project_root)
+    if project_root_str not in sys.path:
+        sys.path.insert(0, project_root_str)
+
+
+if __package__ is None or __package__ == "":
+    _ensure_project_root()
+
+from sqlalchemy import event
+
+from database.utils import app_context
+from models import Character, User, db
+
+# Маршрут -> почему полный проход здесь допустим
+ALLOWED_FULL_SCANS = {
+    "/admin?sort=id&direction=asc": "вся таблица в порядке первичного ключа",
+    "/admin?sort=id&direction=desc": "вся таблица в порядке первичного ключа",
+}
+
+_INDEXED_MARKERS = (
+    "USING INDEX",
+    "USING COVERING INDEX",
+    "USING INTEGER PRIMARY KEY",
+    "USING PRIMARY KEY",
+    "VIRTUAL TABLE",
+)
+
+
+def _routes():
+    routes = [
+        "/tier-list",
+        "/tier-list?class_name=Страж",
+        "/tier-list?faction=СТУ",
+        "/tier-list?difficulty=Лёгкий",
+        "/tier-list?class_name=Дуэлянт&faction=Ножницы",
+        "/tier-list?search=ле",
+        "/api/tier-list",
+        "/api/search?q=ле",
+    ]
+    first = Character.query.order_by(Character.id).first()
+    if first is not None:
+        routes.append(f"/character/{first.slug}")
+    return routes
+
+
+def _admin_routes():
+    routes = [
+        f"/admin?sort={sort}&direction={direction}"
+        for sort in ("id", "name", "class_name", "faction", "overall_tier")
+        for direction in ("asc", "desc")
+    ]
+    first = Character.query.order_by(Character.id).first()
+    if first is not None:
+        routes.append(f"/admin/character/{first.id}/edit")
+    return routes
+
+
+def _is_full_scan(detail: str) -> bool:
+    return detail.startswith("SCAN ") and not any(m in detail for m in _INDEXED_MARKERS)
+
+
+def main() -> int:
+    with app_context() as app:
+        app.config["TESTING"] = True
+        admin = User.query.filter_by(is_admin=True).first()
+        plan = [(route, None) for route in _routes()]
+        if admin is not None:
+            plan += [(route, admin.id) for route in _admin_routes()]
+        else:
+            print("SKIP: нет администратора, админские маршруты не проверяются")
+        engine = db.engine
+
+    captured = []
+
+    def remember(_conn, _cursor, statement, parameters, _context, _executemany):
+        # Служебные обращения к каталогу SQLite не интересны
+        if statement.lstrip().upper().startswith("SELECT") and "sqlite_master" not in statement:
+            captured.append((statement, parameters))
+
+    # Запросы идут вне внешнего контекста приложения: у каждого свой, как на сервере
+    client = app.test_client()
+    results = []
+    event.listen(engine, "before_cursor_execute", remember)
+    try:
+        for route, user_id in plan:
+            with client.session_transaction() as sess:
+                if user_id is not None:
+                    sess["user_id"] = user_id
+                else:
+                    sess.pop("user_id", None)
+            captured.clear()
+            response = client.get(route)
+            results.append((route, response.status_code, list(captured)))
+    finally:
+        event.remove(engine, "before_cursor_execute", remember)
+
+    failures = 0
+    with app.app_context():
+        connection = db.session.connection()
+        for route, status, statements in results:
+            print(f"\n== {route} [{status}] запросов: {len(statements)}")
+            if status != 200:
+                print(f"  FAIL: ответ {status}, ожидался 200")
+                failures += 1
+                continue
+            for statement, parameters in statements:
+                rows = connection.exec_driver_sql(
+                    f"EXPLAIN QUERY PLAN {statement}", parameters
+                ).all()
+                details = [row[-1] for row in rows]
+                full_scans = [d for d in details if _is_full_scan(d)]
+                if not full_scans:
+                    verdict = "OK"
+                elif route in ALLOWED_FULL_SCANS:
+                    verdict = f"ALLOWED ({ALLOWED_FULL_SCANS[route]})"
+                else:
+                    verdict = "FULL SCAN"
+                    failures += 1
+                print(f"  {verdict}: {' '.join(statement.split())[:110]}")
+                for detail in details:
+                    print(f"      {detail}")
+
+    print(f"\nИтого проблем: {failures}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
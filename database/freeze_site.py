@@ -0,0 +1,52 @@
+"""Собирает статическую копию публичных страниц для раздачи через nginx.
+
+Запуск: ``python database/freeze_site.py [--output путь] [--changed ID ...]``.
+Без ``--changed`` сайт собирается целиком, с ним — перерисовываются только
+страницы, затронутые указанными персонажами.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+def _ensure_project_root():
+    """Make sure the repository root is importable when run as a script."""
+
+    project_root = Path(__file__).resolve().parents[1]
+    project_root_str = str(project_root)
+    if project_root_str not in sys.path:
+        sys.path.insert(0, project_root_str)
+
+
+if __package__ is None or __package__ == "":
+    _ensure_project_root()
+
+from app import create_app
+from freeze import StaticExporter
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Экспорт статической копии сайта")
+    parser.add_argument("--output", help="папка для сборки (по умолчанию FREEZE_DIR)")
+    parser.add_argument("--changed", type=int, nargs="+", metavar="ID",
+                        help="id изменённых персонажей для частичной пересборки")
+    args = parser.parse_args()
+
+    app = create_app()
+    output = args.output or app.config["FREEZE_DIR"]
+    if not output:
+        parser.error("укажите --output или переменную окружения FREEZE_DIR")
+
+    exporter = StaticExporter(app, output)
+    started = time.perf_counter()
+    if args.changed:
+        pages = exporter.export_changed(args.changed)
+    else:
+        pages = exporter.export_all()
+    elapsed = time.perf_counter() - started
+    print(f"OK: страниц {pages}, {elapsed:.1f} с -> {Path(output).resolve()}")
+
+
+if __name__ == "__main__":
+    main()
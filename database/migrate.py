@@ -0,0 +1,55 @@
+"""Применяет недостающие миграции схемы (см. ``migrations.py``).
+
+Запуск::
+
+    python database/migrate.py              # применить и показать время шагов
+    python database/migrate.py --dry-run    # только показать, что будет сделано
+    python database/migrate.py --chunk-size 2000
+
+Перед миграцией рабочей базы снимите копию: ``python database/backup.py create``.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+def _ensure_project_root():
+    """Make sure the repository root is importable when run as a script."""
+
+    project_root = Path(__file__).resolve().parents[1]
+    project_root_str = str(project_root)
+    if project_root_str not in sys.path:
+        sys.path.insert(0, project_root_str)
+
+
+if __package__ is None or __package__ == "":
+    _ensure_project_root()
+
+from database.utils import app_context
+from migrations import DEFAULT_CHUNK_SIZE, LATEST_VERSION, apply_migrations, current_version
+from models import db
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Миграции схемы базы")
+    parser.add_argument("--dry-run", action="store_true", help="ничего не менять, только показать план")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="строк в одной транзакции при заполнении данных")
+    args = parser.parse_args()
+
+    with app_context():
+        version = current_version(db.engine)
+        print(f"Версия схемы: {version}, последняя: {LATEST_VERSION}")
+        started = time.perf_counter()
+        report = apply_migrations(db.engine, chunk_size=args.chunk_size, dry_run=args.dry_run)
+        if not report:
+            print("Схема актуальна")
+        elif not args.dry_run:
+            rows = sum(entry["rows"] for entry in report)
+            print(f"Применено шагов: {len(report)}, заполнено строк: {rows}, "
+                  f"всего {time.perf_counter() - started:.2f} с")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Готовит сжатые копии статики: ``style.css.gz`` и ``style.css.br`` рядом с файлом.
+
+Приложение (или nginx с gzip_static/brotli_static) отдаёт такую копию
+клиентам с подходящим Accept-Encoding, не сжимая файл на каждый запрос.
+Сжатие на максимальном уровне; копия пересоздаётся, только если оригинал
+новее, а копии удалённых файлов убираются. Brotli пишется, если установлен
+пакет ``brotli``. Запускать после каждого изменения файлов в static/::
+
+    python database/precompress_static.py
+"""
+
+import mimetypes
+import sys
+import time
+from pathlib import Path
+
+def _ensure_project_root():
+    """Make sure the repository root is importable when run as a script."""
+
+    project_root = Path(__file__).resolve().parents[1]
+    project_root_str = str(project_root)
+    if project_root_str not in sys.path:
+        sys.path.insert(0, project_root_str)
+
+
+if __package__ is None or __package__ == "":
+    _ensure_project_root()
+
+from compression import COMPRESSIBLE_MIMETYPES, PRECOMPRESSED_SUFFIXES, available_encodings, compress
+from database.utils import app_context
+
+# Максимальные уровни: сжимаем один раз при сборке
+BUILD_LEVELS = {"br": 11, "gzip": 9}
+# Копия должна быть заметно меньше оригинала, иначе её нет смысла отдавать
+MIN_SAVING = 0.05
+
+
+def precompress_directory(directory: Path, min_size: int):
+    """Пересобирает устаревшие копии; возвращает (записано, актуальных, удалено)."""
+
+    written = fresh = removed = 0
+    suffixes = tuple(PRECOMPRESSED_SUFFIXES.values())
+    for path in sorted(directory.iterdir()):
+        if not path.is_file():
+            continue
+        if path.name.endswith(suffixes):
+            if not path.with_suffix("").is_file():
+                path.unlink()
+                removed += 1
+            continue
+        if mimetypes.guess_type(path.name)[0] not in COMPRESSIBLE_MIMETYPES:
+            continue
+
+        stat = path.stat()
+        body = None
+        for encoding in available_encodings():
+            target = path.with_name(path.name + PRECOMPRESSED_SUFFIXES[encoding])
+            if target.is_file() and target.stat().st_mtime_ns >= stat.st_mtime_ns:
+                fresh += 1
+                continue
+            if body is None:
+                body = path.read_bytes()
+            packed = compress(body, encoding, BUILD_LEVELS[encoding])
+            if len(body) < min_size or len(packed) > len(body) * (1 - MIN_SAVING):
+                target.unlink(missing_ok=True)
+                continue
+            tmp_target = target.with_name(f".{target.name}.tmp")
+            tmp_target.write_bytes(packed)
+            tmp_target.replace(target)
+            written += 1
+    return written, fresh, removed
+
+
+def main():
+    with app_context() as app:
+        directory = Path(app.static_folder)
+        started = time.perf_counter()
+        written, fresh, removed = precompress_directory(directory, app.config["COMPRESSION_MIN_SIZE"])
+        elapsed = time.perf_counter() - started
+        print(f"OK: записано {written}, актуальных {fresh}, удалено {removed}, {elapsed:.2f} с")
+        if "br" not in available_encodings():
+            print("Пакет brotli не установлен: созданы только .gz")
+        sizes = {
+            path.name: path.stat().st_size
+            for path in directory.iterdir()
+            if path.is_file() and not path.name.startswith(".")
+        }
+        for name, size in sorted(sizes.items()):
+            if name.endswith(tuple(PRECOMPRESSED_SUFFIXES.values())):
+                continue
+            variants = ", ".join(
+                f"{suffix} {sizes[name + suffix]} Б"
+                for suffix in PRECOMPRESSED_SUFFIXES.values()
+                if name + suffix in sizes
+            )
+            print(f"  {name}: {size} Б" + (f" -> {variants}" if variants else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Списки значений для фильтров тир-листа вместе с количеством персонажей."""
+
+import threading
+from collections import Counter
+
+from sqlalchemy import func
+
+from models import Character, db
+
+DIFFICULTY_ORDER = ["Лёгкий", "Средний", "Сложный"]
+
+
+class FacetService:
+    """Считает все фасеты одним GROUP BY и держит результат до следующей записи.
+
+    ``canonical_difficulty`` сводит синонимы сложности к одному значению,
+    чтобы "Для новичков" и "Лёгкий" попадали в один чип.
+    """
+
+    def __init__(self, canonical_difficulty):
+        self.canonical_difficulty = canonical_difficulty
+        self._lock = threading.Lock()
+        self._facets = None
+        self._version = 0
+
+    def invalidate(self, *_args):
+        with self._lock:
+            self._facets = None
+            self._version += 1
+
+    def get(self):
+        """Возвращает словарь со списками значений и счётчиками по каждому фильтру."""
+
+        facets = self._facets
+        if facets is None:
+            version = self._version
+            facets = self._compute()
+            with self._lock:
+                # Если во время подсчёта была запись, результат не запоминаем
+                if version == self._version:
+                    self._facets = facets
+        return facets
+
+    def _compute(self):
+        rows = (
+            db.session
+            .query(
+                Character.class_name,
+                Character.faction,
+                Character.difficulty,
+                func.count(Character.id),
+            )
+            .group_by(Character.class_name, Character.faction, Character.difficulty)
+            .all()
+        )
+
+        classes = Counter()
+        factions = Counter()
+        difficulties = Counter()
+        total = 0
+        for class_name, faction, difficulty, count in rows:
+            total += count
+            if class_name is not None:
+                classes[class_name] += count
+            if faction is not None:
+                factions[faction] += count
+            difficulty = self.canonical_difficulty(difficulty)
+            if difficulty:
+                difficulties[difficulty] += count
+
+        ordered_known = [name for name in DIFFICULTY_ORDER if name in difficulties]
+        remaining = sorted(set(difficulties) - set(DIFFICULTY_ORDER))
+
+        return {
+            "classes": sorted(classes),
+            "factions": sorted(factions),
+            "difficulties": ordered_known + remaining,
+            "counts": {
+                "class_name": dict(classes),
+                "faction": dict(factions),
+                "difficulty": dict(difficulties),
+            },
+            "total": total,
+        }
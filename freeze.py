@@ -0,0 +1,289 @@
+"""Статическая копия публичной части сайта для раздачи nginx без Python.
+
+Экспорт рендерит ``/tier-list`` для всех сочетаний фильтров, ``/character/<slug>``
+для каждого персонажа и ``/api/tier-list`` через тестовый клиент приложения,
+а рядом кладёт статику, портреты и миниатюры. Раскладка файлов::
+
+    tier-list/index.html                                  без фильтров
+    tier-list/<класс>/<фракция>/<сложность>/index.html   значения как в query string
+    character/<slug>/index.html
+    api/tier-list                                         JSON для фильтрации в браузере
+    static/, media/images/, media/thumbs/
+
+Значения фильтров записаны так же, как их кодирует форма (``quote_plus``),
+потому что nginx подставляет ``$arg_*`` без декодирования. Пример конфигурации::
+
+    location = / { return 302 /tier-list; }
+    location = /tier-list {
+        try_files /tier-list/$arg_class_name/$arg_faction/$arg_difficulty/index.html
+                  /tier-list/index.html;
+    }
+    location /character/ { try_files $uri/index.html =404; }
+    location = /api/tier-list { default_type application/json; }
+    location ~ ^/(static|media)/ {
+        if ($arg_v) { add_header Cache-Control "public, max-age=31536000, immutable"; }
+    }
+
+Поиск по ``/api/search`` в статической копии недоступен: браузер ищет по
+имени сам, а запросы с ``?search=`` получают страницу без текстового фильтра.
+"""
+
+import itertools
+import json
+import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import quote_plus, urlencode
+
+from models import Character, db, on_characters_changed
+
+STATE_FILE = ".freeze-state.json"
+_FACET_ARGS = ("class_name", "faction", "difficulty")
+
+
+def _segment(value: str) -> str:
+    return quote_plus(value, safe="*")
+
+
+def _write_file(path: Path, body: bytes):
+    """Пишет файл атомарно, чтобы nginx не отдал недописанную страницу."""
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_bytes(body)
+    os.replace(tmp_path, path)
+
+
+def _sync_tree(source, target: Path):
+    """Копирует новые и изменившиеся файлы, удаляет пропавшие."""
+
+    source = Path(source)
+    if not source.is_dir():
+        return
+    seen = set()
+    for path in source.rglob("*"):
+        if not path.is_file() or path.name.startswith("."):
+            continue
+        relative = path.relative_to(source)
+        seen.add(relative)
+        destination = target / relative
+        stat = path.stat()
+        try:
+            current = destination.stat()
+            if current.st_size == stat.st_size and current.st_mtime_ns == stat.st_mtime_ns:
+                continue
+        except FileNotFoundError:
+            pass
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(path, destination)
+
+    if target.is_dir():
+        for path in target.rglob("*"):
+            if path.is_file() and path.relative_to(target) not in seen:
+                path.unlink()
+
+
+class StaticExporter:
+    """Полный и инкрементальный экспорт публичных страниц в папку."""
+
+    def __init__(self, app, output_dir):
+        self.app = app
+        self.output_dir = Path(output_dir)
+        self._lock = threading.Lock()
+        self._executor = None
+
+    # ------- Полный экспорт --------
+
+    def export_all(self):
+        """Собирает сайт заново во временной папке и подменяет им старый."""
+
+        staging = self.output_dir.with_name(f"{self.output_dir.name}.new")
+        previous = self.output_dir.with_name(f"{self.output_dir.name}.old")
+        with self._lock:
+            shutil.rmtree(staging, ignore_errors=True)
+            with self.app.app_context():
+                state = self._current_state()
+            pages = self._export_pages(
+                staging,
+                self._tier_list_combos(state["facets"]),
+                [self._character_url(info["slug"]) for info in state["characters"].values()],
+            )
+            self._prune_characters(staging, state)
+            self._export_assets(staging)
+            _write_file(staging / STATE_FILE, json.dumps(state, ensure_ascii=False).encode("utf-8"))
+
+            shutil.rmtree(previous, ignore_errors=True)
+            if self.output_dir.exists():
+                os.replace(self.output_dir, previous)
+            os.replace(staging, self.output_dir)
+            shutil.rmtree(previous, ignore_errors=True)
+        return pages
+
+    # ------- Инкрементальный экспорт --------
+
+    def export_changed(self, character_ids):
+        """Перерисовывает только страницы, на которые влияют эти персонажи.
+
+        Страница персонажа и тир-листы с его старыми и новыми значениями
+        фильтров; если поменялись сами списки фильтров или счётчики в чипах,
+        перерисовываются все тир-листы. Без прошлой сборки делает полный экспорт.
+        """
+
+        state_path = self.output_dir / STATE_FILE
+        if not state_path.is_file():
+            return self.export_all()
+
+        with self._lock:
+            previous = json.loads(state_path.read_text(encoding="utf-8"))
+            with self.app.app_context():
+                state = self._current_state()
+
+            facet_tuples = set()
+            character_urls = []
+            for character_id in {str(i) for i in character_ids}:
+                for info in (previous["characters"].get(character_id), state["characters"].get(character_id)):
+                    if info is not None:
+                        facet_tuples.add(tuple(info["facet"]))
+                new_info = state["characters"].get(character_id)
+                if new_info is not None:
+                    character_urls.append(self._character_url(new_info["slug"]))
+
+            facets_changed = state["facets"] != previous["facets"]
+            if facets_changed:
+                tier_combos = self._tier_list_combos(state["facets"])
+            else:
+                tier_combos = self._tier_list_combos_for(facet_tuples)
+
+            pages = self._export_pages(self.output_dir, tier_combos, character_urls)
+            if facets_changed:
+                self._prune_tier_lists(self.output_dir, tier_combos)
+            self._prune_characters(self.output_dir, state)
+            self._export_assets(self.output_dir)
+            _write_file(state_path, json.dumps(state, ensure_ascii=False).encode("utf-8"))
+        return pages
+
+    def enable_on_commit(self):
+        """Запускает инкрементальный экспорт после каждого коммита с персонажами.
+
+        Экспорт идёт в отдельном потоке, чтобы не задерживать ответ админке.
+        """
+
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="freeze")
+
+        @on_characters_changed(self.app)
+        def schedule_export(character_ids):
+            self._executor.submit(self._export_changed_logged, character_ids)
+
+    def _export_changed_logged(self, character_ids):
+        try:
+            self.export_changed(character_ids)
+        except Exception:  # pragma: no cover - ошибка не должна ронять воркер
+            self.app.logger.exception("Не удалось обновить статическую копию сайта")
+
+    # ------- Общие части --------
+
+    def _current_state(self):
+        facet_service = self.app.extensions["facet_service"]
+        canonical_difficulty = facet_service.canonical_difficulty
+        rows = db.session.query(
+            Character.id,
+            Character.slug,
+            Character.class_name,
+            Character.faction,
+            Character.difficulty,
+        ).all()
+        characters = {
+            str(row.id): {
+                "slug": row.slug,
+                "facet": [
+                    row.class_name or "",
+                    row.faction or "",
+                    canonical_difficulty(row.difficulty) or "",
+                ],
+            }
+            for row in rows
+        }
+        return {"characters": characters, "facets": facet_service.get()}
+
+    @staticmethod
+    def _tier_list_combos(facets):
+        combos = itertools.product(
+            ["*", *facets["classes"]],
+            ["*", *facets["factions"]],
+            ["*", *facets["difficulties"]],
+        )
+        return sorted(set(combos))
+
+    @staticmethod
+    def _tier_list_combos_for(facet_tuples):
+        combos = set()
+        for facet in facet_tuples:
+            # Персонаж виден на странице, если каждый фильтр — "*" или его значение
+            options = [["*", value] if value else ["*"] for value in facet]
+            combos.update(itertools.product(*options))
+        return sorted(combos)
+
+    @staticmethod
+    def _character_url(slug):
+        return f"/character/{slug}"
+
+    @staticmethod
+    def _tier_list_path(root: Path, combo) -> Path:
+        if tuple(combo) == ("*", "*", "*"):
+            return root / "tier-list" / "index.html"
+        return root.joinpath("tier-list", *map(_segment, combo), "index.html")
+
+    def _export_pages(self, root: Path, tier_combos, character_urls):
+        client = self.app.test_client()
+        written = 0
+
+        def fetch(url):
+            # Рендерим как анонимный посетитель по HTTPS, чтобы FORCE_HTTPS не редиректил
+            response = client.get(url, environ_overrides={"wsgi.url_scheme": "https"})
+            if response.status_code != 200:
+                raise RuntimeError(f"{url}: HTTP {response.status_code}")
+            return response.get_data()
+
+        for combo in tier_combos:
+            _write_file(self._tier_list_path(root, combo), fetch(f"/tier-list?{urlencode(dict(zip(_FACET_ARGS, combo)))}"))
+            written += 1
+
+        for url in character_urls:
+            _write_file(root / url.lstrip("/") / "index.html", fetch(url))
+            written += 1
+
+        _write_file(root / "api" / "tier-list", fetch("/api/tier-list"))
+        return written + 1
+
+    def _prune_tier_lists(self, root: Path, tier_combos):
+        """Удаляет тир-листы для значений фильтров, которых больше нет."""
+
+        expected = {self._tier_list_path(root, combo) for combo in tier_combos}
+        for path in sorted((root / "tier-list").rglob("index.html"), reverse=True):
+            if path not in expected:
+                path.unlink()
+        for path in sorted((root / "tier-list").rglob("*"), reverse=True):
+            if path.is_dir() and not any(path.iterdir()):
+                path.rmdir()
+
+    @staticmethod
+    def _prune_characters(root: Path, state):
+        """Удаляет страницы персонажей, которых больше нет (или сменили slug)."""
+
+        character_dir = root / "character"
+        if not character_dir.is_dir():
+            return
+        slugs = {info["slug"] for info in state["characters"].values()}
+        for path in character_dir.iterdir():
+            if path.is_dir() and path.name not in slugs:
+                shutil.rmtree(path)
+
+    def _export_assets(self, root: Path):
+        thumbnails = self.app.extensions["thumbnails"]
+        if thumbnails.enabled:
+            thumbnails.build_all(self.app.extensions["image_manifest"].bases())
+            _sync_tree(thumbnails.cache_dir, root / "media" / "thumbs")
+        _sync_tree(self.app.config["MEDIA_IMAGES_DIR"], root / "media" / "images")
+        _sync_tree(self.app.static_folder, root / "static")
@@ -0,0 +1,298 @@
+"""Подсчёт SQL-запросов, метрики запросов и профилирование медленных запросов."""
+
+import cProfile
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from flask import before_render_template, g, has_request_context, request, template_rendered
+from sqlalchemy import event
+
+
+class TooManyQueries(RuntimeError):
+    """Запрос к приложению выполнил больше SQL-выражений, чем разрешено."""
+
+
+class QueryLog:
+    """Список выполненных выражений, собранный ``count_queries``."""
+
+    def __init__(self):
+        self.statements: list[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def __repr__(self):
+        return f"<QueryLog count={self.count}>"
+
+
+_active_logs: list[QueryLog] = []
+_logs_lock = threading.Lock()
+
+
+def _on_execute(_conn, _cursor, statement, _parameters, _context, _executemany):
+    if has_request_context():
+        g.sql_queries = g.get("sql_queries", 0) + 1
+    if _active_logs:
+        with _logs_lock:
+            for log in _active_logs:
+                log.statements.append(statement)
+
+
+def install_query_counter(app, db):
+    """Считает SQL-выражения каждого запроса и проверяет лимит SQL_QUERY_LIMIT.
+
+    При превышении лимита пишет предупреждение в лог, а с
+    SQL_QUERY_LIMIT_STRICT=true — падает с ``TooManyQueries``, чтобы N+1
+    ловились тестами и в режиме отладки.
+    """
+
+    with app.app_context():
+        for engine in db.engines.values():
+            if not event.contains(engine, "before_cursor_execute", _on_execute):
+                event.listen(engine, "before_cursor_execute", _on_execute)
+
+    @app.after_request
+    def check_query_limit(response):
+        limit = app.config.get("SQL_QUERY_LIMIT") or 0
+        count = g.get("sql_queries", 0)
+        if limit and count > limit:
+            message = f"{request.method} {request.path} выполнил {count} SQL-запросов (лимит {limit})"
+            if app.config.get("SQL_QUERY_LIMIT_STRICT"):
+                raise TooManyQueries(message)
+            app.logger.warning(message)
+        return response
+
+
+@contextmanager
+def count_queries():
+    """Собирает все SQL-выражения, выполненные внутри блока.
+
+    Пример для тестов::
+
+        with count_queries() as log:
+            client.get("/character/Audrey")
+        assert log.count <= 2, log.statements
+    """
+
+    log = QueryLog()
+    with _logs_lock:
+        _active_logs.append(log)
+    try:
+        yield log
+    finally:
+        with _logs_lock:
+            _active_logs.remove(log)
+
+
+# ------- Метрики запросов --------
+
+# Границы корзин гистограммы длительности запроса, секунды
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+def _before_sql(conn, _cursor, _statement, _parameters, _context, _executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_sql(conn, _cursor, _statement, _parameters, _context, _executemany):
+    started = conn.info["query_started"].pop()
+    if has_request_context():
+        g.sql_seconds = g.get("sql_seconds", 0.0) + time.perf_counter() - started
+
+
+class RequestMetrics:
+    """Накопленные по маршрутам метрики текущего процесса.
+
+    Каждый воркер считает свои запросы, поэтому при нескольких воркерах
+    Prometheus видит их как отдельные цели (или нужен общий агрегатор).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes: dict[str, dict] = {}
+
+    def observe(self, route: str, status: int, seconds: float, sql_queries: int,
+                sql_seconds: float, template_seconds: float, fs_lookups: int):
+        with self._lock:
+            stats = self._routes.get(route)
+            if stats is None:
+                stats = self._routes[route] = {
+                    "buckets": [0] * len(DURATION_BUCKETS),
+                    "count": 0,
+                    "seconds": 0.0,
+                    "statuses": {},
+                    "sql_queries": 0,
+                    "sql_seconds": 0.0,
+                    "template_seconds": 0.0,
+                    "fs_lookups": 0,
+                }
+            for idx, bound in enumerate(DURATION_BUCKETS):
+                if seconds <= bound:
+                    stats["buckets"][idx] += 1
+            stats["count"] += 1
+            stats["seconds"] += seconds
+            stats["statuses"][status] = stats["statuses"].get(status, 0) + 1
+            stats["sql_queries"] += sql_queries
+            stats["sql_seconds"] += sql_seconds
+            stats["template_seconds"] += template_seconds
+            stats["fs_lookups"] += fs_lookups
+
+    def render_prometheus(self) -> str:
+        """Метрики в текстовом формате Prometheus 0.0.4."""
+
+        with self._lock:
+            routes = {route: dict(stats, statuses=dict(stats["statuses"]))
+                      for route, stats in sorted(self._routes.items())}
+
+        def label(route):
+            return route.replace("\\", "\\\\").replace('"', '\\"')
+
+        lines = [
+            "# HELP tierlist_request_duration_seconds Время обработки запроса.",
+            "# TYPE tierlist_request_duration_seconds histogram",
+        ]
+        for route, stats in routes.items():
+            for bound, count in zip(DURATION_BUCKETS, stats["buckets"]):
+                lines.append(
+                    f'tierlist_request_duration_seconds_bucket{{route="{label(route)}",le="{bound}"}} {count}'
+                )
+            lines.append(
+                f'tierlist_request_duration_seconds_bucket{{route="{label(route)}",le="+Inf"}} {stats["count"]}'
+            )
+            lines.append(f'tierlist_request_duration_seconds_sum{{route="{label(route)}"}} {stats["seconds"]:.6f}')
+            lines.append(f'tierlist_request_duration_seconds_count{{route="{label(route)}"}} {stats["count"]}')
+
+        counters = (
+            ("tierlist_requests_total", "Число запросов по коду ответа.", None),
+            ("tierlist_sql_queries_total", "Выполнено SQL-выражений.", "sql_queries"),
+            ("tierlist_sql_duration_seconds_total", "Время SQL-выражений.", "sql_seconds"),
+            ("tierlist_template_duration_seconds_total", "Время рендера шаблонов.", "template_seconds"),
+            ("tierlist_image_fs_lookups_total", "Обращения к диску при поиске картинок.", "fs_lookups"),
+        )
+        for name, help_text, key in counters:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for route, stats in routes.items():
+                if key is None:
+                    for status, count in sorted(stats["statuses"].items()):
+                        lines.append(f'{name}{{route="{label(route)}",status="{status}"}} {count}')
+                else:
+                    value = stats[key]
+                    value = f"{value:.6f}" if isinstance(value, float) else value
+                    lines.append(f'{name}{{route="{label(route)}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+
+def install_request_metrics(app, db) -> RequestMetrics:
+    """Замеряет каждый запрос: время, SQL, шаблоны и обращения к диску.
+
+    Итог по запросу уходит в заголовок ``Server-Timing`` (видно во вкладке
+    Network браузера), накопленные значения — в ``RequestMetrics``.
+    """
+
+    metrics = RequestMetrics()
+
+    with app.app_context():
+        for engine in db.engines.values():
+            if not event.contains(engine, "before_cursor_execute", _before_sql):
+                event.listen(engine, "before_cursor_execute", _before_sql)
+                event.listen(engine, "after_cursor_execute", _after_sql)
+
+    def template_started(_sender, template, context, **_extra):
+        g.setdefault("template_started", []).append(time.perf_counter())
+
+    def template_finished(_sender, template, context, **_extra):
+        started = g.template_started.pop()
+        # Вложенный рендер уже учтён внешним
+        if not g.template_started:
+            g.template_seconds = g.get("template_seconds", 0.0) + time.perf_counter() - started
+
+    before_render_template.connect(template_started, app, weak=False)
+    template_rendered.connect(template_finished, app, weak=False)
+
+    @app.before_request
+    def start_request_timer():
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def record_request_metrics(response):
+        started = g.get("request_started")
+        if started is None:
+            return response
+        seconds = time.perf_counter() - started
+        sql_queries = g.get("sql_queries", 0)
+        sql_seconds = g.get("sql_seconds", 0.0)
+        template_seconds = g.get("template_seconds", 0.0)
+        fs_lookups = g.get("image_fs_lookups", 0)
+
+        route = request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+        metrics.observe(route, response.status_code, seconds, sql_queries,
+                        sql_seconds, template_seconds, fs_lookups)
+
+        response.headers.add(
+            "Server-Timing",
+            f"app;dur={seconds * 1000:.1f}, "
+            f'sql;dur={sql_seconds * 1000:.1f};desc="{sql_queries} queries", '
+            f"tpl;dur={template_seconds * 1000:.1f}, "
+            f'fs;desc="{fs_lookups} lookups"',
+        )
+        return response
+
+    return metrics
+
+
+class SlowRequestProfiler:
+    """WSGI-обёртка: профилирует часть запросов и сохраняет медленные.
+
+    Профилируется доля ``sample_rate`` запросов (одновременно не больше
+    одного — cProfile не рассчитан на параллельные профили); если запрос
+    шёл дольше ``threshold_ms``, в ``directory`` пишется дамп pstats::
+
+        python -m pstats profiles/20250101-120000-GET-tier-list-412ms.prof
+    """
+
+    def __init__(self, wsgi_app, directory, threshold_ms: float, sample_rate: float = 1.0):
+        self.wsgi_app = wsgi_app
+        self.directory = Path(directory)
+        self.threshold = threshold_ms / 1000
+        self.sample_rate = sample_rate
+        self._busy = threading.Lock()
+
+    def __call__(self, environ, start_response):
+        if random.random() >= self.sample_rate or not self._busy.acquire(blocking=False):
+            return self.wsgi_app(environ, start_response)
+
+        def run():
+            # Тело собираем внутри профиля: рендер может идти при итерации,
+            # а close() запускает teardown-обработчики Flask
+            iterable = self.wsgi_app(environ, start_response)
+            try:
+                return list(iterable)
+            finally:
+                if hasattr(iterable, "close"):
+                    iterable.close()
+
+        try:
+            profiler = cProfile.Profile()
+            started = time.perf_counter()
+            body = profiler.runcall(run)
+            elapsed = time.perf_counter() - started
+        finally:
+            self._busy.release()
+
+        if elapsed >= self.threshold:
+            self._dump(profiler, environ, elapsed)
+        return body
+
+    def _dump(self, profiler, environ, elapsed):
+        path = environ.get("PATH_INFO", "/").strip("/") or "root"
+        slug = re.sub(r"[^A-Za-z0-9_-]+", "-", path)[:80]
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        self.directory.mkdir(parents=True, exist_ok=True)
+        filename = f"{stamp}-{environ.get('REQUEST_METHOD', 'GET')}-{slug}-{elapsed * 1000:.0f}ms.prof"
+        profiler.dump_stats(self.directory / filename)
@@ -0,0 +1,195 @@
+"""Индексы файлов в папках с картинками и статикой, чтобы не опрашивать
+диск на каждом рендере и строить URL с хэшем содержимого."""
+
+import hashlib
+import os
+import threading
+import time
+
+from flask import g, has_request_context
+
+# Порядок важен: в таком порядке версии попадают в <picture>
+IMAGE_VARIANTS = (
+    (".webp", "image/webp"),
+    (".png", "image/png"),
+    (".jpg", "image/jpeg"),
+    (".jpeg", "image/jpeg"),
+)
+
+# Если папку меняли совсем недавно, mtime мог ещё не "устояться"
+# (грубое разрешение на сетевых ФС), поэтому такой снимок перепроверяем.
+_SETTLE_SECONDS = 2.0
+
+
+def count_fs_lookup(amount: int = 1):
+    """Учитывает обращения к файловой системе в рамках текущего запроса."""
+
+    if has_request_context():
+        g.image_fs_lookups = g.get("image_fs_lookups", 0) + amount
+
+
+def _content_hash(path: str) -> str:
+    with open(path, "rb") as file:
+        return hashlib.file_digest(file, "sha256").hexdigest()[:12]
+
+
+class FileManifest:
+    """Список файлов папки с короткими хэшами содержимого.
+
+    Список строится одним проходом по папке и перестраивается, когда
+    меняется mtime директории (файл добавили, удалили или переименовали),
+    а также не реже раза в ``recheck_seconds`` — чтобы заметить файл,
+    перезаписанный на месте. В пределах одного запроса папка проверяется
+    не больше одного раза; ``version`` растёт, только если что-то изменилось.
+    """
+
+    def __init__(self, directory, recheck_seconds: float = 0):
+        self.directory = str(directory)
+        self.recheck_seconds = recheck_seconds
+        self._lock = threading.Lock()
+        self._files: frozenset[str] = frozenset()
+        # имя файла -> (mtime_ns, размер, хэш содержимого)
+        self._stats: dict[str, tuple[int, int, str]] = {}
+        self._mtime_ns: int | None = None
+        self._settled = False
+        self._checked_at = 0.0
+        self.version = 0
+
+    def refresh(self):
+        """Перечитывает содержимое папки; хэши считаются только для новых
+        или изменившихся файлов."""
+
+        stats: dict[str, tuple[int, int, str]] = {}
+
+        with self._lock:
+            try:
+                mtime_ns = os.stat(self.directory).st_mtime_ns
+                with os.scandir(self.directory) as entries:
+                    for entry in entries:
+                        if not entry.is_file():
+                            continue
+                        stat = entry.stat()
+                        key = (stat.st_mtime_ns, stat.st_size)
+                        previous = self._stats.get(entry.name)
+                        if previous is not None and previous[:2] == key:
+                            stats[entry.name] = previous
+                        else:
+                            stats[entry.name] = (*key, _content_hash(entry.path))
+            except FileNotFoundError:
+                mtime_ns = None
+            count_fs_lookup(2)
+
+            changed = stats != self._stats or not self.version
+            self._stats = stats
+            self._files = frozenset(stats)
+            self._mtime_ns = mtime_ns
+            self._settled = mtime_ns is not None and (
+                time.time() - mtime_ns / 1e9 > _SETTLE_SECONDS
+            )
+            self._checked_at = time.monotonic()
+            if changed:
+                self._rebuild_index()
+                self.version += 1
+
+    def _rebuild_index(self):
+        """Точка расширения: пересобрать производные индексы по ``_files``."""
+
+    def ensure_fresh(self):
+        """Перестраивает индекс, если папка изменилась с прошлой проверки."""
+
+        if has_request_context():
+            checked = g.setdefault("file_manifests_checked", set())
+            if id(self) in checked:
+                return
+            checked.add(id(self))
+
+        try:
+            mtime_ns = os.stat(self.directory).st_mtime_ns
+        except FileNotFoundError:
+            mtime_ns = None
+        count_fs_lookup()
+
+        recheck_due = (
+            self.recheck_seconds > 0
+            and time.monotonic() - self._checked_at > self.recheck_seconds
+        )
+        if mtime_ns != self._mtime_ns or not self._settled or recheck_due:
+            self.refresh()
+
+    def has_file(self, filename: str) -> bool | None:
+        """Есть ли файл в папке; None, если индекс не может ответить."""
+
+        if "/" in filename or os.sep in filename:
+            return None
+        self.ensure_fresh()
+        return filename in self._files
+
+    def fingerprint(self, filename: str) -> str | None:
+        """Хэш содержимого файла для URL; None для неизвестных файлов."""
+
+        if "/" in filename or os.sep in filename:
+            return None
+        self.ensure_fresh()
+        stat = self._stats.get(filename)
+        return stat[2] if stat is not None else None
+
+    def fresh_variant(self, filename: str, suffix: str) -> str | None:
+        """Имя производного файла (``style.css.gz``), если он есть и не старше оригинала."""
+
+        if "/" in filename or os.sep in filename:
+            return None
+        self.ensure_fresh()
+        original = self._stats.get(filename)
+        variant = self._stats.get(filename + suffix)
+        if original is None or variant is None or variant[0] < original[0]:
+            return None
+        return filename + suffix
+
+
+class ImageManifest(FileManifest):
+    """Базовое имя файла -> доступные версии изображения."""
+
+    def __init__(self, directory, recheck_seconds: float = 0):
+        super().__init__(directory, recheck_seconds)
+        self._by_base: dict[str, dict[str, str]] = {}
+
+    def _rebuild_index(self):
+        known_exts = {ext for ext, _mime in IMAGE_VARIANTS}
+        by_base: dict[str, dict[str, str]] = {}
+        for name in self._files:
+            base, ext = os.path.splitext(name)
+            if ext in known_exts:
+                by_base.setdefault(base, {})[ext] = name
+        self._by_base = by_base
+
+    def sources(self, base: str):
+        """Возвращает версии изображения в порядке IMAGE_VARIANTS."""
+
+        if "/" in base or os.sep in base:
+            # Вложенные папки в индекс не попадают — проверяем напрямую.
+            return self._probe(base)
+
+        self.ensure_fresh()
+        variants = self._by_base.get(base)
+        if not variants:
+            return []
+        return [
+            {"path": variants[ext], "mime": mime}
+            for ext, mime in IMAGE_VARIANTS
+            if ext in variants
+        ]
+
+    def bases(self):
+        """Базовые имена всех изображений в папке."""
+
+        self.ensure_fresh()
+        return sorted(self._by_base)
+
+    def _probe(self, base: str):
+        sources = []
+        for ext, mime in IMAGE_VARIANTS:
+            candidate = os.path.join(self.directory, f"{base}{ext}")
+            count_fs_lookup()
+            if os.path.exists(candidate):
+                sources.append({"path": f"{base}{ext}", "mime": mime})
+        return sources
@@ -0,0 +1,297 @@
+"""Версионные миграции схемы SQLite.
+
+Шаг миграции — номер, название, операции DDL и необязательное заполнение
+данных. Применённые шаги записываются в таблицу ``schema_version``, поэтому
+по базе видно, на какой версии схемы она находится. DDL шага выполняется в
+одной транзакции; заполнение идёт порциями по ``chunk_size`` строк, каждая
+в своей короткой транзакции, чтобы не держать блокировку записи. Версия
+записывается после последней порции: прерванный шаг при следующем запуске
+выполнится заново, все операции для этого идемпотентны.
+
+Базы, размеченные старыми скриптами ``migrate_add_*``, проходят те же шаги:
+уже существующие колонки и индексы пропускаются.
+"""
+
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable
+
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from models import classify_skill_type, compute_overall_tier, db
+
+SCHEMA_TABLE = "schema_version"
+DEFAULT_CHUNK_SIZE = 500
+
+
+def _table_exists(conn, table: str) -> bool:
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+    ).fetchone()
+    return row is not None
+
+
+def _columns(conn, table: str) -> set[str]:
+    return {row[1] for row in conn.execute(f'PRAGMA table_info("{table}")')}
+
+
+@dataclass(frozen=True)
+class CreateMissingTables:
+    """Таблицы моделей, которых ещё нет в базе, вместе с их индексами."""
+
+    def statements(self, conn, dialect):
+        result = []
+        for table in db.metadata.sorted_tables:
+            if _table_exists(conn, table.name):
+                continue
+            result.append(str(CreateTable(table).compile(dialect=dialect)).strip())
+            result.extend(str(CreateIndex(index).compile(dialect=dialect)) for index in table.indexes)
+        return result
+
+
+@dataclass(frozen=True)
+class AddColumn:
+    table: str
+    column: str
+    ddl_type: str
+
+    def statements(self, conn, _dialect):
+        if self.column in _columns(conn, self.table):
+            return []
+        return [f'ALTER TABLE "{self.table}" ADD COLUMN {self.column} {self.ddl_type}']
+
+
+@dataclass(frozen=True)
+class Sql:
+    """Произвольное идемпотентное выражение (``CREATE INDEX IF NOT EXISTS``)."""
+
+    sql: str
+
+    def statements(self, _conn, _dialect):
+        return [self.sql]
+
+
+@dataclass(frozen=True)
+class Backfill:
+    """Заполнение порциями: ``fill(conn, after_id, limit)`` -> (последний id, строк)."""
+
+    table: str
+    fill: Callable
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    operations: tuple
+    backfill: Backfill | None = None
+
+
+def _fill_overall_tier(conn, after_id, limit):
+    rows = conn.execute(
+        "SELECT id, tier_weapon, tier_skill, tier_passive, tier_ultimate FROM character "
+        "WHERE id > ? ORDER BY id LIMIT ?",
+        (after_id, limit),
+    ).fetchall()
+    conn.executemany(
+        "UPDATE character SET overall_tier = ?, tier_weight = ? WHERE id = ?",
+        [(*compute_overall_tier(*row[1:]), row[0]) for row in rows],
+    )
+    return (rows[-1][0] if rows else None), len(rows)
+
+
+def _fill_skill_category(conn, after_id, limit):
+    rows = conn.execute(
+        "SELECT id, type FROM skill WHERE id > ? ORDER BY id LIMIT ?", (after_id, limit)
+    ).fetchall()
+    conn.executemany(
+        "UPDATE skill SET category = ?, sort_rank = ? WHERE id = ?",
+        [(*classify_skill_type(skill_type), skill_id) for skill_id, skill_type in rows],
+    )
+    return (rows[-1][0] if rows else None), len(rows)
+
+
+MIGRATIONS = (
+    Migration(1, "Базовые таблицы", (CreateMissingTables(),)),
+    Migration(2, "Колонки персонажа", tuple(
+        AddColumn("character", column, "TEXT")
+        for column in (
+            "class_name", "faction", "tier_weapon", "tier_skill", "tier_passive",
+            "tier_ultimate", "difficulty", "short_summary", "review", "image_name",
+        )
+    )),
+    Migration(3, "Минусы персонажа", (AddColumn("character", "cons", "TEXT"),)),
+    Migration(4, "Статус баланса", (AddColumn("character", "balance_status", "TEXT"),)),
+    Migration(5, "Индексы фильтров и сортировок", (
+        Sql("CREATE INDEX IF NOT EXISTS ix_character_name ON character (name)"),
+        Sql("CREATE INDEX IF NOT EXISTS ix_character_faction ON character (faction)"),
+        Sql("CREATE INDEX IF NOT EXISTS ix_character_difficulty ON character (difficulty)"),
+        Sql("CREATE INDEX IF NOT EXISTS ix_character_class_faction_difficulty "
+            "ON character (class_name, faction, difficulty)"),
+        Sql("CREATE INDEX IF NOT EXISTS ix_skill_character_id ON skill (character_id)"),
+    )),
+    Migration(6, "Сохранённый итоговый тир", (
+        AddColumn("character", "overall_tier", "TEXT"),
+        AddColumn("character", "tier_weight", "INTEGER"),
+        Sql("CREATE INDEX IF NOT EXISTS ix_character_overall_tier ON character (overall_tier)"),
+        Sql("CREATE INDEX IF NOT EXISTS ix_character_tier_weight ON character (tier_weight)"),
+        Sql("CREATE INDEX IF NOT EXISTS ix_character_tier_order ON character (tier_weight DESC, name)"),
+    ), Backfill("character", _fill_overall_tier)),
+    Migration(7, "Категория и порядок навыков", (
+        AddColumn("skill", "category", "TEXT"),
+        AddColumn("skill", "sort_rank", "INTEGER"),
+        Sql("CREATE INDEX IF NOT EXISTS ix_skill_character_rank ON skill (character_id, sort_rank)"),
+    ), Backfill("skill", _fill_skill_category)),
+    Migration(8, "Версия персонажа для оптимистичной блокировки", (
+        AddColumn("character", "version", "INTEGER NOT NULL DEFAULT 1"),
+    )),
+)
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+class _RawConnection:
+    """Подключение SQLite из пула движка с ручным управлением транзакциями.
+
+    Модуль sqlite3 сам открывает транзакцию только перед DML, а DDL выполняет
+    вне её, поэтому на время миграции включаем режим без неявных транзакций
+    и пишем BEGIN/COMMIT сами.
+    """
+
+    def __init__(self, engine):
+        self._pooled = engine.raw_connection()
+        self.conn = self._pooled.driver_connection
+        self._isolation_level = self.conn.isolation_level
+        self.conn.isolation_level = None
+
+    def close(self):
+        self.conn.isolation_level = self._isolation_level
+        self._pooled.close()
+
+    def run_in_transaction(self, work):
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            result = work(self.conn)
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+        return result
+
+
+def _applied_versions(conn) -> set[int]:
+    if not _table_exists(conn, SCHEMA_TABLE):
+        return set()
+    return {row[0] for row in conn.execute(f"SELECT version FROM {SCHEMA_TABLE}")}
+
+
+def current_version(engine) -> int:
+    """Последняя применённая версия схемы; 0 — база ещё не под миграциями."""
+
+    raw = _RawConnection(engine)
+    try:
+        return max(_applied_versions(raw.conn), default=0)
+    finally:
+        raw.close()
+
+
+def pending_migrations(engine):
+    raw = _RawConnection(engine)
+    try:
+        applied = _applied_versions(raw.conn)
+    finally:
+        raw.close()
+    return [migration for migration in MIGRATIONS if migration.version not in applied]
+
+
+def apply_migrations(engine, chunk_size: int = DEFAULT_CHUNK_SIZE, dry_run: bool = False, log=print):
+    """Применяет недостающие шаги и возвращает отчёт по каждому.
+
+    Отчёт: список словарей с версией, названием, выполненными выражениями,
+    числом заполненных строк и длительностью в секундах. При ``dry_run``
+    ничего не меняется, а выражения и объём заполнения считаются по текущей схеме.
+    """
+
+    raw = _RawConnection(engine)
+    report = []
+    try:
+        conn = raw.conn
+        applied = _applied_versions(conn)
+        for migration in MIGRATIONS:
+            if migration.version in applied:
+                continue
+            started = time.perf_counter()
+            statements = [
+                sql
+                for operation in migration.operations
+                for sql in operation.statements(conn, engine.dialect)
+            ]
+            entry = {"version": migration.version, "name": migration.name, "statements": statements, "rows": 0}
+
+            if dry_run:
+                if migration.backfill is not None and _table_exists(conn, migration.backfill.table):
+                    count_sql = f'SELECT COUNT(*) FROM "{migration.backfill.table}"'
+                    entry["rows"] = conn.execute(count_sql).fetchone()[0]
+                entry["seconds"] = time.perf_counter() - started
+                report.append(entry)
+                log(_describe(entry, dry_run=True))
+                continue
+
+            def run_ddl(connection):
+                for sql in statements:
+                    connection.execute(sql)
+
+            raw.run_in_transaction(run_ddl)
+
+            if migration.backfill is not None:
+                entry["rows"] = _run_backfill(raw, migration.backfill, chunk_size)
+
+            entry["seconds"] = time.perf_counter() - started
+            raw.run_in_transaction(lambda connection: _record_version(connection, migration, entry["seconds"]))
+            report.append(entry)
+            log(_describe(entry, dry_run=False))
+    finally:
+        raw.close()
+    return report
+
+
+def _run_backfill(raw, backfill, chunk_size):
+    filled, after_id = 0, 0
+    while True:
+        last_id, rows = raw.run_in_transaction(
+            lambda connection, after_id=after_id: backfill.fill(connection, after_id, chunk_size)
+        )
+        if last_id is None:
+            return filled
+        filled, after_id = filled + rows, last_id
+
+
+def _record_version(conn, migration, seconds):
+    conn.execute(
+        f"CREATE TABLE IF NOT EXISTS {SCHEMA_TABLE} ("
+        "version INTEGER PRIMARY KEY, name TEXT NOT NULL, "
+        "applied_at TEXT NOT NULL, duration_ms INTEGER NOT NULL)"
+    )
+    conn.execute(
+        f"INSERT INTO {SCHEMA_TABLE} (version, name, applied_at, duration_ms) VALUES (?, ?, ?, ?)",
+        (
+            migration.version,
+            migration.name,
+            datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            round(seconds * 1000),
+        ),
+    )
+
+
+def _describe(entry, dry_run: bool) -> str:
+    lines = [f"{'PLAN' if dry_run else 'OK'}: {entry['version']:>3} {entry['name']}"]
+    if not dry_run:
+        lines[0] += f" — {entry['seconds'] * 1000:.0f} мс"
+    for sql in entry["statements"]:
+        first_line, *rest = sql.splitlines()
+        lines.append(f"      {first_line}{' ...' if rest else ''}")
+    if entry["rows"]:
+        verb = "будет заполнено" if dry_run else "заполнено"
+        lines.append(f"      {verb} строк: {entry['rows']}")
+    return "\n".join(lines)
@@ -1,8 +1,36 @@
 # models.py
+from itertools import chain
+
+from flask import current_app, has_app_context
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.orm import Session, deferred
 
 db = SQLAlchemy()
 
+TIER_WEIGHTS = {
+    "D": 1,
+    "C": 2,
+    "B": 3,
+    "A": 4,
+    "S": 5,
+    "SS": 6,
+    "SSS": 7,
+}
+
+
+def compute_overall_tier(*letters):
+    """Средняя оценка для группировки по тиру: (буква, вес) или (None, None)."""
+    vals = [TIER_WEIGHTS.get(letter) for letter in letters]
+    vals = [v for v in vals if v is not None]
+    if not vals:
+        return None, None
+
+    avg = sum(vals) / len(vals)
+    weights_back = {v: k for k, v in TIER_WEIGHTS.items()}
+    closest = min(weights_back.keys(), key=lambda v: abs(v - avg))
+    return weights_back[closest], closest
+
 
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -12,12 +40,19 @@ class User(db.Model):
 
 
 class Character(db.Model):
+    __table_args__ = (
+        # Фильтры тир-листа и GROUP BY фасетов (class_name — ведущая колонка)
+        db.Index("ix_character_class_faction_difficulty", "class_name", "faction", "difficulty"),
+        # Порядок выдачи тир-листа: ORDER BY tier_weight DESC, name
+        db.Index("ix_character_tier_order", db.text("tier_weight DESC"), "name"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
-    name = db.Column(db.String(128), nullable=False)
+    name = db.Column(db.String(128), nullable=False, index=True)
     slug = db.Column(db.String(128), unique=True, nullable=False)
 
     class_name = db.Column(db.String(32))
-    faction = db.Column(db.String(32))
+    faction = db.Column(db.String(32), index=True)
 
     # Балансные изменения
     balance_status = db.Column(db.String(16))
@@ -27,11 +62,13 @@ class Character(db.Model):
     tier_passive = db.Column(db.String(3))
     tier_ultimate = db.Column(db.String(3))
 
-    difficulty = db.Column(db.String(32))  # НОВОЕ: сложность освоения
+    difficulty = db.Column(db.String(32), index=True)  # НОВОЕ: сложность освоения
 
-    short_summary = db.Column(db.Text)
-    cons = db.Column(db.Text)
-    review = db.Column(db.Text)
+    # Длинные тексты нужны только странице персонажа и форме редактирования:
+    # они грузятся отдельным запросом при обращении или через undefer_group
+    short_summary = deferred(db.Column(db.Text), group="texts")
+    cons = deferred(db.Column(db.Text), group="texts")
+    review = deferred(db.Column(db.Text), group="texts")
 
     image_name = db.Column(db.String(255))
 
@@ -39,38 +76,74 @@ class Character(db.Model):
                              cascade="all, delete-orphan")
 
 
-    @property
-    def overall_tier(self):
-        """Средняя оценка для группировки по тиру."""
-        map_letter = {
-            "D": 1,
-            "C": 2,
-            "B": 3,
-            "A": 4,
-            "S": 5,
-            "SS": 6,
-            "SSS": 7,
-        }
-        map_back = {v: k for k, v in map_letter.items()}
-
-        vals = [
-            map_letter.get(self.tier_weapon),
-            map_letter.get(self.tier_skill),
-            map_letter.get(self.tier_passive),
-            map_letter.get(self.tier_ultimate),
-        ]
-        vals = [v for v in vals if v is not None]
-        if not vals:
-            return None
-
-        avg = sum(vals) / len(vals)
-        closest = min(map_back.keys(), key=lambda v: abs(v - avg))
-        return map_back[closest]
+    # Итоговый тир и его вес считаются при сохранении (см. события ниже),
+    # чтобы группировать и сортировать по тиру прямо в SQL.
+    overall_tier = db.Column(db.String(3), index=True)
+    tier_weight = db.Column(db.Integer, index=True)
+
+    # Версия записи для оптимистичной блокировки: ORM проверяет её в WHERE
+    # каждого UPDATE и увеличивает; правка навыков тоже меняет версию
+    version = db.Column(db.Integer, nullable=False, default=1, server_default="1")
+    __mapper_args__ = {"version_id_col": version}
+
+    def refresh_overall_tier(self):
+        """Пересчитывает сохранённые overall_tier и tier_weight."""
+        self.overall_tier, self.tier_weight = compute_overall_tier(
+            self.tier_weapon,
+            self.tier_skill,
+            self.tier_passive,
+            self.tier_ultimate,
+        )
+
+
+# Поля, которых достаточно спискам (тир-лист, /api/tier-list, админка):
+# они выбираются кортежами, без объектов ORM и без длинных текстов
+CHARACTER_LIST_COLUMNS = (
+    Character.id,
+    Character.slug,
+    Character.name,
+    Character.class_name,
+    Character.faction,
+    Character.difficulty,
+    Character.balance_status,
+    Character.tier_weapon,
+    Character.tier_skill,
+    Character.tier_passive,
+    Character.tier_ultimate,
+    Character.overall_tier,
+    Character.tier_weight,
+    Character.image_name,
+    Character.version,
+)
+
+
+# Канонические категории навыков в порядке показа на странице персонажа:
+# (подпись, известные варианты поля type в порядке приоритета)
+SKILL_CATEGORIES = (
+    ("Пассивный навык", ("Пассивка", "Пассивный", "Passive", "Пассивная способность")),
+    ("Обычный навык", ("Навык", "Skill", "Обычный", "Базовый", "Активный")),
+    ("Ультимативный навык", ("Ультимейт", "Ульта", "Ultimate", "Сигнатурный")),
+)
+# Навыки с нестандартным типом показываются после канонических
+OTHER_SKILL_RANK = 1000
+
+
+def classify_skill_type(skill_type):
+    """Категория навыка и ранг для сортировки: (подпись, ранг)."""
+    for group_index, (label, aliases) in enumerate(SKILL_CATEGORIES):
+        if skill_type in aliases:
+            return label, group_index * 100 + aliases.index(skill_type)
+    return skill_type or "Other", OTHER_SKILL_RANK
 
 
 class Skill(db.Model):
+    __table_args__ = (
+        # Навыки персонажа в порядке показа: WHERE character_id = ? ORDER BY sort_rank
+        db.Index("ix_skill_character_rank", "character_id", "sort_rank"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
-    character_id = db.Column(db.Integer, db.ForeignKey("character.id"), nullable=False)
+    character_id = db.Column(db.Integer, db.ForeignKey("character.id"), nullable=False, index=True)
 
     name = db.Column(db.String(128), nullable=False)
     type = db.Column(db.String(32))
@@ -78,3 +151,94 @@ class Skill(db.Model):
     valid_hits = db.Column(db.String(32))
     cooldown = db.Column(db.String(32))
     level_info = db.Column(db.Text)
+
+    # Категория и ранг выводятся из type при сохранении (см. события ниже),
+    # чтобы страница персонажа получала навыки уже упорядоченными.
+    category = db.Column(db.String(32))
+    sort_rank = db.Column(db.Integer)
+
+    def refresh_category(self):
+        """Пересчитывает сохранённые category и sort_rank по полю type."""
+        self.category, self.sort_rank = classify_skill_type(self.type)
+
+
+@event.listens_for(Character, "before_insert")
+@event.listens_for(Character, "before_update")
+def _store_overall_tier(_mapper, _connection, target):
+    target.refresh_overall_tier()
+
+
+@event.listens_for(Skill, "before_insert")
+@event.listens_for(Skill, "before_update")
+def _store_skill_category(_mapper, _connection, target):
+    target.refresh_category()
+
+
+# ------- Уведомления об изменении персонажей --------
+
+# Подписчики вызываются после успешного коммита с набором id изменённых
+# персонажей (изменение навыка считается изменением его персонажа). Список
+# у каждого приложения свой (app.extensions), поэтому коммит в одном
+# приложении не трогает кэши других, созданных в том же процессе.
+
+
+def on_characters_changed(app, func=None):
+    """Регистрирует обработчик изменений персонажей приложения
+    (можно как декоратор ``@on_characters_changed(app)``)."""
+    if func is None:
+        return lambda decorated: on_characters_changed(app, decorated)
+    app.extensions.setdefault("character_listeners", []).append(func)
+    return func
+
+
+def notify_characters_changed(character_ids):
+    """Сообщает подписчикам об изменениях, сделанных в обход ORM-сессии."""
+    ids = frozenset(i for i in character_ids if i is not None)
+    if not ids or not has_app_context():
+        return
+    for func in list(current_app.extensions.get("character_listeners", ())):
+        func(ids)
+
+
+@event.listens_for(Session, "before_flush")
+def _bump_version_on_skill_change(session, _flush_context, _instances):
+    """Изменённый навык делает «изменённым» и персонажа, чтобы выросла его версия."""
+    with session.no_autoflush:
+        for obj in chain(session.new, session.dirty, session.deleted):
+            if not isinstance(obj, Skill):
+                continue
+            if obj not in session.deleted and not session.is_modified(obj):
+                continue
+            character = obj.character
+            if (
+                character is None
+                or character in session.new
+                or character in session.deleted
+                or session.is_modified(character, include_collections=False)
+            ):
+                continue
+            # Явно заданную версию ORM запишет как есть, а в WHERE оставит
+            # прежнюю — получится UPDATE только version с проверкой конфликта
+            character.version = character.version + 1
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_characters(session, _flush_context):
+    changed = session.info.setdefault("changed_character_ids", set())
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, Character):
+            changed.add(obj.id)
+        elif isinstance(obj, Skill):
+            changed.add(obj.character_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _notify_changed_characters(session):
+    changed = session.info.pop("changed_character_ids", None)
+    if changed:
+        notify_characters_changed(changed)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changed_characters(session):
+    session.info.pop("changed_character_ids", None)
@@ -0,0 +1,118 @@
+"""Постраничный вывод по ключу (keyset/seek) вместо OFFSET.
+
+Страница задаётся значениями ключей сортировки последней (или первой)
+показанной строки: следующая выбирается условием «строго после курсора»,
+поэтому SQLite не перебирает пропущенные строки, а добавления и удаления
+между переходами не сдвигают страницы. Ключи сортировки вместе должны быть
+однозначными — последним ключом идёт первичный ключ. Ключи — сами колонки,
+а не выражения над ними, чтобы SQLite брал порядок из индекса; NULL в них
+допустим и, как в SQLite, считается меньше любого значения.
+"""
+
+import base64
+import json
+
+from sqlalchemy import and_, false, or_
+
+
+def encode_cursor(values) -> str:
+    raw = json.dumps(list(values), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str | None, size: int):
+    """Значения ключей из курсора или None, если он пустой или испорчен."""
+
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except ValueError:
+        return None
+    if not isinstance(values, list) or len(values) != size:
+        return None
+    if not all(
+        value is None or isinstance(value, (str, int, float)) and not isinstance(value, bool)
+        for value in values
+    ):
+        return None
+    return values
+
+
+def seek_condition(keys, values):
+    """WHERE для строк строго после ``values`` в порядке ``keys``.
+
+    ``keys`` — пары (выражение, по убыванию ли), направления могут быть разными,
+    поэтому сравнение кортежей разворачивается в OR по префиксам.
+    """
+
+    clauses = []
+    for idx, (expression, descending) in enumerate(keys):
+        equal_prefix = [_equal(keys[i][0], values[i]) for i in range(idx)]
+        step = _after(expression, values[idx], descending)
+        if step is not None:
+            clauses.append(and_(*equal_prefix, step))
+    return or_(false(), *clauses)
+
+
+def _equal(expression, value):
+    return expression.is_(None) if value is None else expression == value
+
+
+def _after(expression, value, descending: bool):
+    """Условие «строго после ``value``»; None, если таких строк нет.
+
+    NULL идёт раньше любого значения по возрастанию и позже по убыванию.
+    """
+
+    if value is None:
+        return None if descending else expression.is_not(None)
+    if descending:
+        return or_(expression < value, expression.is_(None))
+    return expression > value
+
+
+def order_clauses(keys, reverse: bool = False):
+    return [
+        expression.asc() if descending == reverse else expression.desc()
+        for expression, descending in keys
+    ]
+
+
+def keyset_page(session, query, keys, per_page: int, after=None, before=None):
+    """Одна страница ``query`` (select с колонками) в порядке ``keys``.
+
+    Возвращает (строки, курсор назад или None, курсор вперёд или None).
+    Значения ключей добавляются к выборке как колонки ``_k0``, ``_k1``...
+    """
+
+    labeled = [expression.label(f"_k{idx}") for idx, (expression, _descending) in enumerate(keys)]
+    query = query.add_columns(*labeled)
+    backwards = before is not None
+    cursor = before if backwards else after
+    if cursor is not None:
+        query = query.where(seek_condition(
+            [(expression, descending != backwards) for expression, descending in keys], cursor
+        ))
+    rows = session.execute(
+        query.order_by(*order_clauses(keys, reverse=backwards)).limit(per_page + 1)
+    ).all()
+
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    if backwards:
+        rows.reverse()
+
+    def key_of(row):
+        return encode_cursor(getattr(row, label.name) for label in labeled)
+
+    if not rows:
+        return rows, None, None
+    has_prev = has_more if backwards else cursor is not None
+    has_next = True if backwards else has_more
+    return (
+        rows,
+        key_of(rows[0]) if has_prev else None,
+        key_of(rows[-1]) if has_next else None,
+    )
@@ -0,0 +1,139 @@
+"""Полнотекстовый поиск по персонажам и их навыкам на SQLite FTS5."""
+
+import re
+
+from sqlalchemy import Integer, text
+from sqlalchemy.exc import OperationalError
+
+FTS_TABLE = "character_fts"
+
+# Веса колонок для bm25: имя важнее всего, затем навыки и плюсы/минусы
+_BM25_WEIGHTS = "10.0, 2.0, 1.0, 2.0, 3.0"
+
+_SKILLS_TEXT = (
+    "(SELECT group_concat(s.name || ' ' || coalesce(s.type, '') || ' ' "
+    "|| coalesce(s.description, ''), ' ') FROM skill s WHERE s.character_id = {id})"
+)
+
+
+def _refresh_row(character_id: str) -> str:
+    return (
+        f"DELETE FROM {FTS_TABLE} WHERE rowid = {character_id}; "
+        f"INSERT INTO {FTS_TABLE} (rowid, name, short_summary, review, cons, skills) "
+        f"SELECT c.id, c.name, c.short_summary, c.review, c.cons, "
+        f"{_SKILLS_TEXT.format(id='c.id')} FROM character c WHERE c.id = {character_id};"
+    )
+
+
+# Индекс поддерживается триггерами, поэтому остаётся актуальным при любой
+# записи: через ORM, сырой SQL или скрипты из database/.
+INSTALL_STATEMENTS = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "name, short_summary, review, cons, skills, "
+    "tokenize = 'unicode61 remove_diacritics 2')",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON character BEGIN "
+    f"{_refresh_row('new.id')} END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au "
+    "AFTER UPDATE OF name, short_summary, review, cons ON character BEGIN "
+    f"{_refresh_row('new.id')} END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON character BEGIN "
+    f"DELETE FROM {FTS_TABLE} WHERE rowid = old.id; END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_skill_ai AFTER INSERT ON skill BEGIN "
+    f"{_refresh_row('new.character_id')} END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_skill_au AFTER UPDATE ON skill BEGIN "
+    f"{_refresh_row('old.character_id')} {_refresh_row('new.character_id')} END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_skill_ad AFTER DELETE ON skill BEGIN "
+    f"{_refresh_row('old.character_id')} END",
+]
+
+# Полная перестройка собирает текст навыков одним GROUP BY, а не подзапросом
+# на каждого персонажа
+REBUILD_STATEMENTS = [
+    f"DELETE FROM {FTS_TABLE}",
+    f"INSERT INTO {FTS_TABLE} (rowid, name, short_summary, review, cons, skills) "
+    "SELECT c.id, c.name, c.short_summary, c.review, c.cons, sk.body FROM character c "
+    "LEFT JOIN (SELECT s.character_id, group_concat(s.name || ' ' || coalesce(s.type, '') "
+    "|| ' ' || coalesce(s.description, ''), ' ') AS body FROM skill s "
+    "GROUP BY s.character_id) sk ON sk.character_id = c.id",
+]
+
+
+def fts_query(search: str) -> str | None:
+    """Превращает пользовательский ввод в запрос FTS5 с поиском по префиксу.
+
+    Каждое слово берётся в кавычки (чтобы спецсимволы FTS не ломали запрос)
+    и получает ``*``; слова объединяются через AND.
+    """
+
+    tokens = re.findall(r"\w+", search or "")
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+class SearchIndex:
+    """Доступ к FTS-индексу с запасным вариантом, если FTS5 недоступен.
+
+    Наличие таблицы проверяется один раз на процесс; пока индекс не создан
+    (см. ``database/build_search_index.py``), поиск идёт по старому LIKE.
+    """
+
+    def __init__(self):
+        self._ready = None
+
+    def install(self, session, rebuild: bool = False):
+        """Создаёт FTS-таблицу и триггеры; индекс заполняется при создании
+        таблицы или по ``rebuild=True``. Без FTS5 в SQLite падает с OperationalError.
+        """
+
+        created = not self._table_exists(session)
+        for stmt in INSTALL_STATEMENTS:
+            session.execute(text(stmt))
+        if created or rebuild:
+            for stmt in REBUILD_STATEMENTS:
+                session.execute(text(stmt))
+        self._ready = True
+
+    def is_ready(self, session) -> bool:
+        if self._ready is None:
+            try:
+                # Таблица может существовать, а модуль fts5 — нет (другая сборка SQLite)
+                self._ready = self._table_exists(session) and session.execute(
+                    text(f"SELECT rowid FROM {FTS_TABLE} LIMIT 0")
+                ).all() == []
+            except OperationalError:
+                self._ready = False
+        return self._ready
+
+    @staticmethod
+    def _table_exists(session) -> bool:
+        return session.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {"name": FTS_TABLE},
+        ).first() is not None
+
+    def matching_ids(self, session, search: str, ranked: bool = False):
+        """Подзапрос с id подходящих персонажей или None, если нужен LIKE.
+
+        С ``ranked=True`` возвращает готовый список id по убыванию релевантности.
+        """
+
+        query = fts_query(search)
+        if query is None or not self.is_ready(session):
+            return None
+
+        if ranked:
+            rows = session.execute(
+                text(
+                    f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :query "
+                    f"ORDER BY bm25({FTS_TABLE}, {_BM25_WEIGHTS})"
+                ),
+                {"query": query},
+            )
+            return [row[0] for row in rows]
+
+        return (
+            text(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :fts_query")
+            .bindparams(fts_query=query)
+            .columns(rowid=Integer)
+        )
@@ -0,0 +1,89 @@
+"""Боевой запуск приложения через gunicorn.
+
+    python serve.py
+
+Приложение загружается один раз в главном процессе (см. wsgi.py), затем
+запускается WEB_WORKERS процессов по WEB_THREADS потоков; настройки берутся из
+переменных окружения (config.py). Для нескольких процессов на одной базе
+стоит включить SQLITE_PROFILE=production (WAL и busy_timeout).
+
+Управление сигналами главному процессу:
+
+* ``HUP`` — плавно заменить воркеры и перечитать настройки: текущие запросы
+  дорабатывают, новые идут к новым воркерам. Код приложения при этом не
+  перечитывается — он загружен в главном процессе до fork;
+* ``USR2``, затем ``QUIT`` старому процессу — обновление кода без простоя:
+  стартует новый главный процесс с новым кодом, старый завершается после
+  своих запросов;
+* ``TTIN`` / ``TTOU`` — добавить или убрать воркер, ``TERM`` — остановка.
+
+Воркер сам перезапускается после WEB_MAX_REQUESTS запросов. Для разработки и
+Windows по-прежнему подходит ``python app.py``.
+"""
+
+import multiprocessing
+import os
+import sys
+
+try:
+    from gunicorn.app.base import BaseApplication
+except ImportError:  # pragma: no cover - зависит от окружения
+    BaseApplication = None
+
+from config import Config
+
+
+def server_options() -> dict:
+    """Настройки gunicorn из конфигурации приложения."""
+
+    threads = max(1, Config.WEB_THREADS)
+    options = {
+        "bind": Config.WEB_BIND,
+        "workers": Config.WEB_WORKERS or multiprocessing.cpu_count() * 2 + 1,
+        "threads": threads,
+        # Потоки есть только у gthread; один поток — обычный sync-воркер
+        "worker_class": "gthread" if threads > 1 else "sync",
+        "preload_app": True,
+        "max_requests": Config.WEB_MAX_REQUESTS,
+        "max_requests_jitter": Config.WEB_MAX_REQUESTS_JITTER,
+        "timeout": Config.WEB_TIMEOUT,
+        "graceful_timeout": Config.WEB_GRACEFUL_TIMEOUT,
+        "proc_name": "tierlist",
+    }
+    if Config.WEB_ACCESS_LOG:
+        options["accesslog"] = Config.WEB_ACCESS_LOG
+
+    ssl_cert = os.getenv("SSL_CERT_FILE")
+    ssl_key = os.getenv("SSL_KEY_FILE")
+    if ssl_cert and ssl_key:
+        options["certfile"], options["keyfile"] = ssl_cert, ssl_key
+    return options
+
+
+if BaseApplication is not None:
+
+    class TierListServer(BaseApplication):
+        """gunicorn без разбора командной строки: всё берётся из ``options``."""
+
+        def __init__(self, options: dict):
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from wsgi import app
+
+            return app
+
+
+def main():
+    if BaseApplication is None:
+        sys.exit("gunicorn не установлен: pip install gunicorn (для разработки — python app.py)")
+    TierListServer(server_options()).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Профиль SQLite для продакшена: WAL, прагмы на подключение и пул соединений."""
+
+from sqlalchemy import event
+
+
+def production_engine_options(config) -> dict:
+    """Параметры create_engine для профиля production."""
+
+    return {
+        "pool_size": config["SQLITE_POOL_SIZE"],
+        "max_overflow": config["SQLITE_POOL_OVERFLOW"],
+        "pool_timeout": config["SQLITE_POOL_TIMEOUT"],
+        # Соединение возвращается в пул с откатом, чтобы не держать блокировки
+        "pool_reset_on_return": "rollback",
+        "connect_args": {"timeout": config["SQLITE_BUSY_TIMEOUT"] / 1000},
+    }
+
+
+def production_pragmas(config) -> list[str]:
+    return [
+        # WAL: читатели не ждут писателя, а писатель не ждёт читателей
+        "PRAGMA journal_mode=WAL",
+        f"PRAGMA synchronous={config['SQLITE_SYNCHRONOUS']}",
+        f"PRAGMA mmap_size={int(config['SQLITE_MMAP_SIZE'])}",
+        f"PRAGMA cache_size={int(config['SQLITE_CACHE_SIZE'])}",
+        f"PRAGMA busy_timeout={int(config['SQLITE_BUSY_TIMEOUT'])}",
+    ]
+
+
+def configure_sqlite(app):
+    """Включает профиль из SQLITE_PROFILE. Вызывать до ``db.init_app``,
+    прагмы навешиваются на движок уже после инициализации (см. ``install_pragmas``).
+    """
+
+    if app.config.get("SQLITE_PROFILE") != "production":
+        return
+    options = production_engine_options(app.config)
+    options.update(app.config.get("SQLALCHEMY_ENGINE_OPTIONS") or {})
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = options
+
+
+def install_pragmas(app, db):
+    """Выполняет прагмы профиля на каждом новом подключении к SQLite."""
+
+    if app.config.get("SQLITE_PROFILE") != "production":
+        return
+
+    pragmas = production_pragmas(app.config)
+
+    def apply_pragmas(dbapi_connection, _connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+    with app.app_context():
+        for engine in db.engines.values():
+            if engine.dialect.name == "sqlite":
+                event.listen(engine, "connect", apply_pragmas)
@@ -0,0 +1,71 @@
+"""Общие фикстуры: приложение на временной SQLite и клиент администратора."""
+
+import sys
+from pathlib import Path
+
+import pytest
+from werkzeug.security import generate_password_hash
+
+
+def _ensure_project_root():
+    """Make sure the repository root is importable when run as a script."""
+
+    project_root = Path(__file__).resolve().parents[1]
+    project_root_str = str(project_root)
+    if project_root_str not in sys.path:
+        sys.path.insert(0, project_root_str)
+
+
+_ensure_project_root()
+
+from app import create_app  # noqa: E402
+from migrations import apply_migrations  # noqa: E402
+from models import Character, Skill, User, db  # noqa: E402
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app({
+        "TESTING": True,
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'test.db'}",
+        "MEDIA_IMAGES_DIR": str(tmp_path / "images"),
+        "MEDIA_THUMBS_DIR": str(tmp_path / "thumbs"),
+        "TEMPLATE_CACHE_DIR": "",
+    })
+    with app.app_context():
+        db.create_all()
+        apply_migrations(db.engine, log=lambda _message: None)
+        app.extensions["search_index"].install(db.session, rebuild=True)
+        db.session.commit()
+    yield app
+    with app.app_context():
+        db.engine.dispose()
+
+
+@pytest.fixture
+def add_character(app):
+    """Создаёт персонажа с навыками и возвращает его id."""
+
+    def add(name: str, slug: str | None = None, skills=(), **fields):
+        with app.app_context():
+            character = Character(name=name, slug=slug or name.lower(), **fields)
+            for skill in skills:
+                character.skills.append(Skill(**skill))
+            db.session.add(character)
+            db.session.commit()
+            return character.id
+
+    return add
+
+
+@pytest.fixture
+def admin_client(app):
+    with app.app_context():
+        admin = User(username="admin", password_hash=generate_password_hash("admin"), is_admin=True)
+        db.session.add(admin)
+        db.session.commit()
+        admin_id = admin.id
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session["user_id"] = admin_id
+    return client
@@ -0,0 +1,53 @@
+"""Постраничный список персонажей в админке."""
+
+import html
+import re
+
+import pytest
+
+from models import Character, db
+
+SORTS = {
+    "class_name": Character.class_name,
+    "faction": Character.faction,
+    "overall_tier": Character.tier_weight,
+}
+
+
+@pytest.fixture
+def characters(app, add_character):
+    app.config["ADMIN_PAGE_SIZE"] = 2
+    for idx, (faction, class_name, weight) in enumerate([
+        ("СТУ", None, 3), (None, "Страж", None), ("Ножницы", "Страж", 1),
+        (None, None, 3), ("СТУ", "Дуэлянт", None), (None, "Дуэлянт", 2),
+    ]):
+        add_character(f"Персонаж {idx}", faction=faction, class_name=class_name, tier_weight=weight)
+
+
+def _page(client, url):
+    body = client.get(url).get_data(as_text=True)
+    ids = [int(value) for value in re.findall(r"<tr>\s*<td>(\d+)</td>", body)]
+    links = {label: html.unescape(href) for href, label in re.findall(r'<a href="([^"]+)">(‹ Назад|Дальше ›)</a>', body)}
+    return ids, links.get("‹ Назад"), links.get("Дальше ›")
+
+
+@pytest.mark.parametrize("direction", ["asc", "desc"])
+@pytest.mark.parametrize("sort", sorted(SORTS))
+def test_pages_cover_nullable_sort_in_sqlite_order(app, admin_client, characters, sort, direction):
+    column = SORTS[sort]
+    with app.app_context():
+        order = [column, Character.id] if direction == "asc" else [column.desc(), Character.id.desc()]
+        expected = db.session.scalars(db.select(Character.id).order_by(*order)).all()
+
+    pages, url, prev_url = [], f"/admin?sort={sort}&direction={direction}", None
+    while url and len(pages) <= len(expected):
+        ids, prev_url, url = _page(admin_client, url)
+        pages.append(ids)
+    assert [id_ for page in pages for id_ in page] == expected
+
+    # Назад от последней страницы по курсорам «Назад» — те же страницы
+    backwards = []
+    while prev_url and len(backwards) <= len(pages):
+        ids, prev_url, _next = _page(admin_client, prev_url)
+        backwards.append(ids)
+    assert backwards == pages[-2::-1]
@@ -0,0 +1,33 @@
+"""Массовый импорт: повторная загрузка собственной выгрузки ничего не меняет."""
+
+import io
+
+import pytest
+
+
+@pytest.fixture
+def characters(add_character):
+    add_character(
+        "Канами", "kanami", class_name="Страж", tier_weapon="A", review="Обзор",
+        skills=[
+            {"name": "Стальной щит", "type": "Навык", "cooldown": "12с"},
+            {"name": "Рывок", "type": "Ультимейт", "valid_hits": "3", "level_info": None},
+        ],
+    )
+    # Пустые поля в базе — NULL; в CSV они выгружаются пустыми ячейками
+    add_character("Лео", "leo")
+
+
+@pytest.mark.parametrize("fmt", ["csv", "jsonl"])
+def test_reimport_of_own_export_changes_nothing(admin_client, characters, fmt):
+    exported = admin_client.get(f"/admin/export.{fmt}").get_data()
+
+    response = admin_client.post(
+        "/admin/import",
+        data={"file": (io.BytesIO(exported), f"characters.{fmt}")},
+        headers={"X-Requested-With": "XMLHttpRequest"},
+    )
+
+    report = response.get_json()
+    assert report["errors"] == []
+    assert (report["created"], report["updated"], report["unchanged"]) == (0, 0, 2)
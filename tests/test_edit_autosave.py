@@ -0,0 +1,172 @@
+"""Автосохранение на странице редактирования персонажа.
+
+Скрипт страницы выполняется в Node на минимальной подделке DOM; его запросы
+``fetch`` передаются через stdin/stdout в тестовый клиент Flask.
+"""
+
+import json
+import re
+import shutil
+import subprocess
+
+import pytest
+
+from models import Character, Skill, db
+
+NODE = shutil.which("node")
+
+# Подделка DOM ровно под то, что трогает скрипт, и сценарий из argv:
+# [["input", номер строки навыка, поле, значение], ...]. После каждого
+# действия таймер автосохранения срабатывает сразу.
+HARNESS = r"""
+const readline = require('readline');
+const vm = require('vm');
+const [script, state, actions] = JSON.parse(process.argv[1]);
+
+const lines = readline.createInterface({ input: process.stdin })[Symbol.asyncIterator]();
+globalThis.fetch = async (url, options) => {
+    console.log(JSON.stringify({ url, body: JSON.parse(options.body) }));
+    const { status, body } = JSON.parse((await lines.next()).value);
+    return { status, ok: status < 400, json: async () => body };
+};
+
+let timer = null;
+globalThis.setTimeout = (fn) => { timer = fn; return 1; };
+globalThis.clearTimeout = () => { timer = null; };
+
+// Объявления скрипта страницы попадают в ту же глобальную область,
+// поэтому подделка DOM собирается внутри функции
+const dom = (() => {
+    const newRow = () => {
+        const inputs = {};
+        ['skill_id', 'skill_name', 'skill_type', 'skill_description', 'skill_cooldown']
+            .forEach((name) => { inputs[name] = { value: '' }; });
+        return { dataset: {}, inputs, querySelector: (sel) => inputs[sel.match(/name="([^"]+)"/)[1]] };
+    };
+    let rows = [];
+    const skillsList = {
+        querySelectorAll: () => rows,
+        querySelector: (sel) => rows.find((row) => row.dataset.key === sel.match(/data-key="([^"]+)"/)[1]),
+        replaceChildren: () => { rows = []; },
+        appendChild: (clone) => { rows.push(clone.row); },
+    };
+    const template = {
+        content: { cloneNode: () => { const row = newRow(); return { row, querySelector: () => row }; } },
+    };
+    const listeners = {};
+    const elements = { version: { value: String(state.version) } };
+    Object.entries(state.fields).forEach(([name, value]) => { elements[name] = { value: value ?? '' }; });
+    const form = {
+        action: state.action,
+        dataset: { autosave: 'true' },
+        elements,
+        addEventListener: (type, fn) => { listeners[type] = fn; },
+    };
+    state.skills.forEach((skill) => {
+        const row = newRow();
+        Object.entries(skill).forEach(([name, value]) => { row.inputs[`skill_${name}`].value = String(value ?? ''); });
+        rows.push(row);
+    });
+
+    const byId = { 'skills-list': skillsList, 'skill-template': template };
+    globalThis.document = {
+        querySelectorAll: () => [],
+        getElementById: (id) => byId[id] || null,
+        querySelector: (sel) => (sel === '.character-editor' ? form : null),
+    };
+    return { listeners, rows: () => rows };
+})();
+
+vm.runInThisContext(script);
+
+(async () => {
+    for (const [type, index, field, value] of actions) {
+        dom.rows()[index].inputs[field].value = value;
+        dom.listeners[type]();
+        const save = timer;
+        timer = null;
+        await save();
+    }
+    console.log('DONE');
+    process.exit(0);
+})();
+"""
+
+
+def _run_script(client, url, script, state, actions):
+    process = subprocess.Popen(
+        [NODE, "-e", HARNESS, json.dumps([script, state, actions])],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, encoding="utf-8",
+    )
+    requests = []
+    try:
+        for line in process.stdout:
+            if line.strip() == "DONE":
+                break
+            request = json.loads(line)
+            requests.append(request["body"])
+            response = client.post(
+                request["url"], json=request["body"], headers={"X-Requested-With": "XMLHttpRequest"}
+            )
+            process.stdin.write(json.dumps({"status": response.status_code, "body": response.get_json()}) + "\n")
+            process.stdin.flush()
+    finally:
+        process.stdin.close()
+        assert process.wait(timeout=10) == 0
+    return requests
+
+
+@pytest.mark.skipif(NODE is None, reason="нужен Node.js")
+def test_retyped_skill_after_autosaved_delete_is_saved(app, admin_client, add_character):
+    char_id = add_character("Лео", "leo", skills=[{"name": "Стальной щит", "type": "Навык"}])
+    url = f"/admin/character/{char_id}/edit"
+    page = admin_client.get(url).get_data(as_text=True)
+    script = re.findall(r"<script>(.*?)</script>", page, re.S)[-1]
+    with app.app_context():
+        ch = db.session.get(Character, char_id)
+        state = {
+            "action": url,
+            "version": ch.version,
+            "fields": {name: getattr(ch, name) for name in (
+                "name", "slug", "image_name", "faction", "class_name", "balance_status",
+                "tier_weapon", "tier_skill", "tier_passive", "tier_ultimate", "difficulty",
+                "short_summary", "cons", "review",
+            )},
+            "skills": [
+                {"id": skill.id, "name": skill.name, "type": skill.type,
+                 "description": skill.description, "cooldown": skill.cooldown}
+                for skill in ch.skills
+            ],
+        }
+
+    requests = _run_script(admin_client, url, script, state, [
+        ["input", 0, "skill_name", ""],
+        ["input", 0, "skill_name", "Стальной щит"],
+    ])
+
+    assert len(requests) == 2
+    assert requests[1]["skills"]["upsert"][0].get("id") is None
+    with app.app_context():
+        names = db.session.scalars(db.select(Skill.name).where(Skill.character_id == char_id)).all()
+    assert names == ["Стальной щит"]
+
+
+@pytest.mark.parametrize("diff", [
+    {"version": True},
+    {"version": 1, "skills": {"upsert": [{"id": "SKILL", "name": "Рывок"}], "delete": ["SKILL"]}},
+    {"version": 1, "skills": {"upsert": [{"id": "SKILL", "name": ""}, {"id": "SKILL", "name": "Рывок"}]}},
+])
+def test_invalid_diff_is_rejected_without_changes(app, admin_client, add_character, diff):
+    char_id = add_character("Лео", "leo", skills=[{"name": "Стальной щит", "type": "Навык"}])
+    with app.app_context():
+        skill_id = db.session.scalar(db.select(Skill.id).where(Skill.character_id == char_id))
+    body = json.loads(json.dumps(diff).replace('"SKILL"', str(skill_id)))
+
+    response = admin_client.post(
+        f"/admin/character/{char_id}/edit", json=body, headers={"X-Requested-With": "XMLHttpRequest"}
+    )
+
+    assert response.status_code == 400
+    with app.app_context():
+        assert db.session.get(Character, char_id).version == 1
+        assert db.session.get(Skill, skill_id).name == "Стальной щит"
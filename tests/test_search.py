@@ -0,0 +1,36 @@
+"""Поиск персонажей: FTS по словам и LIKE по части имени."""
+
+import pytest
+
+
+@pytest.fixture
+def characters(add_character):
+    add_character("Фрагранс", "fragrance")
+    add_character("Канами", "kanami")
+    add_character("Лео", "leo", skills=[{"name": "Стальной щит", "type": "Навык"}])
+
+
+@pytest.fixture
+def client_with_data(app, characters):
+    return app.test_client()
+
+
+def test_api_search_matches_part_of_name(client_with_data):
+    response = client_with_data.get("/api/search", query_string={"q": "ан"})
+
+    assert response.status_code == 200
+    assert sorted(response.get_json()["slugs"]) == ["fragrance", "kanami"]
+
+
+def test_tier_list_search_matches_part_of_name(client_with_data):
+    html = client_with_data.get("/tier-list", query_string={"search": "ан"}).get_data(as_text=True)
+
+    assert "Фрагранс" in html
+    assert "Канами" in html
+    assert "Лео" not in html
+
+
+def test_search_still_finds_skill_words(client_with_data):
+    response = client_with_data.get("/api/search", query_string={"q": "щит"})
+
+    assert response.get_json()["slugs"] == ["leo"]
@@ -0,0 +1,37 @@
+"""Кэши тир-листа: плитки по версии персонажа и метка изменений между процессами."""
+
+import os
+
+from app import change_stamp_path
+from cache import ChangeStamp
+from models import db
+
+
+def test_foreign_change_is_not_swallowed_by_own_touch(tmp_path):
+    path = tmp_path / "test.db-changed"
+    ours, other = ChangeStamp(path), ChangeStamp(path)
+    other.touch()
+
+    ours.touch()
+
+    assert ours.changed()
+    assert not ours.changed()
+
+
+def test_tile_follows_character_version(app, add_character):
+    character_id = add_character("Канами", "kanami", tier_weapon="A")
+    client = app.test_client()
+    assert "Канами" in client.get("/tier-list").get_data(as_text=True)
+
+    # Запись в обход ORM, как из другого процесса: кэш плиток о ней не знает
+    with app.app_context():
+        db.session.execute(
+            db.text("UPDATE character SET name = 'Фрагранс', version = version + 1 WHERE id = :id"),
+            {"id": character_id},
+        )
+        db.session.commit()
+    os.utime(change_stamp_path(app, "changed"), ns=(1, 1))
+
+    html = client.get("/tier-list").get_data(as_text=True)
+    assert "Фрагранс" in html
+    assert "Канами" not in html
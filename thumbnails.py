@@ -0,0 +1,185 @@
+"""Уменьшенные копии портретов под размеры, в которых их показывает вёрстка.
+
+Для каждого класса размера (icon/small/large) готовятся варианты шириной 1x и
+2x в форматах AVIF, WebP и JPEG (какие поддерживает установленный Pillow).
+Файлы лежат в кэш-папке рядом с MEDIA_IMAGES_DIR и создаются либо пакетно
+(``database/build_thumbnails.py``), либо при первом запросе.
+"""
+
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+try:  # Pillow — необязательная зависимость: без неё отдаются оригиналы
+    from PIL import Image, ImageOps, features
+except ImportError:  # pragma: no cover - зависит от окружения
+    Image = None
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+# Класс размера -> (ширина в CSS-пикселях, ширины файлов для srcset)
+SIZE_CLASSES = {
+    "icon": (112, (112, 224)),
+    "small": (64, (64, 128)),
+    "large": (220, (220, 440)),
+}
+
+# (расширение, mime, формат Pillow, модуль для features.check)
+_FORMATS = (
+    ("avif", "image/avif", "AVIF", "avif"),
+    ("webp", "image/webp", "WEBP", "webp"),
+    ("jpg", "image/jpeg", "JPEG", None),
+)
+
+# Из каких оригиналов делать миниатюры: сначала без потерь
+_ORIGINAL_PREFERENCE = ("image/png", "image/webp", "image/jpeg")
+
+# Фон для JPEG вместо прозрачности — цвет .face-frame из style.css
+_BACKGROUND = (44, 45, 51)
+
+
+def _supported_formats():
+    if Image is None:
+        return ()
+    return tuple(
+        (ext, mime, pil_format)
+        for ext, mime, pil_format, feature in _FORMATS
+        if feature is None or features.check(feature)
+    )
+
+
+def is_flat_name(name: str) -> bool:
+    """Имя без каталогов и переходов вверх: миниатюры лежат плоско в ``size/width/``."""
+
+    return bool(name) and "/" not in name and "\\" not in name and ".." not in name
+
+
+class ThumbnailStore:
+    """Миниатюры для изображений из ImageManifest; без Pillow выключено."""
+
+    def __init__(self, manifest, cache_dir, enabled: bool = True, quality: int = 70):
+        self.manifest = manifest
+        self.cache_dir = Path(cache_dir)
+        self.quality = quality
+        self.formats = _supported_formats() if enabled else ()
+        self._locks: dict[Path, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.formats)
+
+    def mime_for(self, ext: str) -> str | None:
+        for known_ext, mime, _pil_format in self.formats:
+            if known_ext == ext:
+                return mime
+        return None
+
+    def variants(self, base: str, size: str):
+        """(ext, mime, [(ширина, имя файла)]) для каждого доступного формата."""
+
+        # Картинки из вложенных папок отдаются оригиналами
+        if not self.enabled or size not in SIZE_CLASSES or not is_flat_name(base):
+            return []
+        _css_width, widths = SIZE_CLASSES[size]
+        return [
+            (ext, mime, [(width, f"{base}.{ext}") for width in widths])
+            for ext, mime, _pil_format in self.formats
+        ]
+
+    def target_path(self, size: str, width: int, filename: str) -> Path:
+        return self.cache_dir / size / str(width) / filename
+
+    def original_path(self, base: str) -> Path | None:
+        sources = self.manifest.sources(base)
+        for mime in _ORIGINAL_PREFERENCE:
+            for source in sources:
+                if source["mime"] == mime:
+                    return Path(self.manifest.directory) / source["path"]
+        return None
+
+    def ensure(self, size: str, width: int, filename: str) -> Path | None:
+        """Путь к готовой миниатюре; создаёт её, если файла нет или он устарел."""
+
+        if size not in SIZE_CLASSES or width not in SIZE_CLASSES[size][1]:
+            return None
+        # Иначе ``../`` в имени выводит и чтение оригинала, и запись за пределы папок
+        if not is_flat_name(filename):
+            return None
+        base, dot, ext = filename.rpartition(".")
+        if not dot or self.mime_for(ext) is None:
+            return None
+        original = self.original_path(base)
+        if original is None:
+            return None
+
+        target = self.target_path(size, width, filename)
+        if self._is_fresh(target, original):
+            return target
+
+        with self._lock(target):
+            # Пока ждали блокировку, файл мог сделать другой поток или процесс
+            if not self._is_fresh(target, original):
+                self._render(original, target, width, ext)
+        return target
+
+    @staticmethod
+    def _is_fresh(target: Path, original: Path) -> bool:
+        try:
+            return target.stat().st_mtime_ns >= original.stat().st_mtime_ns
+        except FileNotFoundError:
+            return False
+
+    @contextmanager
+    def _lock(self, target: Path):
+        with self._locks_guard:
+            thread_lock = self._locks.setdefault(target, threading.Lock())
+        with thread_lock:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            if fcntl is None:
+                yield
+                return
+            # Файловая блокировка защищает от дублей между воркерами
+            with open(target.with_name(f".{target.name}.lock"), "w") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _render(self, original: Path, target: Path, width: int, ext: str):
+        pil_format = next(fmt for e, _mime, fmt in self.formats if e == ext)
+        with Image.open(original) as image:
+            image = ImageOps.exif_transpose(image)
+            if image.width > width:
+                height = max(1, round(image.height * width / image.width))
+                image = image.resize((width, height), Image.Resampling.LANCZOS)
+
+            if pil_format == "JPEG":
+                if image.mode in ("RGBA", "LA", "P"):
+                    image = image.convert("RGBA")
+                    background = Image.new("RGB", image.size, _BACKGROUND)
+                    background.paste(image, mask=image.getchannel("A"))
+                    image = background
+                else:
+                    image = image.convert("RGB")
+
+            tmp_path = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+            image.save(tmp_path, pil_format, quality=self.quality)
+        os.replace(tmp_path, target)
+
+    def build_all(self, bases):
+        """Создаёт все варианты для перечисленных изображений; возвращает число файлов."""
+
+        created = 0
+        for base in bases:
+            for size in SIZE_CLASSES:
+                for _ext, _mime, files in self.variants(base, size):
+                    for width, filename in files:
+                        if self.ensure(size, width, filename) is not None:
+                            created += 1
+        return created
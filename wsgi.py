@@ -0,0 +1,28 @@
+"""Точка входа WSGI для боевых серверов.
+
+Приложение создаётся при импорте модуля, вместе с проверкой схемы базы и
+полнотекстового индекса, поэтому сервер с предзагрузкой (``python serve.py``
+или ``gunicorn --preload wsgi:app``) делает это один раз в главном процессе, а
+воркеры получают готовые модели и маршруты через fork и делят эти страницы
+памяти copy-on-write. С TEMPLATE_WARMUP=true туда же попадают индексы файлов,
+все скомпилированные шаблоны и закэшированный тир-лист.
+"""
+
+import gc
+
+from app import create_app, prepare_database, warm_up
+from models import db
+
+app = create_app()
+prepare_database(app)
+if app.config["TEMPLATE_WARMUP"]:
+    warm_up(app)
+
+with app.app_context():
+    # Подключения SQLite нельзя передавать через fork: каждый воркер
+    # откроет свои при первом запросе
+    db.engine.dispose()
+
+# Объекты, созданные при загрузке, больше не проверяются сборщиком мусора:
+# иначе его проходы в воркерах трогают эти страницы и copy-on-write их копирует
+gc.freeze()